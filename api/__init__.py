@@ -11,22 +11,49 @@ from flask_migrate import Migrate
 from flask_restful import Api
 
 from api.resources.admin import admin_extra_view, MessageAdminView
-from cli import create_admin_user
+from cli import (
+    archive_season,
+    create_admin_user,
+    drain_outbox,
+    explain_queries,
+    prewarm,
+    reconcile_aggregates,
+    seed,
+    sweep_tokens,
+)
 
+from .cache import cache, message_cache
 from .db import db
 from .ma import ma
-from .models.user import MessageModel, UserModel
+from .metrics import metrics
+from .models.outbox import EmailOutboxModel
+from .models.user import MessageModel, UserAggregateModel, UserModel
 from .resources.admin import HomeAdminView, UserAdminView
 from .resources.deploy import DeployServer
-from .resources.message import MessageDetail, MessageList
+from .resources.message import (
+    MessageArchiveList,
+    MessageBatch,
+    MessageDetail,
+    MessageList,
+)
 from .resources.user import (
     RefreshToken,
     UserConfirm,
     UserInformation,
     UserLogin,
+    UserLogout,
     UserRegister,
     UserWithdraw,
 )
+from .revocation import token_revocation
+from .utils.archive import message_archive
+from .utils.outbox import outbox_worker
+from .utils.password import password_hasher
+from .utils.prewarm import message_list_prewarmer
+from .utils.profiler import request_profiler
+from .utils.slow_query import slow_query_log
+from .utils.sweeper import refresh_token_sweeper
+from .utils.write_buffer import message_write_buffer
 
 
 def create_app(is_production=True):
@@ -52,6 +79,13 @@ def create_app(is_production=True):
 
     # Command line interface
     app.cli.add_command(create_admin_user)
+    app.cli.add_command(reconcile_aggregates)
+    app.cli.add_command(explain_queries)
+    app.cli.add_command(drain_outbox)
+    app.cli.add_command(sweep_tokens)
+    app.cli.add_command(prewarm)
+    app.cli.add_command(archive_season)
+    app.cli.add_command(seed)
 
     login_manager = LoginManager()
     mail = Mail(app)
@@ -70,6 +104,13 @@ def create_app(is_production=True):
     login_manager.init_app(app)
     db.init_app(app)
     ma.init_app(app)
+    cache.init_app(app)
+    message_cache.init_app(app)
+    token_revocation.init_app(app)
+    password_hasher.init_app(app)
+    metrics.init_app(app)
+    slow_query_log.init_app(app)
+    request_profiler.init_app(app)
     migrate.init_app(app, db)
 
     # DB 생성
@@ -77,10 +118,17 @@ def create_app(is_production=True):
         db.create_all()
         from api.resources import error
 
+    # 백그라운드 워커
+    outbox_worker.init_app(app)
+    refresh_token_sweeper.init_app(app)
+    message_write_buffer.init_app(app)
+    message_list_prewarmer.init_app(app)
+    message_archive.init_app(app)
+
     # Flask-Login
     @login_manager.user_loader
     def load_user(user_id):
-        return UserModel.find_by_id(user_id)
+        return UserModel.get(user_id)
 
     # ADMIN Page
     admin.add_view(UserAdminView(model=UserModel, session=db.session, name="Users"))
@@ -93,6 +141,7 @@ def create_app(is_production=True):
     api.add_resource(UserRegister, "/api/user/register")
     api.add_resource(UserWithdraw, "/api/user/withdraw")
     api.add_resource(UserLogin, "/api/user/login")
+    api.add_resource(UserLogout, "/api/user/logout")
     api.add_resource(UserInformation, "/api/user/<int:user_id>")
     api.add_resource(RefreshToken, "/api/user/refresh")
     api.add_resource(
@@ -101,6 +150,10 @@ def create_app(is_production=True):
 
     # 쪽지 관련 API
     api.add_resource(MessageList, "/api/user/<int:user_id>/messages")
+    api.add_resource(MessageBatch, "/api/messages/batch")
+    api.add_resource(
+        MessageArchiveList, "/api/user/<int:user_id>/archive/<int:season>/messages"
+    )
     api.add_resource(MessageDetail, "/api/user/<int:user_id>/messages/<int:message_id>")
 
     # 배포 web hook 을 위한 엔드포인트
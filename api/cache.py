@@ -0,0 +1,38 @@
+from api.utils.cache import MemoryCacheBackend, create_cache_backend
+
+
+class Cache:
+    """
+    백엔드를 교체할 수 있는 캐시
+    init_app 에서 앱 설정 중 config_prefix 로 시작하는 값으로 백엔드를 생성합니다.
+    """
+
+    def __init__(self, config_prefix="CACHE", key_prefix="mfr:"):
+        self.config_prefix = config_prefix
+        self.key_prefix = key_prefix
+        self.backend = MemoryCacheBackend()
+
+    def init_app(self, app):
+        self.backend = create_cache_backend(
+            app.config, self.config_prefix, self.key_prefix
+        )
+
+    def get(self, key):
+        return self.backend.get(key)
+
+    def set(self, key, value, ttl=None):
+        self.backend.set(key, value, ttl=ttl)
+
+    def delete(self, *keys):
+        self.backend.delete(*keys)
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        return self.backend.stats()
+
+
+cache = Cache()
+# 작성 후 바뀌지 않는 쪽지 상세 응답은 사용자 정보와 따로, 긴 TTL 로 캐시
+message_cache = Cache("MESSAGE_CACHE", "mfr:message:")
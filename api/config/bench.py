@@ -0,0 +1,20 @@
+import tempfile
+
+from api.config.test import *
+
+DEBUG = False
+
+SQLALCHEMY_DATABASE_URI = os.getenv(
+    "BENCH_DATABASE_URI",
+    "sqlite:///{}".format(
+        os.path.join(tempfile.gettempdir(), "moneyforrabbit-bench.db")
+    ),
+)
+
+# 비밀번호 해시, WAL fsync 는 운영 환경과 같은 설정으로 측정
+PASSWORD_HASH_METHOD = "pbkdf2:sha256:260000"
+MESSAGE_WRITE_BUFFER_FSYNC = True
+
+# 운영 환경처럼 느린 SQL 문 기록과 요청 프로파일링은 끄고 측정
+SLOW_QUERY_LOG_ENABLED = False
+PROFILER_ENABLED = False
@@ -1,5 +1,5 @@
 import os
-from datetime import timedelta
+from datetime import datetime, timedelta
 
 BASE_DIR = os.path.dirname(os.path.dirname(__file__))
 DEBUG = True
@@ -25,3 +25,105 @@ MAIL_USERNAME = os.environ["MAIL_USERNAME"]
 MAIL_PASSWORD = os.environ["MAIL_PASSWORD"]
 MAIL_USE_TLS = False
 MAIL_USE_SSL = True
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL")
+CACHE_MAX_SIZE = 10000
+CACHE_DEFAULT_TTL = 60
+
+# 쪽지는 작성 후 수정되지 않으므로, 상세 응답은 삭제될 때까지 오래 캐시 (LRU 로 크기 제한)
+MESSAGE_CACHE_BACKEND = CACHE_BACKEND
+MESSAGE_CACHE_REDIS_URL = CACHE_REDIS_URL
+MESSAGE_CACHE_MAX_SIZE = 50000
+MESSAGE_CACHE_DEFAULT_TTL = 7 * 24 * 60 * 60
+# 프로세스 내부 (memory) 캐시는 삭제 / 닉네임 변경 무효화가 요청을 처리한 워커에만 적용되므로,
+# 다른 워커가 오래된 응답을 주지 않도록 짧게 캐시 (여러 워커에서는 redis 사용 권장)
+MESSAGE_CACHE_MEMORY_TTL = 5
+
+# 메일은 EmailOutbox 테이블에 쌓인 뒤 백그라운드 워커가 발송
+MAIL_TRANSPORT = os.getenv("MAIL_TRANSPORT", "smtp")
+MAIL_FILE_SINK_DIR = os.path.join(BASE_DIR, "mail-sink")
+MAIL_OUTBOX_AUTOSTART = False
+MAIL_OUTBOX_WORKERS = 2
+MAIL_OUTBOX_BATCH_SIZE = 20
+MAIL_OUTBOX_POLL_SECONDS = 2
+MAIL_OUTBOX_LEASE_SECONDS = 300
+MAIL_OUTBOX_MAX_ATTEMPTS = 5
+MAIL_OUTBOX_BACKOFF_SECONDS = 30
+MAIL_CAMPAIGN_CHUNK_SIZE = 500
+MAIL_CAMPAIGN_CONCURRENCY = 4
+MAIL_CAMPAIGN_RATE_LIMIT = 10  # 초당 발송 수, None 이면 제한하지 않음
+# 발송 작업의 lease, 한 묶음을 발송하는 시간 (CHUNK_SIZE / RATE_LIMIT 초) 보다 길어야 함
+MAIL_CAMPAIGN_LEASE_SECONDS = 300
+
+# 폐기된 JWT 는 bloom filter + 집합으로 관리하고, 여러 워커는 백엔드를 통해 공유
+REVOCATION_BACKEND = os.getenv("REVOCATION_BACKEND", "memory")
+REVOCATION_REDIS_URL = os.getenv("REVOCATION_REDIS_URL", CACHE_REDIS_URL)
+REVOCATION_BLOOM_CAPACITY = 100000
+REVOCATION_BLOOM_ERROR_RATE = 0.001
+REVOCATION_SYNC_SECONDS = 1
+REVOCATION_PURGE_SECONDS = 600
+
+# 쓰기 버퍼를 사용하면 쪽지를 로컬 WAL 에 기록한 뒤 바로 응답하고, 모아서 저장
+MESSAGE_WRITE_BUFFER_ENABLED = False
+MESSAGE_WRITE_BUFFER_WAL_DIR = os.path.join(BASE_DIR, "message-wal")
+MESSAGE_WRITE_BUFFER_WAL_MAX_BYTES = 16 * 1024 * 1024
+MESSAGE_WRITE_BUFFER_MAX_SIZE = 10000
+MESSAGE_WRITE_BUFFER_BATCH_SIZE = 500
+MESSAGE_WRITE_BUFFER_FLUSH_MS = 50
+MESSAGE_WRITE_BUFFER_FSYNC = True
+# 외래 키 위반 등으로 저장할 수 없는 쪽지는 이 파일로 옮기고 건너뜀
+MESSAGE_WRITE_BUFFER_DEAD_LETTER_PATH = os.path.join(
+    MESSAGE_WRITE_BUFFER_WAL_DIR, "dead-letter.jsonl"
+)
+
+# 시즌 (연도) 별 쪽지 공개 시각 (한국 시간), 쪽지는 작성된 시즌으로 저장됨
+MESSAGE_SEASON = int(os.getenv("MESSAGE_SEASON", "2023"))
+MESSAGE_OPEN_DATETIMES = {2023: datetime(2023, 1, 22)}
+# 끝난 시즌의 쪽지는 flask archiveseason 으로 이곳에 압축하여 옮김
+MESSAGE_ARCHIVE_DIR = os.path.join(BASE_DIR, "message-archive")
+MESSAGE_ARCHIVE_CHUNK_SIZE = 1000
+
+# 받은 쪽지 목록을 ORM 객체 없이 필요한 컬럼만 Core 로 조회하여 응답 (응답은 동일)
+MESSAGE_LIST_LEAN_READ = False
+
+# 쪽지 공개 시각 직전에 받은 쪽지가 많은 사용자부터 목록 첫 페이지 캐시를 미리 채움
+# (사용자당 캐시 항목 4개를 사용하므로 CACHE_MAX_SIZE 를 넘지 않도록 설정)
+MESSAGE_LIST_PREWARM_AUTOSTART = False
+MESSAGE_LIST_PREWARM_LEAD_SECONDS = 120
+MESSAGE_LIST_PREWARM_MAX_USERS = 3000
+MESSAGE_LIST_PREWARM_CHUNK_SIZE = 500
+
+# /metrics 에서 Prometheus 형식으로 요청, SQL, 메일 발송 지표를 내보냄
+# 워커 프로세스별 값을 METRICS_DIR 에 저장하여 합치므로, 배포할 때 디렉토리를 비워야 함
+METRICS_ENABLED = True
+METRICS_DIR = os.path.join(BASE_DIR, "metrics")
+METRICS_FLUSH_SECONDS = 5
+
+# SLOW_QUERY_THRESHOLD_MS 보다 오래 걸린 SQL 문을 실행 계획과 함께 기록
+SLOW_QUERY_LOG_ENABLED = False
+SLOW_QUERY_THRESHOLD_MS = 100
+SLOW_QUERY_EXPLAIN = True
+SLOW_QUERY_SAMPLE_SIZE = 1000
+SLOW_QUERY_LOG_PATH = os.path.join(BASE_DIR, "slow-query.log")
+SLOW_QUERY_LOG_MAX_BYTES = 10 * 1024 * 1024
+SLOW_QUERY_LOG_BACKUP_COUNT = 5
+
+# 일부 요청을 cProfile 로 실행하여 PROFILER_DIR 에 저장 (꺼져 있으면 요청 hook 을 등록하지 않음)
+# 관리자 페이지에서 발급한 값을 PROFILER_HEADER 에 담아 보낸 요청은 항상 프로파일링
+PROFILER_ENABLED = False
+PROFILER_SAMPLE_RATE = 0.0
+PROFILER_HEADER = "X-MFR-Profile"
+PROFILER_TOKEN_MAX_AGE = 3600
+PROFILER_DIR = os.path.join(BASE_DIR, "profiles")
+PROFILER_MAX_FILES = 500
+PROFILER_TOP_N = 50
+
+# 만료된 refresh token 은 백그라운드 스레드가 주기적으로 삭제
+REFRESH_TOKEN_SWEEP_AUTOSTART = False
+REFRESH_TOKEN_SWEEP_INTERVAL_SECONDS = 3600
+REFRESH_TOKEN_SWEEP_CHUNK_SIZE = 1000
+
+PASSWORD_HASH_METHOD = "pbkdf2:sha256:260000"
+PASSWORD_HASH_SALT_LENGTH = 16
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 1))
@@ -14,3 +14,7 @@ SQLALCHEMY_DATABASE_URI = (
     f"mysql+pymysql://{DB_USERNAME}:{DB_PASSWORD}@{DB_ADDRESS}/{DB_DBNAME}"
 )
 SQLALCHEMY_ENGINE_OPTIONS = {"pool_recycle": 280}
+
+MAIL_OUTBOX_AUTOSTART = True
+REFRESH_TOKEN_SWEEP_AUTOSTART = True
+MESSAGE_LIST_PREWARM_AUTOSTART = True
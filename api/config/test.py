@@ -1,3 +1,5 @@
+import tempfile
+
 from api.config.default import *
 
 TESTING = False
@@ -6,3 +8,26 @@ JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=30)
 JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=1)
 
 SQLALCHEMY_DATABASE_URI = "sqlite:///{}".format(os.path.join(BASE_DIR, "test.db"))
+
+MAIL_TRANSPORT = "file"
+MAIL_FILE_SINK_DIR = os.path.join(tempfile.gettempdir(), "moneyforrabbit-mail-sink")
+MESSAGE_WRITE_BUFFER_WAL_DIR = os.path.join(
+    tempfile.gettempdir(), "moneyforrabbit-message-wal"
+)
+MESSAGE_WRITE_BUFFER_DEAD_LETTER_PATH = os.path.join(
+    MESSAGE_WRITE_BUFFER_WAL_DIR, "dead-letter.jsonl"
+)
+MESSAGE_WRITE_BUFFER_FSYNC = False
+MESSAGE_ARCHIVE_DIR = os.path.join(tempfile.gettempdir(), "moneyforrabbit-archive")
+METRICS_DIR = os.path.join(tempfile.gettempdir(), "moneyforrabbit-metrics")
+PROFILER_ENABLED = True
+PROFILER_DIR = os.path.join(tempfile.gettempdir(), "moneyforrabbit-profiles")
+# 테스트에서 기준 시간을 낮춰 사용
+SLOW_QUERY_LOG_ENABLED = True
+SLOW_QUERY_THRESHOLD_MS = 1000
+SLOW_QUERY_LOG_PATH = os.path.join(
+    tempfile.gettempdir(), "moneyforrabbit-slow-query.log"
+)
+
+PASSWORD_HASH_METHOD = "pbkdf2:sha256:1000"
+PASSWORD_HASH_WORKERS = 0
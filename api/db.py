@@ -1,3 +1,55 @@
+from contextlib import contextmanager
+
+from flask import g
 from flask_sqlalchemy import SQLAlchemy
 
 db = SQLAlchemy()
+
+
+@contextmanager
+def unit_of_work():
+    """
+    블록 안에서 모델들이 저장 / 삭제한 내용을 모아, 블록이 끝날 때 한 번만 커밋합니다.
+    중첩된 경우 가장 바깥 블록에서만 커밋하고, 예외가 발생하면 롤백합니다.
+    """
+    depth = g.get("unit_of_work_depth", 0)
+    if depth == 0:
+        g.unit_of_work_callbacks = []
+    g.unit_of_work_depth = depth + 1
+    try:
+        yield db.session
+        if depth == 0:
+            db.session.commit()
+            callbacks, g.unit_of_work_callbacks = g.unit_of_work_callbacks, []
+            for callback in callbacks:
+                callback()
+    except Exception:
+        if depth == 0:
+            db.session.rollback()
+            g.unit_of_work_callbacks = []
+        raise
+    finally:
+        g.unit_of_work_depth = depth
+
+
+def in_unit_of_work():
+    return g.get("unit_of_work_depth", 0) > 0
+
+
+def commit():
+    """
+    unit_of_work 블록 안이라면 변경 사항을 세션에만 남겨두고, 아니라면 바로 커밋합니다.
+    """
+    if not in_unit_of_work():
+        db.session.commit()
+
+
+def after_commit(callback):
+    """
+    커밋이 끝난 뒤 callback 을 실행합니다. (캐시 무효화 등)
+    unit_of_work 블록 안이라면 블록의 커밋이 성공한 뒤에 실행합니다.
+    """
+    if in_unit_of_work():
+        g.unit_of_work_callbacks.append(callback)
+    else:
+        callback()
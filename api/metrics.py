@@ -0,0 +1,127 @@
+import time
+
+from flask import Response, current_app, g, has_app_context, request
+from sqlalchemy import event
+
+from api.db import db
+from api.utils.metrics import MetricsRegistry
+
+REQUEST_DURATION = "mfr_http_request_duration_seconds"
+REQUESTS = "mfr_http_requests_total"
+REQUESTS_IN_FLIGHT = "mfr_http_requests_in_flight"
+SQL_STATEMENTS = "mfr_sql_statements_total"
+SQL_DURATION = "mfr_sql_duration_seconds_total"
+MAIL_SEND_DURATION = "mfr_mail_send_duration_seconds"
+
+
+class Metrics:
+    """
+    요청, SQL, 메일 발송을 계측하고 /metrics 에서 Prometheus 형식으로 내보냅니다.
+
+    요청은 Flask-RESTful 리소스 이름 (MessageList, UserLogin, ...) 별로,
+    SQL 은 해당 SQL 을 실행한 요청의 리소스 별로 (요청 밖에서는 "background") 기록합니다.
+    METRICS_DIR 에 워커 프로세스별 파일을 두고, 수집할 때 합칩니다.
+    """
+
+    def __init__(self):
+        self.registry = MetricsRegistry()
+
+    def init_app(self, app):
+        if not app.config["METRICS_ENABLED"]:
+            return
+        self.registry.stop()
+        self.registry = MetricsRegistry(
+            app.config["METRICS_DIR"], app.config["METRICS_FLUSH_SECONDS"]
+        )
+        describe = self.registry.describe
+        describe(REQUEST_DURATION, "histogram", "HTTP request latency by resource.")
+        describe(REQUESTS, "counter", "HTTP requests by resource, method and status.")
+        describe(REQUESTS_IN_FLIGHT, "gauge", "HTTP requests being processed.")
+        describe(SQL_STATEMENTS, "counter", "SQL statements executed by resource.")
+        describe(SQL_DURATION, "counter", "Time spent in SQL statements by resource.")
+        describe(MAIL_SEND_DURATION, "histogram", "Mail send latency by transport.")
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        engine = db.get_engine(app)
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        app.add_url_rule("/metrics", "metrics", self.export)
+        app.extensions["metrics"] = self
+        self.registry.start()
+
+    @staticmethod
+    def get_resource_name():
+        """
+        현재 요청을 처리하는 Flask-RESTful 리소스의 이름 (리소스가 아니라면 endpoint 이름)
+        """
+        if request.endpoint is None:
+            return "unmatched"
+        view = current_app.view_functions.get(request.endpoint)
+        view_class = getattr(view, "view_class", None)
+        return view_class.__name__ if view_class else request.endpoint
+
+    def _before_request(self):
+        if request.endpoint == "metrics":
+            return
+        g.metrics_resource = self.get_resource_name()
+        g.metrics_started = time.perf_counter()
+        g.metrics_recorded = False
+        self.registry.inc(REQUESTS_IN_FLIGHT, resource=g.metrics_resource)
+
+    def _record_request(self, status):
+        resource = g.metrics_resource
+        self.registry.observe(
+            REQUEST_DURATION,
+            time.perf_counter() - g.metrics_started,
+            resource=resource,
+            method=request.method,
+        )
+        self.registry.inc(
+            REQUESTS, resource=resource, method=request.method, status=str(status)
+        )
+        g.metrics_recorded = True
+
+    def _after_request(self, response):
+        if "metrics_started" in g:
+            self._record_request(response.status_code)
+        return response
+
+    def _teardown_request(self, exc):
+        if "metrics_started" not in g:
+            return
+        # 처리되지 않은 예외로 after_request 가 실행되지 않은 경우
+        if not g.metrics_recorded:
+            self._record_request(500)
+        self.registry.inc(REQUESTS_IN_FLIGHT, -1, resource=g.metrics_resource)
+
+    def _before_cursor_execute(self, conn, cursor, statement, *args):
+        conn.info["metrics_statement_started"] = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, *args):
+        started = conn.info.pop("metrics_statement_started", None)
+        if started is None:
+            return
+        resource = (
+            g.get("metrics_resource", "background")
+            if has_app_context()
+            else "background"
+        )
+        self.registry.inc(SQL_STATEMENTS, resource=resource)
+        self.registry.inc(
+            SQL_DURATION, time.perf_counter() - started, resource=resource
+        )
+
+    def observe_mail_send(self, transport, seconds, result):
+        self.registry.observe(
+            MAIL_SEND_DURATION, seconds, transport=transport, result=result
+        )
+
+    def export(self):
+        return Response(
+            self.registry.render(), mimetype="text/plain; version=0.0.4; charset=utf-8"
+        )
+
+
+metrics = Metrics()
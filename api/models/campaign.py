@@ -0,0 +1,177 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, or_, update
+
+from api.db import commit, db
+from api.models.user import UserAggregateModel, UserModel
+
+
+class CampaignModel(db.Model):
+    """
+    전체 사용자에게 보내는 알림 메일 발송 작업 모델
+
+    status = pending (생성됨) / running (발송 중) / paused (중단됨) / finished (완료)
+    last_user_id = 발송을 마친 마지막 사용자의 id, 중단된 작업은 이 다음 사용자부터 이어서 발송
+    total = 작업 생성 시점의 전체 사용자 수
+    received_count = 쪽지를 받은 사용자에게 보낸 메일 수
+    not_received_count = 쪽지를 받지 않은 사용자에게 보낸 메일 수
+    failed_count = 발송에 실패한 메일 수
+    updated_at = 마지막으로 진행 상황을 저장한 시각
+                 running 이면 작업을 가져간 프로세스의 lease 로, 묶음을 발송할 때마다 연장
+    """
+
+    __tablename__ = "Campaign"
+
+    PENDING = "pending"
+    RUNNING = "running"
+    PAUSED = "paused"
+    FINISHED = "finished"
+
+    id = db.Column(db.Integer, primary_key=True)
+    status = db.Column(db.String(10), nullable=False, default=PENDING)
+    last_user_id = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Integer, nullable=False, default=0)
+    received_count = db.Column(db.Integer, nullable=False, default=0)
+    not_received_count = db.Column(db.Integer, nullable=False, default=0)
+    failed_count = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.String(500), nullable=True)
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
+    updated_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    @property
+    def processed_count(self):
+        return self.received_count + self.not_received_count + self.failed_count
+
+    @property
+    def progress(self):
+        """
+        진행률 (%)
+        """
+        if not self.total:
+            return 100 if self.status == self.FINISHED else 0
+        return min(100, round(self.processed_count * 100 / self.total, 1))
+
+    def is_running(self, lease_seconds):
+        """
+        어떤 프로세스가 lease 를 연장하며 발송 중인지 여부
+        """
+        return (
+            self.status == self.RUNNING
+            and self.updated_at is not None
+            and self.updated_at >= datetime.utcnow() - timedelta(seconds=lease_seconds)
+        )
+
+    @classmethod
+    def create(cls):
+        """
+        전체 사용자를 대상으로 하는 발송 작업을 생성하고 저장
+        """
+        campaign = cls(total=UserModel.query.count())
+        campaign.save_to_db()
+        return campaign
+
+    @classmethod
+    def find_by_id(cls, id):
+        return cls.query.filter_by(id=id).first()
+
+    @classmethod
+    def find_recent(cls, limit=10):
+        return cls.query.order_by(cls.id.desc()).limit(limit).all()
+
+    @classmethod
+    def find_status(cls, id):
+        return db.session.query(cls.status).filter_by(id=id).scalar()
+
+    @staticmethod
+    def get_lease_time():
+        # MySQL 의 DATETIME 은 초 단위로 저장되므로, 저장한 lease 와 비교할 수 있게 초 단위로 맞춤
+        return datetime.utcnow().replace(microsecond=0)
+
+    @classmethod
+    def claim(cls, id, lease_seconds):
+        """
+        발송 작업을 running 상태로 가져가고 커밋한 뒤, 가져간 lease (updated_at) 를 반환
+        여러 프로세스가 동시에 가져가더라도 조건부 UPDATE 에 성공한 프로세스만 작업을 가져감
+        이미 끝났거나, 다른 프로세스가 lease_seconds 안에 lease 를 연장한 작업이면 None 을 반환
+        """
+        now = cls.get_lease_time()
+        result = db.session.execute(
+            update(cls)
+            .where(
+                cls.id == id,
+                cls.status != cls.FINISHED,
+                or_(
+                    cls.status != cls.RUNNING,
+                    cls.updated_at.is_(None),
+                    cls.updated_at < now - timedelta(seconds=lease_seconds),
+                ),
+            )
+            .values(status=cls.RUNNING, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        return now if result.rowcount else None
+
+    @classmethod
+    def renew(cls, id, leased_at, **values):
+        """
+        lease 를 가진 프로세스가 진행 상황 (values) 을 저장하고 lease 를 연장한 뒤 커밋
+        새 lease 를 반환하고, 다른 프로세스가 작업을 가져갔다면 저장하지 않고 None 을 반환
+        """
+        now = cls.get_lease_time()
+        result = db.session.execute(
+            update(cls)
+            .where(cls.id == id, cls.updated_at == leased_at)
+            .values(updated_at=now, **values)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        return now if result.rowcount else None
+
+    @classmethod
+    def request_stop(cls, id):
+        """
+        실행 중인 발송 작업을 paused 상태로 변경
+        작업을 가져간 프로세스는 현재 묶음의 발송을 마친 뒤 상태를 확인하고 중단
+        """
+        db.session.execute(
+            update(cls)
+            .where(cls.id == id, cls.status == cls.RUNNING)
+            .values(status=cls.PAUSED)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+
+    @staticmethod
+    def find_recipients(after_user_id, limit):
+        """
+        after_user_id 다음 사용자부터 limit 명을, 현재 시즌에 받은 쪽지 개수와 함께 조회
+        Message 테이블을 GROUP BY 하지 않고 (현재 시즌의) 집계를 함께 읽어
+        쪽지를 받은 사용자와 받지 않은 사용자를 나눔
+        (id, username, email, message_count) 목록을 반환
+        """
+        return (
+            db.session.query(
+                UserModel.id,
+                UserModel.username,
+                UserModel.email,
+                func.coalesce(UserAggregateModel.message_count, 0),
+            )
+            .outerjoin(UserAggregateModel, UserAggregateModel.user_id == UserModel.id)
+            .filter(UserModel.id > after_user_id)
+            .order_by(UserModel.id)
+            .limit(limit)
+            .all()
+        )
+
+    def save_to_db(self):
+        """
+        발송 작업을 데이터베이스에 저장
+        """
+        self.updated_at = datetime.utcnow()
+        db.session.add(self)
+        commit()
+
+    def __repr__(self):
+        return f"<Campaign Object : {self.id} ({self.status})>"
@@ -1,6 +1,11 @@
-from sqlalchemy.orm import validates
+from datetime import datetime
 
-from api.db import db
+from sqlalchemy import and_, func, not_, or_, select, update
+from sqlalchemy.orm import joinedload, validates
+
+from api.cache import message_cache
+from api.db import after_commit, commit, db
+from api.utils.korean_datetime import get_current_season
 
 
 class MessageModel(db.Model):
@@ -13,9 +18,18 @@ class MessageModel(db.Model):
     amount = 돈의 양
     is_moneybag = 봉투 여부 (사용자는 봉투와 함게 5000원을 전달할 수도 있고,
                             봉투와 함께 5001원을 전달할 수 있음)
+    season = 쪽지가 작성된 시즌 (연도), 조회는 현재 시즌의 쪽지만 대상으로 함
     """
 
     __tablename__ = "Message"
+    __table_args__ = (
+        # 받은 쪽지 목록 조회 (user_id 로 필터링, id 역순 정렬)
+        db.Index("ix_Message_user_id_id", "user_id", "id"),
+        # 현재 시즌의 받은 쪽지 목록 조회, 끝난 시즌의 보관 (시즌별 파티션 역할)
+        db.Index("ix_Message_season_user_id_id", "season", "user_id", "id"),
+        # 탈퇴하는 사용자가 작성한 쪽지의 수신자 조회
+        db.Index("ix_Message_author_id_user_id", "author_id", "user_id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     message = db.Column(db.String(150), nullable=False)
@@ -38,24 +52,237 @@ class MessageModel(db.Model):
         db.ForeignKey("User.id", ondelete="CASCADE"),
         nullable=True,
     )
+    season = db.Column(db.Integer, nullable=False, default=get_current_season)
+
+    # 돈봉투가 아닌 쪽지에 담을 수 있는 화폐 단위
+    MONEY_TYPES = [100, 500, 1000, 5000, 10000, 50000, 99999]
 
     def __init__(self, **kwargs):
         super(MessageModel, self).__init__(**kwargs)
-        MONEY_TYPES = [100, 500, 1000, 5000, 10000, 50000, 99999]
-        if self.is_moneybag == False and not self.amount in MONEY_TYPES:
+        if self.is_moneybag == False and not self.amount in self.MONEY_TYPES:
             raise ValueError("화폐단위에 벗어난 액수를 선택하려면 돈봉투를 사용하세요.")
 
     @property
     def money_image_name(self):
-        if self.is_moneybag:
+        return self.get_money_image_name(self.is_moneybag, self.amount)
+
+    @staticmethod
+    def get_money_image_name(is_moneybag, amount):
+        if is_moneybag:
             return "Money_99999.png"
         else:
-            return f"Money_{self.amount}.png"
+            return f"Money_{amount}.png"
 
     @classmethod
     def find_all(cls):
         return cls.query.all()
 
+    @classmethod
+    def received_query(cls, user_id):
+        """
+        특정 유저가 받은 쪽지를 작성자와 함께 최신순으로 조회하는 쿼리
+        """
+        return (
+            cls.query.options(joinedload(cls.author))
+            .filter(cls.season == get_current_season(), cls.user_id == user_id)
+            .order_by(cls.id.desc())
+        )
+
+    @classmethod
+    def received_by_keyset_query(cls, user_id, direction, message_id, limit):
+        """
+        OFFSET 없이 id 를 기준으로 특정 유저가 받은 쪽지 목록을 조회하는 쿼리
+        direction 이 "prev" 인 경우에는 오래된 순으로 정렬됨
+        """
+        query = cls.received_query(user_id)
+        if direction == "prev":
+            query = (
+                query.filter(cls.id > message_id).order_by(None).order_by(cls.id.asc())
+            )
+        elif message_id is not None:
+            query = query.filter(cls.id < message_id)
+        return query.limit(limit)
+
+    @classmethod
+    def find_received_by_keyset(cls, user_id, direction, message_id, limit):
+        """
+        OFFSET 없이 id 를 기준으로 특정 유저가 받은 쪽지 목록을 조회
+        direction 이 "next" 이면 message_id 보다 오래된 쪽지를,
+        "prev" 이면 message_id 보다 최신 쪽지를 최신순으로 반환
+        """
+        messages = cls.received_by_keyset_query(
+            user_id, direction, message_id, limit
+        ).all()
+        if direction == "prev":
+            return messages[::-1]
+        return messages
+
+    @classmethod
+    def received_rows_query(cls, user_id):
+        """
+        특정 유저가 받은 쪽지를 목록 응답에 필요한 컬럼과 작성자 이름만 최신순으로 조회하는 쿼리
+        ORM 객체를 만들지 않고 Core 로 실행됨
+        """
+        from api.models.user import UserModel
+
+        message, user = cls.__table__, UserModel.__table__
+        return (
+            select(
+                message.c.id,
+                message.c.message,
+                message.c.amount,
+                message.c.is_moneybag,
+                user.c.username.label("author_name"),
+            )
+            .select_from(message.outerjoin(user, message.c.author_id == user.c.id))
+            .where(
+                message.c.season == get_current_season(), message.c.user_id == user_id
+            )
+            .order_by(message.c.id.desc())
+        )
+
+    @classmethod
+    def find_received_rows_by_page(cls, user_id, page, per_page):
+        """
+        received_rows_query 로 page 번째 목록과 전체 쪽지 수를 조회
+        Flask-SQLAlchemy 의 paginate(error_out=False) 와 같은 결과를 반환
+
+        Returns:
+            tuple: (쪽지 row 목록, 전체 쪽지 수)
+        """
+        rows = db.session.execute(
+            cls.received_rows_page_query(user_id, page, per_page)
+        ).all()
+        total = db.session.execute(cls.received_count_query(user_id)).scalar()
+        return rows, total
+
+    @classmethod
+    def received_rows_page_query(cls, user_id, page, per_page):
+        return (
+            cls.received_rows_query(user_id)
+            .limit(per_page)
+            .offset((page - 1) * per_page)
+        )
+
+    @classmethod
+    def received_count_query(cls, user_id):
+        """
+        특정 유저가 현재 시즌에 받은 쪽지 수를 조회하는 쿼리 (Core)
+        """
+        return (
+            select(func.count())
+            .select_from(cls.__table__)
+            .where(
+                cls.__table__.c.season == get_current_season(),
+                cls.__table__.c.user_id == user_id,
+            )
+        )
+
+    @classmethod
+    def received_rows_by_keyset_query(cls, user_id, direction, message_id, limit):
+        """
+        received_by_keyset_query 와 같은 조건의 received_rows_query
+        """
+        id_column = cls.__table__.c.id
+        query = cls.received_rows_query(user_id)
+        if direction == "prev":
+            query = (
+                query.where(id_column > message_id)
+                .order_by(None)
+                .order_by(id_column.asc())
+            )
+        elif message_id is not None:
+            query = query.where(id_column < message_id)
+        return query.limit(limit)
+
+    @classmethod
+    def find_received_rows_by_keyset(cls, user_id, direction, message_id, limit):
+        """
+        find_received_by_keyset 과 같은 목록을 received_rows_query 로 조회
+        """
+        rows = db.session.execute(
+            cls.received_rows_by_keyset_query(user_id, direction, message_id, limit)
+        ).all()
+        if direction == "prev":
+            return rows[::-1]
+        return rows
+
+    @classmethod
+    def finished_seasons(cls):
+        """
+        Message 테이블에 남아있는, 현재 시즌 이전의 시즌 목록
+        """
+        return [
+            season
+            for (season,) in db.session.query(cls.season)
+            .filter(cls.season < get_current_season())
+            .distinct()
+            .order_by(cls.season)
+        ]
+
+    @classmethod
+    def find_archive_chunk(cls, season, after, limit):
+        """
+        시즌의 쪽지를 (user_id, id) 순서로 after 다음부터 limit 개 조회 (작성자 닉네임 포함)
+        after 는 이전 묶음의 마지막 (user_id, id) 이며, None 이면 처음부터 조회
+        """
+        from api.models.user import UserModel
+
+        message, user = cls.__table__, UserModel.__table__
+        query = (
+            select(
+                message.c.id,
+                message.c.user_id,
+                message.c.author_id,
+                user.c.username.label("author_name"),
+                message.c.message,
+                message.c.amount,
+                message.c.is_moneybag,
+            )
+            .select_from(message.outerjoin(user, message.c.author_id == user.c.id))
+            .where(message.c.season == season, message.c.user_id.isnot(None))
+            .order_by(message.c.user_id, message.c.id)
+            .limit(limit)
+        )
+        if after is not None:
+            query = query.where(cls.key_after(after))
+        return db.session.execute(query).all()
+
+    @classmethod
+    def key_after(cls, key):
+        """
+        (user_id, id) 가 key 보다 뒤에 있는 쪽지의 조건
+        """
+        user_id, id = key
+        return or_(
+            cls.__table__.c.user_id > user_id,
+            and_(cls.__table__.c.user_id == user_id, cls.__table__.c.id > id),
+        )
+
+    @classmethod
+    def delete_archived(cls, season, until):
+        """
+        보관을 마친 시즌의 쪽지 중 (user_id, id) 가 until 까지인 쪽지를 삭제 (커밋하지 않음)
+        삭제한 쪽지의 (id, user_id) 목록을 반환
+        """
+        condition = and_(cls.__table__.c.season == season, not_(cls.key_after(until)))
+        rows = db.session.execute(
+            select(cls.__table__.c.id, cls.__table__.c.user_id).where(condition)
+        ).all()
+        db.session.execute(cls.__table__.delete().where(condition))
+        return rows
+
+    @classmethod
+    def recipient_ids_query(cls, author_id):
+        """
+        특정 유저가 작성한 쪽지를 받은 (본인을 제외한) 유저들의 id 를 조회하는 쿼리
+        """
+        return (
+            db.session.query(cls.user_id)
+            .filter(cls.author_id == author_id, cls.user_id != author_id)
+            .distinct()
+        )
+
     @classmethod
     def find_by_id(cls, id):
         """
@@ -63,19 +290,169 @@ class MessageModel(db.Model):
         """
         return cls.query.filter_by(id=id).first()
 
+    @classmethod
+    def find_received_with_author(cls, user_id, id):
+        """
+        데이터베이스에서 user_id 가 받은 쪽지 중 id 로 특정 쪽지를 찾으면서, 작성자도 같은 쿼리로 함께 조회
+        다른 유저가 받은 쪽지라면 None 을 반환
+        """
+        return cls.received_with_author_query(user_id, id).first()
+
+    @classmethod
+    def received_with_author_query(cls, user_id, id):
+        return cls.query.options(joinedload(cls.author)).filter_by(
+            id=id, user_id=user_id, season=get_current_season()
+        )
+
+    @classmethod
+    def ids_by_user_query(cls, user_id, include_received=True):
+        """
+        특정 유저가 작성한 (include_received 이면 받은 쪽지도 포함) 쪽지의 id 를 조회하는 쿼리
+        """
+        condition = cls.author_id == user_id
+        if include_received:
+            condition = or_(condition, cls.user_id == user_id)
+        return db.session.query(cls.id).filter(condition)
+
+    @staticmethod
+    def get_detail_cache_key(id):
+        """
+        쪽지 상세 응답 캐시의 키
+        """
+        return f"message-detail:{id}"
+
+    @classmethod
+    def invalidate_detail_cache(cls, *ids):
+        """
+        쪽지 상세 응답 캐시에서 해당 쪽지들을 제거
+        """
+        message_cache.delete(*[cls.get_detail_cache_key(id) for id in ids])
+
     def save_to_db(self):
         """
         쪽지를 데이터베이스에 저장
+        새로 작성된 쪽지라면 수신자의 집계도 같은 트랜잭션에서 갱신
         """
+        from api.models.user import UserAggregateModel, UserModel
+
+        is_new = self.id is None
+        user_id = self.user_id
         db.session.add(self)
-        db.session.commit()
+        if is_new:
+            db.session.flush()
+            UserAggregateModel.add_message(self)
+        commit()
+        if is_new:
+            after_commit(lambda: UserModel.invalidate_info_cache(user_id))
+
+    @classmethod
+    def save_all(cls, messages):
+        """
+        새 쪽지 여러 개를 한 트랜잭션에서 저장하고, 수신자들의 집계도 함께 갱신
+        """
+        from api.models.user import UserAggregateModel, UserModel
+
+        db.session.add_all(messages)
+        db.session.flush()
+        totals = {}
+        for message in messages:
+            total_amount, message_count, last_message_id = totals.get(
+                message.user_id, (0, 0, 0)
+            )
+            totals[message.user_id] = (
+                total_amount + message.amount,
+                message_count + 1,
+                max(last_message_id, message.id),
+            )
+        UserAggregateModel.add_batch(totals)
+        commit()
+        after_commit(lambda: UserModel.invalidate_info_cache(*totals))
+
+    @classmethod
+    def bulk_save(cls, rows):
+        """
+        여러 쪽지를 executemany 로 한 번에 저장하고, 수신자들의 집계도 같은 트랜잭션에서 갱신
+        rows 는 user_id, author_id, message, amount, is_moneybag 을 가진 dict 의 목록
+        """
+        from api.models.user import UserAggregateModel, UserModel
+
+        db.session.execute(cls.__table__.insert(), rows)
+        totals = {}
+        for row in rows:
+            total_amount, message_count = totals.get(row["user_id"], (0, 0))
+            totals[row["user_id"]] = (total_amount + row["amount"], message_count + 1)
+        last_message_ids = dict(
+            db.session.query(cls.user_id, func.max(cls.id))
+            .filter(cls.user_id.in_(totals))
+            .group_by(cls.user_id)
+        )
+        UserAggregateModel.add_batch(
+            {
+                user_id: (total_amount, message_count, last_message_ids[user_id])
+                for user_id, (total_amount, message_count) in totals.items()
+            }
+        )
+        commit()
+        after_commit(lambda: UserModel.invalidate_info_cache(*totals))
 
     def delete_from_db(self):
         """
         쪽지를 데이터베이스에서 삭제
+        수신자의 집계도 같은 트랜잭션에서 다시 계산
         """
+        from api.models.user import UserAggregateModel, UserModel
+
+        id, user_id = self.id, self.user_id
         db.session.delete(self)
-        db.session.commit()
+        db.session.flush()
+        UserAggregateModel.rebuild([user_id])
+        commit()
+        after_commit(lambda: UserModel.invalidate_info_cache(user_id))
+        after_commit(lambda: self.invalidate_detail_cache(id))
 
     def __repr__(self):
         return f"<Message Object : {self.message}>"
+
+
+class MessageWriteCheckpointModel(db.Model):
+    """
+    쓰기 버퍼의 WAL 파일별로, 데이터베이스에 저장을 마친 마지막 순번
+
+    wal_id = WAL 파일의 id
+    last_sequence = 저장을 마친 마지막 기록의 순번
+    쪽지를 저장하는 트랜잭션에서 함께 갱신하므로, WAL 을 다시 적용할 때
+    이미 저장된 기록을 건너뛸 수 있습니다.
+    """
+
+    __tablename__ = "MessageWriteCheckpoint"
+
+    wal_id = db.Column(db.String(32), primary_key=True)
+    last_sequence = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    @classmethod
+    def get_last_sequence(cls, wal_id):
+        checkpoint = cls.query.get(wal_id)
+        return checkpoint.last_sequence if checkpoint else 0
+
+    @classmethod
+    def advance(cls, wal_id, last_sequence):
+        """
+        저장을 마친 마지막 순번을 기록 (커밋하지 않음)
+        """
+        result = db.session.execute(
+            update(cls)
+            .where(cls.wal_id == wal_id)
+            .values(last_sequence=last_sequence, updated_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            db.session.add(cls(wal_id=wal_id, last_sequence=last_sequence))
+
+    @classmethod
+    def delete(cls, wal_id):
+        """
+        다 적용한 WAL 파일의 기록을 삭제
+        """
+        cls.query.filter_by(wal_id=wal_id).delete()
+        commit()
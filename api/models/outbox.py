@@ -0,0 +1,129 @@
+from datetime import datetime, timedelta
+
+from flask_mail import Message
+from sqlalchemy import and_, func, update
+
+from api.db import db
+from api.utils.mail import SENDER
+
+
+class EmailOutboxModel(db.Model):
+    """
+    발송 대기 중인 메일 모델
+    요청을 처리하는 트랜잭션 안에서 추가되고, 백그라운드 워커가 꺼내서 발송
+
+    status = pending (발송 대기) / sending (워커가 가져감) / sent (발송 완료) / dead (재시도 초과)
+    attempts = 발송 시도 횟수
+    next_attempt_at = pending 이면 다음 발송 시도 시각,
+                      sending 이면 워커가 응답이 없을 때 다시 가져갈 수 있게 되는 시각
+    """
+
+    __tablename__ = "EmailOutbox"
+    __table_args__ = (
+        db.Index("ix_EmailOutbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    DEAD = "dead"
+
+    id = db.Column(db.Integer, primary_key=True)
+    recipient = db.Column(db.String(80), nullable=False)
+    subject = db.Column(db.String(200), nullable=False)
+    html = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(10), nullable=False, default=PENDING)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_error = db.Column(db.String(500), nullable=True)
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    @classmethod
+    def queue(cls, recipient, subject, html):
+        """
+        메일을 발송 대기열에 추가 (커밋하지 않음)
+        """
+        email = cls(recipient=recipient, subject=subject, html=html)
+        db.session.add(email)
+        return email
+
+    @classmethod
+    def claim(cls, limit, lease_seconds):
+        """
+        발송할 차례가 된 메일을 최대 limit 개 가져가고, sending 상태로 변경한 뒤 커밋
+        여러 워커가 동시에 가져가더라도, 조건부 UPDATE 에 성공한 워커만 메일을 가져감
+        """
+        now = datetime.utcnow()
+        claimable = and_(
+            cls.status.in_([cls.PENDING, cls.SENDING]),
+            cls.next_attempt_at <= now,
+        )
+        candidate_ids = [
+            id
+            for (id,) in db.session.query(cls.id)
+            .filter(claimable)
+            .order_by(cls.next_attempt_at)
+            .limit(limit)
+        ]
+        claimed_ids = []
+        for id in candidate_ids:
+            result = db.session.execute(
+                update(cls)
+                .where(cls.id == id, claimable)
+                .values(
+                    status=cls.SENDING,
+                    next_attempt_at=now + timedelta(seconds=lease_seconds),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount:
+                claimed_ids.append(id)
+        db.session.commit()
+        if not claimed_ids:
+            return []
+        return cls.query.filter(cls.id.in_(claimed_ids)).order_by(cls.id).all()
+
+    @classmethod
+    def count_by_status(cls):
+        """
+        상태별 메일 개수
+        """
+        return dict(
+            db.session.query(cls.status, func.count(cls.id)).group_by(cls.status)
+        )
+
+    def to_message(self):
+        return Message(
+            self.subject,
+            sender=SENDER,
+            recipients=[self.recipient],
+            html=self.html,
+        )
+
+    def mark_sent(self):
+        """
+        발송 완료로 변경 (커밋하지 않음)
+        """
+        self.status = self.SENT
+        self.attempts += 1
+        self.sent_at = datetime.utcnow()
+        self.last_error = None
+
+    def mark_failed(self, error, max_attempts, backoff_seconds):
+        """
+        발송 실패를 기록 (커밋하지 않음)
+        재시도할 때마다 대기 시간을 두 배로 늘리고, max_attempts 번 실패하면 dead 로 변경
+        """
+        self.attempts += 1
+        self.last_error = str(error)[:500]
+        if self.attempts >= max_attempts:
+            self.status = self.DEAD
+            return
+        self.status = self.PENDING
+        self.next_attempt_at = datetime.utcnow() + timedelta(
+            seconds=backoff_seconds * 2 ** (self.attempts - 1)
+        )
+
+    def __repr__(self):
+        return f"<EmailOutbox Object : {self.recipient} ({self.status})>"
@@ -1,20 +1,29 @@
 import hashlib
+import uuid
+from datetime import datetime
 
-from flask import current_app, render_template, request, url_for
+from flask import render_template
+from flask_jwt_extended import decode_token
 from flask_login import UserMixin
-from flask_mail import Mail, Message
-from werkzeug.security import generate_password_hash
+from sqlalchemy import case, func, inspect, select
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.orm import contains_eager, joinedload
+from sqlalchemy.orm.util import identity_key
 
-from api.db import db
+from api.cache import cache
+from api.db import after_commit, commit, db
 from api.models.message import MessageModel
+from api.models.outbox import EmailOutboxModel
+from api.utils.korean_datetime import get_current_season
+from api.utils.password import password_hasher
 
 
 class UserModel(db.Model, UserMixin):
     __tablename__ = "User"
 
     id = db.Column(db.Integer, primary_key=True)
-    username = db.Column(db.String(20), nullable=False, unique=False)
-    password = db.Column(db.String(102), nullable=False)
+    username = db.Column(db.String(20), nullable=False, unique=False, index=True)
+    password = db.Column(db.String(255), nullable=False)
     email = db.Column(db.String(80), nullable=False, unique=True)
     date_joined = db.Column(db.DateTime, server_default=db.func.now())
     message_set = db.relationship(
@@ -28,75 +37,152 @@ class UserModel(db.Model, UserMixin):
     is_admin = db.Column(db.Boolean, default=False)
 
     def create_user(self):
-        self.password = generate_password_hash(self.password)
+        self.password = password_hasher.hash(self.password)
         self.save_to_db()
         return self
 
-    def send_email(self):
-        msg = Message(
-            f"[Money For Rabbit] - {self.username} 님, 인증을 완료해 주세요.",
-            sender="moneyforrabbit@5nonymous.tk",
-            recipients=[self.email],
-        )
+    def check_password(self, password):
+        """
+        비밀번호를 검증
+        현재 설정과 다른 방식이나 비용으로 만들어진 해시라면, 새 해시로 교체 (커밋하지 않음)
+        """
+        if not password_hasher.verify(self.password, password):
+            return False
+        if password_hasher.needs_rehash(self.password):
+            self.password = password_hasher.hash(password)
+        return True
+
+    def queue_confirmation_email(self):
+        """
+        인증 메일을 발송 대기열에 추가 (커밋하지 않음)
+        실제 발송은 백그라운드 워커가 처리
+        """
         hashed_email = hashlib.sha256(self.email.encode()).hexdigest()
-        msg.html = render_template(
-            "email-confirmation-template.html",
-            hashed_email=hashed_email,
-            user_id=self.id,
+        EmailOutboxModel.queue(
+            recipient=self.email,
+            subject=f"[Money For Rabbit] - {self.username} 님, 인증을 완료해 주세요.",
+            html=render_template(
+                "email-confirmation-template.html",
+                hashed_email=hashed_email,
+                user_id=self.id,
+            ),
         )
-        with current_app.app_context():
-            mail = Mail()
-            mail.send(msg)
+
+    def register(self):
+        """
+        새 사용자를 저장하면서, 같은 트랜잭션에서 인증 메일을 발송 대기열에 추가
+        """
+        db.session.add(self)
+        db.session.flush()
+        self.queue_confirmation_email()
+        commit()
 
     @property
     def total_amount(self):
         """
         사용자가 받은 금액의 합계
+        쪽지를 하나도 받지 않은 사용자는 집계 레코드가 없으므로 0 을 반환
         """
-        money_list = [message.amount for message in self.message_set]
-        return sum(money_list)
+        return self.aggregate.total_amount if self.aggregate else 0
 
     @property
     def message_set_count(self):
         """
         사용자가 받은 메시지 개수
         """
-        return len(self.message_set.all())
+        return self.aggregate.message_count if self.aggregate else 0
+
+    @classmethod
+    def by_username_query(cls, username):
+        return cls.query.filter_by(username=username)
 
     @classmethod
     def find_by_username(cls, username):
         """
         데이터베이스에서 이름으로 특정 사용자 찾기
         """
-        return cls.query.filter_by(username=username).first()
+        return cls.by_username_query(username).first()
+
+    @classmethod
+    def by_email_query(cls, email):
+        return cls.query.filter_by(email=email)
 
     @classmethod
     def find_by_email(cls, email):
         """
         데이터베이스에서 이메일로 특정 사용자 찾기
         """
-        return cls.query.filter_by(email=email).first()
+        return cls.by_email_query(email).first()
+
+    @classmethod
+    def by_id_query(cls, id):
+        return cls.query.filter_by(id=id)
 
     @classmethod
     def find_by_id(cls, id):
         """
         데이터베이스에서 id 로 특정 사용자 찾기
         """
-        return cls.query.filter_by(id=id).first()
+        return cls.by_id_query(id).first()
+
+    @classmethod
+    def get(cls, id):
+        """
+        id 로 특정 사용자 찾기
+        같은 요청 안에서 이미 불러온 사용자라면 쿼리 없이 세션의 identity map 에서 반환
+        """
+        return db.session.get(cls, int(id), options=[joinedload(cls.aggregate)])
+
+    @classmethod
+    def many_query(cls, ids):
+        """
+        여러 사용자를 집계와 함께 조회하는 쿼리 (get, get_many 가 identity map 에 없을 때 실행)
+        """
+        return cls.query.options(joinedload(cls.aggregate)).filter(cls.id.in_(ids))
+
+    @classmethod
+    def get_many(cls, ids):
+        """
+        여러 사용자를 {id: 사용자} 로 반환
+        identity map 에 없는 (또는 만료된) 사용자만 하나의 IN 쿼리로 조회
+        """
+        ids = {int(id) for id in ids}
+        users = {}
+        for id in ids:
+            user = db.session.identity_map.get(identity_key(cls, id))
+            if user is not None and not inspect(user).expired_attributes:
+                users[id] = user
+        missing = ids - users.keys()
+        if missing:
+            for user in cls.many_query(missing):
+                users[user.id] = user
+        return users
 
     def save_to_db(self):
         """
         사용자를 데이터베이스에 저장
+        unit_of_work 블록 안에서는 커밋하지 않고 블록이 끝날 때 함께 커밋
         """
         db.session.add(self)
-        db.session.commit()
+        commit()
 
     def delete_from_db(self):
         """
         사용자를 데이터베이스에서 삭제
+        삭제되는 사용자가 작성한 쪽지도 함께 삭제되므로,
+        해당 쪽지를 받은 사용자들의 집계도 같은 트랜잭션에서 다시 계산
         """
+        recipient_ids = [
+            user_id for (user_id,) in MessageModel.recipient_ids_query(self.id)
+        ]
+        message_ids = [id for (id,) in MessageModel.ids_by_user_query(self.id)]
+        user_id = self.id
         db.session.delete(self)
-        db.session.commit()
+        db.session.flush()
+        UserAggregateModel.rebuild(recipient_ids)
+        commit()
+        after_commit(lambda: self.invalidate_info_cache(user_id, *recipient_ids))
+        after_commit(lambda: MessageModel.invalidate_detail_cache(*message_ids))
 
     def update_user_info(self, data):
         """
@@ -104,12 +190,334 @@ class UserModel(db.Model, UserMixin):
         """
         self.username = data
         self.save_to_db()
+        self.invalidate_author_caches()
+
+    def invalidate_author_caches(self):
+        """
+        닉네임이 바뀐 경우, 커밋이 끝난 뒤 사용자 정보와 작성자 닉네임이 담긴 캐시를 무효화
+        (작성한 쪽지의 상세 응답, 받은 사용자들의 쪽지 목록과 목록 버전)
+        """
+        user_id = self.id
+        message_ids = [
+            id
+            for (id,) in MessageModel.ids_by_user_query(user_id, include_received=False)
+        ]
+        recipient_ids = [id for (id,) in MessageModel.recipient_ids_query(user_id)]
+        after_commit(lambda: self.invalidate_info_cache(user_id, *recipient_ids))
+        after_commit(lambda: MessageModel.invalidate_detail_cache(*message_ids))
+
+    @staticmethod
+    def get_info_cache_key(user_id):
+        """
+        공개 사용자 정보 캐시의 키
+        """
+        return f"user-info:{user_id}"
+
+    @staticmethod
+    def get_version_cache_key(user_id):
+        """
+        사용자 버전 정보 캐시의 키
+        """
+        return f"user-version:{user_id}"
+
+    @staticmethod
+    def get_list_version_cache_key(user_id):
+        """
+        받은 쪽지 목록 버전 캐시의 키
+        """
+        return f"message-list-version:{user_id}"
+
+    @staticmethod
+    def get_message_list_cache_key(user_id, mode):
+        """
+        받은 쪽지 목록 첫 페이지 캐시의 키 (mode 는 "page" 또는 "cursor")
+        """
+        return f"message-list:{user_id}:{mode}"
+
+    @classmethod
+    def invalidate_info_cache(cls, *user_ids):
+        """
+        공개 사용자 정보, 버전 정보, 받은 쪽지 목록 첫 페이지 캐시에서 해당 사용자들을 제거
+        목록 버전도 함께 제거하므로, 다음 조회 때 새 목록 버전이 만들어짐
+        """
+        cache.delete(
+            *[cls.get_info_cache_key(user_id) for user_id in user_ids],
+            *[cls.get_version_cache_key(user_id) for user_id in user_ids],
+            *[cls.get_list_version_cache_key(user_id) for user_id in user_ids],
+            *[
+                cls.get_message_list_cache_key(user_id, mode)
+                for user_id in user_ids
+                for mode in ["page", "cursor"]
+            ],
+        )
+
+    @classmethod
+    def get_list_version(cls, user_id, ttl=None):
+        """
+        받은 쪽지 목록의 버전
+        목록 캐시를 무효화할 때마다 (쪽지 작성 / 삭제, 작성자 닉네임 변경, 시즌 보관, 관리자 수정)
+        새 값으로 바뀌므로, 집계값이 같아도 작성자 닉네임이 바뀐 목록을 구분할 수 있음
+        캐시에서 밀려난 뒤 다시 세면 이전 ETag 와 같아질 수 있으므로, 숫자 대신 임의의 값을 사용
+        """
+        cache_key = cls.get_list_version_cache_key(user_id)
+        list_version = cache.get(cache_key)
+        if list_version is None:
+            list_version = uuid.uuid4().hex[:16]
+            cache.set(cache_key, list_version, ttl=ttl)
+        return list_version
+
+    @classmethod
+    def version_query(cls, user_id):
+        """
+        버전 정보에 필요한 컬럼만 조회하는 쿼리
+        """
+        return (
+            db.session.query(
+                cls.username,
+                UserAggregateModel.last_message_id,
+                UserAggregateModel.message_count,
+            )
+            .outerjoin(UserAggregateModel, UserAggregateModel.user_id == cls.id)
+            .filter(cls.id == user_id)
+        )
+
+    @classmethod
+    def get_version(cls, user_id, ttl=None):
+        """
+        사용자 정보와 받은 쪽지 목록이 바뀌었는지 판단하기 위한 버전 정보
+        (닉네임, 마지막으로 받은 쪽지 id, 받은 쪽지 개수, 목록 버전) 를 반환
+        전체 행이 아닌 필요한 컬럼만 조회하며, 결과는 정보 캐시와 함께 무효화됨
+        (ttl 을 지정하지 않으면 CACHE_DEFAULT_TTL 동안 캐시)
+        존재하지 않는 사용자라면 None 을 반환
+        """
+        cache_key = cls.get_version_cache_key(user_id)
+        version = cache.get(cache_key)
+        if version is None:
+            row = cls.version_query(user_id).first()
+            if row is None:
+                return None
+            version = [row[0], row[1], row[2] or 0, cls.get_list_version(user_id, ttl)]
+            cache.set(cache_key, version, ttl=ttl)
+        return tuple(version)
 
     def __repr__(self):
         return f"<User Object : {self.username}>"
 
 
+class UserAggregateModel(db.Model):
+    """
+    사용자가 현재 시즌에 받은 쪽지에 대한 집계 모델
+    (시즌이 바뀌면 flask archiveseason 또는 flask reconcileaggregates 로 다시 계산)
+
+    user_id = 집계 대상 사용자의 id
+    total_amount = 받은 금액의 합계
+    message_count = 받은 쪽지 개수
+    last_message_id = 마지막으로 받은 쪽지의 id
+    """
+
+    __tablename__ = "UserAggregate"
+
+    user_id = db.Column(
+        db.Integer,
+        db.ForeignKey("User.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    user = db.relationship(
+        "UserModel",
+        backref=db.backref(
+            "aggregate",
+            uselist=False,
+            cascade="all, delete-orphan",
+        ),
+    )
+    total_amount = db.Column(db.BigInteger, nullable=False, default=0)
+    message_count = db.Column(db.Integer, nullable=False, default=0)
+    last_message_id = db.Column(db.Integer, nullable=True)
+
+    @classmethod
+    def busiest_user_ids_query(cls, limit):
+        """
+        받은 쪽지가 많은 순으로 limit 명의 사용자 id 를 조회하는 쿼리
+        """
+        return (
+            db.session.query(cls.user_id)
+            .filter(cls.message_count > 0)
+            .order_by(cls.message_count.desc(), cls.user_id)
+            .limit(limit)
+        )
+
+    @classmethod
+    def upsert_statement(cls):
+        """
+        집계 레코드가 없으면 만들고, 있으면 값을 더하는 INSERT 문
+        (MySQL 은 ON DUPLICATE KEY UPDATE, SQLite 는 ON CONFLICT DO UPDATE)
+        같은 사용자의 첫 쪽지가 동시에 쓰여져도 기본 키 충돌 없이 한 레코드에 더해짐
+        """
+        table = cls.__table__
+        if db.engine.dialect.name == "mysql":
+            statement = mysql.insert(table)
+            new = statement.inserted
+        else:
+            statement = sqlite.insert(table)
+            new = statement.excluded
+        values = {
+            "total_amount": table.c.total_amount + new.total_amount,
+            "message_count": table.c.message_count + new.message_count,
+            "last_message_id": case(
+                (
+                    table.c.last_message_id > new.last_message_id,
+                    table.c.last_message_id,
+                ),
+                else_=new.last_message_id,
+            ),
+        }
+        if isinstance(statement, mysql.Insert):
+            return statement.on_duplicate_key_update(**values)
+        return statement.on_conflict_do_update(
+            index_elements=[table.c.user_id], set_=values
+        )
+
+    @classmethod
+    def add_message(cls, message):
+        """
+        새 쪽지를 수신자의 집계에 반영 (커밋하지 않음)
+        동시에 쓰여지는 쪽지끼리 값을 덮어쓰지 않도록 upsert 문 안에서 더함
+        """
+        cls.add_batch({message.user_id: (message.amount, 1, message.id)})
+
+    @classmethod
+    def add_batch(cls, totals):
+        """
+        여러 사용자의 집계에 한 묶음의 쪽지를 반영 (커밋하지 않음)
+        totals = {user_id: (금액 합계, 쪽지 개수, 마지막 쪽지 id)}
+        upsert 문 하나를 executemany 로 실행
+        """
+        db.session.execute(
+            cls.upsert_statement(),
+            [
+                {
+                    "user_id": user_id,
+                    "total_amount": total_amount,
+                    "message_count": message_count,
+                    "last_message_id": last_message_id,
+                }
+                for user_id, (
+                    total_amount,
+                    message_count,
+                    last_message_id,
+                ) in totals.items()
+            ],
+        )
+
+    @classmethod
+    def calculate(cls, user_ids=None):
+        """
+        Message 테이블에서 현재 시즌의 실제 집계값을 계산
+        {user_id: (total_amount, message_count, last_message_id)} 형태로 반환
+        """
+        query = (
+            db.session.query(
+                MessageModel.user_id,
+                func.coalesce(func.sum(MessageModel.amount), 0),
+                func.count(MessageModel.id),
+                func.max(MessageModel.id),
+            )
+            .filter(MessageModel.season == get_current_season())
+            .group_by(MessageModel.user_id)
+        )
+        if user_ids is not None:
+            query = query.filter(MessageModel.user_id.in_(user_ids))
+        return {
+            user_id: (int(total_amount), message_count, last_message_id)
+            for user_id, total_amount, message_count, last_message_id in query
+        }
+
+    @classmethod
+    def rebuild_all(cls):
+        """
+        모든 사용자의 집계를 지우고, Message 테이블로부터 INSERT ... SELECT 한 번으로 다시 만듦
+        (커밋하지 않음) 대량으로 쪽지를 넣은 뒤에 사용
+        """
+        table = cls.__table__
+        db.session.execute(table.delete())
+        db.session.execute(
+            table.insert().from_select(
+                ["user_id", "total_amount", "message_count", "last_message_id"],
+                select(
+                    MessageModel.user_id,
+                    func.sum(MessageModel.amount),
+                    func.count(MessageModel.id),
+                    func.max(MessageModel.id),
+                )
+                .where(
+                    MessageModel.season == get_current_season(),
+                    MessageModel.user_id.isnot(None),
+                )
+                .group_by(MessageModel.user_id),
+            )
+        )
+
+    @classmethod
+    def rebuild(cls, user_ids):
+        """
+        주어진 사용자들의 집계를 Message 테이블로부터 다시 계산 (커밋하지 않음)
+        """
+        if not user_ids:
+            return
+        cls.reconcile(user_ids=user_ids)
+
+    @classmethod
+    def reconcile(cls, user_ids=None, dry_run=False):
+        """
+        저장된 집계와 Message 테이블의 실제 값을 비교하고, 어긋난 집계를 바로잡음 (커밋하지 않음)
+        어긋난 사용자마다 (user_id, 저장된 값, 실제 값) 튜플의 목록을 반환
+        """
+        actual = cls.calculate(user_ids=user_ids)
+        user_query = db.session.query(UserModel.id)
+        stored_query = cls.query
+        if user_ids is not None:
+            user_query = user_query.filter(UserModel.id.in_(user_ids))
+            stored_query = stored_query.filter(cls.user_id.in_(user_ids))
+        stored = {aggregate.user_id: aggregate for aggregate in stored_query}
+
+        drifts = []
+        for (user_id,) in user_query.order_by(UserModel.id):
+            expected = actual.get(user_id, (0, 0, None))
+            aggregate = stored.get(user_id)
+            current = (
+                (
+                    aggregate.total_amount,
+                    aggregate.message_count,
+                    aggregate.last_message_id,
+                )
+                if aggregate
+                else (0, 0, None)
+            )
+            if current == expected:
+                continue
+            drifts.append((user_id, current, expected))
+            if dry_run:
+                continue
+            if aggregate is None:
+                aggregate = cls(user_id=user_id)
+                db.session.add(aggregate)
+            (
+                aggregate.total_amount,
+                aggregate.message_count,
+                aggregate.last_message_id,
+            ) = expected
+        return drifts
+
+    def __repr__(self):
+        return f"<UserAggregate Object : {self.user_id}>"
+
+
 class RefreshTokenModel(db.Model):
+    """
+    사용자별 refresh token
+    토큰 원문 대신 고정 길이의 SHA-256 digest 를 저장하고 조회합니다.
+    """
+
     __tablename__ = "RefreshToken"
 
     id = db.Column(db.Integer, primary_key=True)
@@ -117,35 +525,80 @@ class RefreshTokenModel(db.Model):
         db.Integer,
         db.ForeignKey("User.id", ondelete="CASCADE"),
         nullable=True,
+        index=True,
     )
     user = db.relationship(
         "UserModel",
         backref=db.backref("token", cascade="all, delete-orphan"),
     )
-    refresh_token_value = db.Column(db.String(512), nullable=False, unique=True)
+    refresh_token_digest = db.Column(db.String(64), nullable=False, unique=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    @staticmethod
+    def get_digest(token):
+        """
+        토큰 원문의 SHA-256 digest (64자)
+        """
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def set_token(self, token):
+        """
+        새로 발급한 토큰의 digest 와 만료 시각을 저장 (커밋하지 않음)
+        """
+        self.refresh_token_digest = self.get_digest(token)
+        self.expires_at = datetime.utcfromtimestamp(decode_token(token)["exp"])
 
     def save_to_db(self):
         """
         토큰을 데이터베이스에 저장
         """
         db.session.add(self)
-        db.session.commit()
+        commit()
 
     def delete_from_db(self):
         """
         토큰을 데이터베이스에서 삭제
         """
         db.session.delete(self)
-        db.session.commit()
+        commit()
+
+    @classmethod
+    def user_by_token_query(cls, token):
+        return (
+            UserModel.query.join(UserModel.token)
+            .options(contains_eager(UserModel.token))
+            .filter(
+                cls.refresh_token_digest == cls.get_digest(token),
+                cls.expires_at > datetime.utcnow(),
+            )
+        )
 
     @classmethod
     def get_user_by_token(cls, token):
         """
         리프레시 토큰 값으로 user 객체를 얻어옴
+        토큰과 사용자를 한 번의 쿼리로 조회하고, 조회한 토큰은 user.token 에 채워둠
+        """
+        return cls.user_by_token_query(token).first()
+
+    @classmethod
+    def delete_expired(cls, chunk_size=1000, now=None):
+        """
+        만료된 토큰을 chunk_size 개씩 나누어 삭제하고, 삭제한 개수를 반환
+        한 번에 지우면 테이블이 오래 잠기므로, 묶음마다 커밋
         """
-        try:
-            user_id = cls.query.filter_by(refresh_token_value=token).first().user_id
-        except AttributeError:
-            return None
-        user = UserModel.find_by_id(id=user_id)
-        return user
+        now = now or datetime.utcnow()
+        deleted = 0
+        while True:
+            ids = [
+                id
+                for id, in db.session.query(cls.id)
+                .filter(cls.expires_at <= now)
+                .order_by(cls.expires_at)
+                .limit(chunk_size)
+            ]
+            if not ids:
+                return deleted
+            cls.query.filter(cls.id.in_(ids)).delete(synchronize_session=False)
+            db.session.commit()
+            deleted += len(ids)
@@ -5,17 +5,23 @@ from flask import (
     redirect,
     render_template,
     request,
+    send_file,
     session,
     current_app,
 )
 from flask_admin import AdminIndexView, expose
 from flask_admin.contrib.sqla import ModelView
 from flask_login import current_user, login_required, login_user, logout_user
-from flask_mail import Message, Mail
-from werkzeug.security import check_password_hash
+from sqlalchemy import inspect
 
+from api.cache import cache, message_cache
+from api.db import after_commit, db, unit_of_work
+from api.models.campaign import CampaignModel
 from api.models.message import MessageModel
-from api.models.user import UserModel
+from api.models.user import UserAggregateModel, UserModel
+from api.utils.campaign import CampaignRunner
+from api.utils.profiler import request_profiler
+from api.utils.slow_query import slow_query_log
 from api.utils.validation import NotValidDataException, validate_email
 
 admin_extra_view = Blueprint("admin_extra_view_bp", __name__, url_prefix="/mfr-admin")
@@ -31,8 +37,10 @@ def admin_login():
         except NotValidDataException as e:
             flash(str(e), category="error")
         user = UserModel.find_by_email(email)
-        if user and check_password_hash(user.password, password):
+        if user and user.check_password(password):
             if user.is_admin:  # 사용자가 admin 이면 로그인
+                if user in db.session.dirty:  # 비밀번호 해시가 새로 만들어졌다면 저장
+                    user.save_to_db()
                 session.permanent = True
                 login_user(user)
                 return redirect("/mfr-admin/")
@@ -52,53 +60,139 @@ def admin_logout():
     return redirect("/mfr-admin/login")
 
 
-@admin_extra_view.route("/send-alert-mail")
+@admin_extra_view.route("/send-alert-mail", methods=["GET", "POST"])
 @login_required
 def send_alert_mail():
     """
     회원가입한 모든 사용자에 대해서,
     1. 쪽지를 받은 사람 : 몇 명에게, 얼마를 받았는지
     2. 쪽지를 안 받은 사람 : 템플릿 그대로 뿌려줌
+    POST 요청은 발송 작업을 백그라운드에서 시작하고, 진행 상황 페이지로 이동합니다.
     """
     assert current_user.is_admin
-    users_not_received = []
-    users_received = []
-    for user in UserModel.query.all():
-        if user.message_set.all():
-            users_received.append(user)
-        else:
-            users_not_received.append(user)
-    for user in users_received:
-        msg = Message(
-            f"[Money For Rabbit] {user.username}님, 쪽지를 확인해 보세요!",
-            sender="moneyforrabbit@5nonymous.tk",
-            recipients=[user.email],
-        )
-        msg.html = render_template(
-            "received-alert-template.html",
-        )
-        with current_app.app_context():
-            mail = Mail()
-            mail.send(msg)
-    for user in users_not_received:
-        msg = Message(
-            f"[Money For Rabbit] {user.username}님, 쪽지 링크를 공유해 보세요!",
-            sender="moneyforrabbit@5nonymous.tk",
-            recipients=[user.email],
-        )
-        msg.html = render_template(
-            "no-received-alert-template.html",
-        )
-        with current_app.app_context():
-            mail = Mail()
-            mail.send(msg)
+    if request.method == "POST":
+        campaign = CampaignModel.create()
+        start_campaign(campaign.id)
+        return redirect(f"/mfr-admin/campaigns/{campaign.id}")
     return render_template(
-        "email-send-result.html",
-        users_received=users_received,
-        users_not_received=users_not_received,
+        "campaign-list.html",
+        campaigns=CampaignModel.find_recent(),
+        lease_seconds=current_app.config["MAIL_CAMPAIGN_LEASE_SECONDS"],
     )
 
 
+def start_campaign(campaign_id):
+    """
+    발송 작업을 데이터베이스에서 가져가는 데 성공하면 백그라운드에서 발송을 시작
+    """
+    leased_at = CampaignModel.claim(
+        campaign_id, current_app.config["MAIL_CAMPAIGN_LEASE_SECONDS"]
+    )
+    if leased_at is not None:
+        CampaignRunner(
+            current_app._get_current_object(), campaign_id, leased_at=leased_at
+        ).start()
+
+
+@admin_extra_view.route("/campaigns/<int:campaign_id>")
+@login_required
+def campaign_progress(campaign_id):
+    """
+    알림 메일 발송 작업의 진행 상황
+    """
+    assert current_user.is_admin
+    campaign = CampaignModel.find_by_id(campaign_id)
+    if not campaign:
+        return abort(404)
+    return render_template(
+        "campaign-progress.html",
+        campaign=campaign,
+        is_running=campaign.is_running(
+            current_app.config["MAIL_CAMPAIGN_LEASE_SECONDS"]
+        ),
+    )
+
+
+@admin_extra_view.route("/campaigns/<int:campaign_id>/resume", methods=["POST"])
+@login_required
+def resume_campaign(campaign_id):
+    """
+    중단된 알림 메일 발송 작업을 마지막으로 발송한 사용자 다음부터 이어서 발송
+    """
+    assert current_user.is_admin
+    campaign = CampaignModel.find_by_id(campaign_id)
+    if not campaign:
+        return abort(404)
+    # 다른 프로세스가 실행 중이거나 이미 끝난 작업은 가져가지 못함
+    start_campaign(campaign.id)
+    return redirect(f"/mfr-admin/campaigns/{campaign.id}")
+
+
+@admin_extra_view.route("/campaigns/<int:campaign_id>/stop", methods=["POST"])
+@login_required
+def stop_campaign(campaign_id):
+    """
+    실행 중인 알림 메일 발송 작업을 현재 묶음까지만 발송하고 중단
+    """
+    assert current_user.is_admin
+    CampaignModel.request_stop(campaign_id)
+    return redirect(f"/mfr-admin/campaigns/{campaign_id}")
+
+
+@admin_extra_view.route("/slow-queries", methods=["GET", "POST"])
+@login_required
+def slow_queries():
+    """
+    이 프로세스에서 기록된 느린 SQL 문을 형태별로 모아 전체 실행 시간이 긴 순서로 보여줌
+    POST 요청은 지금까지 모은 통계를 지움 (로그 파일은 그대로 유지)
+    """
+    assert current_user.is_admin
+    if request.method == "POST":
+        slow_query_log.clear()
+        return redirect("/mfr-admin/slow-queries")
+    return render_template(
+        "slow-query-list.html",
+        enabled=slow_query_log.enabled,
+        threshold_ms=slow_query_log.threshold_ms,
+        queries=slow_query_log.stats(),
+    )
+
+
+@admin_extra_view.route("/profiles")
+@login_required
+def profiles():
+    """
+    저장된 요청 프로파일 중 가장 느린 PROFILER_TOP_N 개와, 프로파일링을 요청할 헤더 값
+    """
+    assert current_user.is_admin
+    config = current_app.config
+    return render_template(
+        "profile-list.html",
+        enabled=request_profiler.enabled,
+        sample_rate=config["PROFILER_SAMPLE_RATE"],
+        header=config["PROFILER_HEADER"],
+        token=request_profiler.create_token(current_user.id),
+        token_max_age=config["PROFILER_TOKEN_MAX_AGE"],
+        profiles=request_profiler.list_profiles()[: config["PROFILER_TOP_N"]],
+    )
+
+
+@admin_extra_view.route("/profiles/<string:name>")
+@login_required
+def download_profile(name):
+    """
+    프로파일 파일 다운로드 (pstats, snakeviz 등으로 분석)
+    ?format=text 이면 누적 시간 순으로 정리한 내용을 보여줌
+    """
+    assert current_user.is_admin
+    path = request_profiler.get_path(name)
+    if path is None:
+        return abort(404)
+    if request.args.get("format") == "text":
+        return request_profiler.summarize(name), 200, {"Content-Type": "text/plain"}
+    return send_file(path, as_attachment=True, download_name=name)
+
+
 class AdminPermissionMixin:
     def is_accessible(self):
         return current_user.is_admin
@@ -120,10 +214,46 @@ class HomeAdminView(AdminPermissionMixin, AdminIndexView):
             "admin-indexview.html",
             user_count=user_count,
             message_count=message_count,
+            cache_stats=cache.stats(),
+            message_cache_stats=message_cache.stats(),
         )
 
 
-class UserAdminView(AdminPermissionMixin, ModelView):
+class UnitOfWorkModelViewMixin:
+    """
+    관리자 페이지의 수정과 삭제를 unit_of_work 블록 안에서 처리
+    삭제는 모델의 delete_from_db 를 거치므로, API 와 같이 집계를 같은 트랜잭션에서 다시 계산하고
+    커밋이 끝난 뒤 (after_commit) 캐시를 무효화함
+    """
+
+    def update_model(self, form, model):
+        try:
+            with unit_of_work():
+                form.populate_obj(model)
+                self._on_model_change(form, model, False)
+        except Exception as e:
+            if not self.handle_view_exception(e):
+                flash(f"수정하지 못했습니다. {e}", category="error")
+                current_app.logger.exception("관리자 페이지에서 수정하지 못했습니다.")
+            return False
+        self.after_model_change(form, model, False)
+        return True
+
+    def delete_model(self, model):
+        try:
+            with unit_of_work():
+                self.on_model_delete(model)
+                model.delete_from_db()
+        except Exception as e:
+            if not self.handle_view_exception(e):
+                flash(f"삭제하지 못했습니다. {e}", category="error")
+                current_app.logger.exception("관리자 페이지에서 삭제하지 못했습니다.")
+            return False
+        self.after_model_delete(model)
+        return True
+
+
+class UserAdminView(UnitOfWorkModelViewMixin, AdminPermissionMixin, ModelView):
     @login_required
     def is_accessible(self):
         return super().is_accessible()
@@ -133,8 +263,12 @@ class UserAdminView(AdminPermissionMixin, ModelView):
     column_searchable_list = ["username", "email", "id"]
     column_list = ["id", "username", "email", "email_confirmed", "is_admin"]
 
+    def on_model_change(self, form, model, is_created):
+        # 닉네임이 바뀌었을 수 있으므로, 작성자 닉네임이 담긴 캐시와 목록 버전을 커밋 후 무효화
+        model.invalidate_author_caches()
 
-class MessageAdminView(AdminPermissionMixin, ModelView):
+
+class MessageAdminView(UnitOfWorkModelViewMixin, AdminPermissionMixin, ModelView):
     @login_required
     def is_accessible(self):
         return super().is_accessible()
@@ -151,6 +285,18 @@ class MessageAdminView(AdminPermissionMixin, ModelView):
         "to",
     ]
 
+    def on_model_change(self, form, model, is_created):
+        # 금액이나 받는 사람이 바뀌었을 수 있으므로, 이전과 현재 수신자의 집계를 다시 계산
+        previous_users = inspect(model).attrs.user.history.deleted or ()
+        user_ids = {user.id for user in previous_users if user is not None}
+        db.session.flush()
+        user_ids.add(model.user_id)
+        user_ids.discard(None)
+        UserAggregateModel.rebuild(list(user_ids))
+        message_id = model.id
+        after_commit(lambda: UserModel.invalidate_info_cache(*user_ids))
+        after_commit(lambda: MessageModel.invalidate_detail_cache(message_id))
+
     def get_author_email(view, context, model, name):
         return model.author.email if model.user else None
 
@@ -2,6 +2,10 @@ from flask import current_app, jsonify
 from flask_jwt_extended import JWTManager
 from marshmallow import ValidationError
 
+from api.models.user import UserModel
+from api.revocation import token_revocation
+from api.utils.response import NOT_FOUND, REFRESH_TOKEN_ERROR
+
 with current_app.app_context():
     jwt = JWTManager(current_app)
 
@@ -27,3 +31,24 @@ with current_app.app_context():
             ),
             401,
         )
+
+    @jwt.token_in_blocklist_loader
+    def check_if_token_revoked(jwt_header, jwt_payload):
+        return token_revocation.is_revoked(jwt_payload)
+
+    @jwt.revoked_token_loader
+    def revoked_token_callback(jwt_header, jwt_payload):
+        if jwt_payload["type"] == "refresh":
+            return jsonify({"error": REFRESH_TOKEN_ERROR}), 401
+        return jsonify({"error": "폐기된 토큰입니다."}), 401
+
+    @jwt.user_lookup_loader
+    def user_lookup_callback(jwt_header, jwt_payload):
+        """
+        토큰의 사용자를 요청마다 한 번만 불러오고, get_current_user() 로 다시 사용
+        """
+        return UserModel.get(jwt_payload["sub"])
+
+    @jwt.user_lookup_error_loader
+    def user_lookup_error_callback(jwt_header, jwt_payload):
+        return jsonify({"error": NOT_FOUND.format("사용자")}), 404
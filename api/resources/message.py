@@ -2,6 +2,7 @@ from flask_jwt_extended import jwt_required
 from flask_restful import Resource
 
 from api.services.message import MessageService
+from api.utils.etag import conditional
 
 
 class MessageDetail(Resource):
@@ -16,9 +17,11 @@ class MessageDetail(Resource):
 class MessageList(Resource):
     @classmethod
     @jwt_required()
+    @conditional(MessageService.get_list_version)
     def get(cls, user_id):
         """
         유저를 특정한 다음, 해당 유저가 가지고 있는 모든 쪽지들의 목록을 조회
+        새 쪽지가 없다면 (If-None-Match 가 일치하면) 304 로 응답
         """
         return MessageService().list_view(user_id=user_id)
 
@@ -29,3 +32,23 @@ class MessageList(Resource):
         특정 유저에게 새로운 쪽지를 생성
         """
         return MessageService().write(user_id=user_id)
+
+
+class MessageBatch(Resource):
+    @classmethod
+    @jwt_required()
+    def post(cls):
+        """
+        여러 유저에게 새로운 쪽지를 한 번에 생성
+        """
+        return MessageService().write_batch()
+
+
+class MessageArchiveList(Resource):
+    @classmethod
+    @jwt_required()
+    def get(cls, user_id, season):
+        """
+        유저를 특정한 다음, 끝난 시즌에 받은 쪽지들의 목록을 보관 파일에서 조회
+        """
+        return MessageService().archive_list_view(user_id=user_id, season=season)
@@ -1,23 +1,25 @@
 from flask import redirect
 from flask.views import MethodView
-from flask_jwt_extended import get_jwt_identity, jwt_required
+from flask_jwt_extended import get_current_user, get_jwt_identity, jwt_required
 from flask_restful import Resource, request
 
 from api.models.user import RefreshTokenModel, UserModel
 from api.services.user import UserService
 from api.utils.confrimation import NotValidConfrimationException, check_user
+from api.utils.etag import conditional
 from api.utils.response import (FORBIDDEN, NOT_FOUND, REFRESH_TOKEN_ERROR,
                                 get_response)
 
 
 class UserInformation(Resource):
     @classmethod
+    @conditional(UserService.get_info_version)
     def get(cls, user_id):
-        """마이페이지 정보조회를 수행합니다."""
-        user = UserModel.find_by_id(user_id)
-        if not user:
-            return get_response(False, NOT_FOUND.format("사용자"), 404)
-        return UserService(user).get_info()
+        """
+        마이페이지 정보조회를 수행합니다.
+        정보가 바뀌지 않았다면 (If-None-Match 가 일치하면) 304 로 응답합니다.
+        """
+        return UserService().get_public_info(user_id)
 
     @classmethod
     @jwt_required()
@@ -26,8 +28,7 @@ class UserInformation(Resource):
         if get_jwt_identity() != user_id:
             return get_response(False, FORBIDDEN, 403)
         data = request.get_json()
-        user = UserModel.find_by_id(user_id)
-        return UserService(user).update_info(data)
+        return UserService(get_current_user()).update_info(data)
 
 
 class UserLogin(MethodView):
@@ -61,6 +62,18 @@ class RefreshToken(MethodView):
         return UserService(user).refresh_login()
 
 
+class UserLogout(Resource):
+    """
+    로그아웃을 처리합니다.
+    사용 중인 access token 을 폐기하고, 저장된 refresh token 을 삭제합니다.
+    """
+
+    @classmethod
+    @jwt_required()
+    def post(cls):
+        return UserService(get_current_user()).logout()
+
+
 class UserRegister(Resource):
     """회원가입을 처리합니다."""
 
@@ -83,10 +96,7 @@ class UserWithdraw(Resource):
         클라이언트 -> email, password (로그인과 동일)
         """
         data = request.get_json()
-        user = UserModel.find_by_id(get_jwt_identity())
-        if not user:
-            return get_response(False, NOT_FOUND.format("사용자"), 404)
-        return UserService(user).withdraw(data)
+        return UserService(get_current_user()).withdraw(data)
 
 
 class UserConfirm(Resource):
@@ -0,0 +1,32 @@
+from api.utils.revocation import RevocationStore, create_revocation_backend
+
+
+class TokenRevocation:
+    """
+    폐기된 JWT 목록
+    init_app 에서 앱 설정에 맞는 백엔드로 RevocationStore 를 생성합니다.
+    """
+
+    def __init__(self):
+        self.store = RevocationStore()
+
+    def init_app(self, app):
+        self.store = RevocationStore(
+            create_revocation_backend(app.config),
+            capacity=app.config["REVOCATION_BLOOM_CAPACITY"],
+            error_rate=app.config["REVOCATION_BLOOM_ERROR_RATE"],
+            sync_seconds=app.config["REVOCATION_SYNC_SECONDS"],
+            purge_seconds=app.config["REVOCATION_PURGE_SECONDS"],
+        )
+
+    def revoke(self, jwt_payload):
+        """
+        디코딩된 토큰을 만료 시각까지 폐기합니다.
+        """
+        self.store.revoke(jwt_payload["jti"], jwt_payload["exp"])
+
+    def is_revoked(self, jwt_payload):
+        return self.store.is_revoked(jwt_payload["jti"])
+
+
+token_revocation = TokenRevocation()
@@ -17,9 +17,20 @@ class MessageSchema(ma.SQLAlchemyAutoSchema):
         model = MessageModel
         # 쓰기 전용
         load_only = ["password", "author_id"]
+        # 시즌은 작성 시점에 정해지며, 응답에 포함하지 않음
+        exclude = ["season"]
 
     def get_message_author_name(self, obj):
         return obj.author.username
 
     def get_money_image_name(self, obj):
         return obj.money_image_name
+
+
+# MessageModel.received_rows_query 의 row 로 MessageSchema 와 같은 응답을 만들 때 사용
+MESSAGE_ROW_FIELDS = {
+    "image_name": lambda row: MessageModel.get_money_image_name(
+        row.is_moneybag, row.amount
+    ),
+    "author_name": lambda row: row.author_name,
+}
@@ -0,0 +1,221 @@
+import threading
+
+from marshmallow import fields, validate
+
+# 타입이 이미 맞는 값은 marshmallow 와 같은 결과가 되므로 변환 없이 그대로 사용
+FAST_DUMP_TYPES = {fields.Integer: int, fields.String: str, fields.Boolean: bool}
+
+
+class SchemaRegistry:
+    """
+    스키마 인스턴스를 재사용하고, 자주 쓰는 스키마의 dump / load 를 빠르게 처리합니다.
+
+    dump 는 스키마의 필드 목록으로부터 필드마다 속성을 읽어 dict 를 만드는 함수를 생성합니다.
+    marshmallow 의 dump 와 같은 키, 같은 순서, 같은 값을 만들어냅니다.
+    load 는 모든 필드의 타입과 길이가 맞는 흔한 경우에만 바로 모델 인스턴스를 만들고,
+    그 외에는 (에러 메시지를 같게 유지하기 위해) marshmallow 의 load 를 그대로 사용합니다.
+    """
+
+    def __init__(self):
+        self._schemas = {}
+        self._dumpers = {}
+        self._loaders = {}
+        self._row_dumpers = {}
+        self._lock = threading.Lock()
+
+    def get(self, schema_class, **kwargs):
+        """
+        같은 인자로 생성한 스키마 인스턴스를 반환
+        """
+        key = (schema_class, tuple(sorted(kwargs.items())))
+        schema = self._schemas.get(key)
+        if schema is None:
+            with self._lock:
+                schema = self._schemas.setdefault(key, schema_class(**kwargs))
+        return schema
+
+    def dump(self, schema_class, obj, many=False, **kwargs):
+        key = (schema_class, tuple(sorted(kwargs.items())))
+        dumper = self._dumpers.get(key)
+        if dumper is None:
+            dumper = self._dumpers[key] = compile_dumper(
+                self.get(schema_class, **kwargs)
+            )
+        if many:
+            return [dumper(item) for item in obj]
+        return dumper(obj)
+
+    def dump_rows(self, schema_class, rows, computed):
+        """
+        ORM 객체 대신 Core 로 조회한 row 목록을 dump 와 같은 dict 목록으로 변환
+
+        Args:
+            schema_class: 응답 형식을 정하는 스키마
+            rows (list): 스키마의 필드 이름과 같은 이름의 컬럼을 가진 row 목록
+            computed (dict): 메서드 필드 이름 -> row 를 받아 값을 만드는 함수
+        """
+        dumper = self._row_dumpers.get(schema_class)
+        if dumper is None:
+            dumper = self._row_dumpers[schema_class] = compile_row_dumper(
+                self.get(schema_class), computed
+            )
+        return [dumper(row) for row in rows]
+
+    def load(self, schema_class, data):
+        """
+        data 를 검증하고 모델 인스턴스로 변환 (검증은 한 번만 실행)
+        올바르지 않다면 marshmallow 와 같은 ValidationError 가 발생
+        """
+        loader = self._loaders.get(schema_class)
+        if loader is None:
+            loader = self._loaders[schema_class] = compile_loader(
+                self.get(schema_class)
+            )
+        return loader(data)
+
+    def clear(self):
+        with self._lock:
+            self._schemas.clear()
+            self._dumpers.clear()
+            self._loaders.clear()
+            self._row_dumpers.clear()
+
+
+def compile_dumper(schema):
+    """
+    스키마의 dump 와 같은 결과를 만드는 함수를 생성
+    타입이 정해진 필드는 속성을 바로 읽고, 그 외의 필드는 marshmallow 필드에 맡깁니다.
+    """
+    if schema._hooks.get(("post_dump", False)) or schema._hooks.get(
+        ("pre_dump", False)
+    ):
+        return schema.dump
+    model = getattr(schema.opts, "model", None)
+    namespace = {"missing": fields.missing_, "accessor": schema.get_attribute}
+    lines = ["def dump(obj):", "    result = {}"]
+    for number, (name, field) in enumerate(schema.dump_fields.items()):
+        key = field.data_key if field.data_key is not None else name
+        attribute = field.attribute or name
+        namespace[f"field_{number}"] = field
+        fast_type = FAST_DUMP_TYPES.get(type(field))
+        if isinstance(field, fields.Method) and field._serialize_method is not None:
+            namespace[f"method_{number}"] = field._serialize_method
+            lines.append(f"    result[{key!r}] = method_{number}(obj)")
+        elif (
+            fast_type is not None
+            and attribute.isidentifier()
+            and hasattr(model, attribute)
+            and field.dump_default is fields.missing_
+        ):
+            namespace[f"type_{number}"] = fast_type
+            lines += [
+                f"    value = obj.{attribute}",
+                f"    if value is not None and value.__class__ is not type_{number}:",
+                f"        value = field_{number}._serialize(value, {name!r}, obj)",
+                f"    result[{key!r}] = value",
+            ]
+        else:
+            lines += [
+                f"    value = field_{number}.serialize({name!r}, obj, accessor=accessor)",
+                "    if value is not missing:",
+                f"        result[{key!r}] = value",
+            ]
+    lines.append("    return result")
+    exec("\n".join(lines), namespace)
+    return namespace["dump"]
+
+
+def compile_row_dumper(schema, computed):
+    """
+    Core 로 조회한 row 로부터 스키마의 dump 와 같은 키, 순서, 값의 dict 를 만드는 함수를 생성
+    메서드 필드는 computed 의 함수로, 그 외의 필드는 같은 이름의 컬럼으로 값을 만듭니다.
+    """
+    namespace = {}
+    lines = ["def dump(row):", "    result = {}"]
+    for number, (name, field) in enumerate(schema.dump_fields.items()):
+        key = field.data_key if field.data_key is not None else name
+        attribute = field.attribute or name
+        if name in computed:
+            namespace[f"computed_{number}"] = computed[name]
+            lines.append(f"    result[{key!r}] = computed_{number}(row)")
+            continue
+        fast_type = FAST_DUMP_TYPES.get(type(field))
+        if fast_type is None or not attribute.isidentifier():
+            raise ValueError(f"row 로 만들 수 없는 필드입니다: {name}")
+        namespace[f"field_{number}"] = field
+        namespace[f"type_{number}"] = fast_type
+        lines += [
+            f"    value = row.{attribute}",
+            f"    if value is not None and value.__class__ is not type_{number}:",
+            f"        value = field_{number}._serialize(value, {name!r}, row)",
+            f"    result[{key!r}] = value",
+        ]
+    lines.append("    return result")
+    exec("\n".join(lines), namespace)
+    return namespace["dump"]
+
+
+def get_fast_load_rule(field):
+    """
+    타입 검사와 최대 길이만으로 검증할 수 있는 필드라면 (타입, 최대 길이) 를, 아니라면 None 을 반환
+    """
+    fast_type = FAST_DUMP_TYPES.get(type(field))
+    if fast_type is None or field.data_key is not None or field.attribute is not None:
+        return None
+    max_length = None
+    for validator in field.validators:
+        if not isinstance(validator, validate.Length) or validator.equal is not None:
+            return None
+        if validator.min is not None:
+            return None
+        max_length = validator.max
+    return fast_type, max_length
+
+
+def compile_loader(schema):
+    """
+    스키마의 load 와 같은 결과를 만드는 함수를 생성
+    기본 키가 없고 모든 값이 정해진 타입, 길이를 만족할 때만 바로 모델 인스턴스를 만듭니다.
+    """
+    model = getattr(schema.opts, "model", None)
+    hooks = {name for names in schema._hooks.values() for name in names} - {
+        "make_instance"
+    }
+    rules = {
+        name: get_fast_load_rule(field) for name, field in schema.load_fields.items()
+    }
+    if (
+        model is None
+        or not schema.opts.load_instance
+        or hooks
+        or None in rules.values()
+        or schema.unknown != "raise"
+    ):
+        return schema.load
+    primary_keys = {column.key for column in model.__mapper__.primary_key}
+    allowed = rules.keys() - primary_keys
+    required = {
+        name
+        for name, field in schema.load_fields.items()
+        if field.required and name in allowed
+    }
+
+    def load(data):
+        if (
+            data.__class__ is not dict
+            or not data.keys() <= allowed
+            or not required <= data.keys()
+        ):
+            return schema.load(data)
+        for name, value in data.items():
+            fast_type, max_length = rules[name]
+            if value.__class__ is not fast_type or (
+                max_length is not None and len(value) > max_length
+            ):
+                return schema.load(data)
+        return model(**data)
+
+    return load
+
+
+schema_registry = SchemaRegistry()
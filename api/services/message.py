@@ -1,80 +1,300 @@
-from flask import request
-from flask_jwt_extended import get_jwt_identity
+from functools import partial
+
+from flask import current_app, request
+from flask_jwt_extended import get_current_user, get_jwt_identity
+from flask_sqlalchemy import Pagination
+from marshmallow import ValidationError
 
 from api import MessageModel, UserModel
-from api.schemas.message import MessageSchema
-from api.utils.korean_datetime import (MESSAGE_OPEN_DATETIME,
-                                       get_korean_datetime)
-from api.utils.response import INTERNAL_SERVER_ERROR, NOT_FOUND, get_response
+from api.cache import cache, message_cache
+from api.db import unit_of_work
+from api.schemas.message import MESSAGE_ROW_FIELDS, MessageSchema
+from api.schemas.registry import schema_registry
+from api.utils.archive import message_archive
+from api.utils.korean_datetime import (get_korean_datetime,
+                                       get_message_open_datetime)
+from api.utils.pagination import paginate_by_cursor
+from api.utils.response import (INTERNAL_SERVER_ERROR, MESSAGE_NOT_OPENED,
+                                NOT_FOUND, get_response)
+from api.utils.single_flight import message_list_single_flight
+from api.utils.validation import NotValidDataException
+from api.utils.write_buffer import WriteBufferFull, message_write_buffer
+
+MESSAGES_PER_PAGE = 6
+MESSAGES_PER_BATCH = 50
 
 
 class MessageService:
     """
     쪽지
         - 작성
+        - 여러 사용자에게 한 번에 작성
         - 상세 조회
-        - 목록 조회
+        - 목록 조회 (page 또는 cursor 기반 페이지네이션)
+        - 끝난 시즌의 보관된 목록 조회
     """
 
     def detail_view(self, user_id, message_id):
-        if get_korean_datetime() > MESSAGE_OPEN_DATETIME:
-            user = UserModel.find_by_id(user_id)
-            message = MessageModel.find_by_id(message_id)
-            if not user:
-                return get_response(False, NOT_FOUND.format("사용자"), 404)
-            if message:
-                return MessageSchema().dump(message), 200
-            return get_response(False, NOT_FOUND.format("쪽지"), 404)
-        return get_response(False, "쪽지는 22일 이후에만 조회할 수 있습니다.", 400)
+        if get_korean_datetime() > get_message_open_datetime():
+            # 쪽지는 작성 후 수정되지 않으므로, 삭제될 때까지 응답을 캐시
+            cache_key = MessageModel.get_detail_cache_key(message_id)
+            detail = message_cache.get(cache_key)
+            if detail is None:
+                message = MessageModel.find_received_with_author(user_id, message_id)
+                if not message:
+                    return get_response(False, NOT_FOUND.format("쪽지"), 404)
+                detail = {
+                    "user_id": message.user_id,
+                    "message": schema_registry.dump(MessageSchema, message),
+                }
+                message_cache.set(cache_key, detail)
+            if detail["user_id"] != user_id:
+                return get_response(False, NOT_FOUND.format("쪽지"), 404)
+            return detail["message"], 200
+        return get_response(
+            False, MESSAGE_NOT_OPENED.format(get_message_open_datetime().day), 400
+        )
+
+    @staticmethod
+    def get_list_version(user_id):
+        """
+        쪽지 목록 응답의 버전 정보 (ETag 용)
+        조회할 수 없는 요청 (공개 전, 본인이 아님) 이라면 None 을 반환
+        """
+        if get_korean_datetime() <= get_message_open_datetime():
+            return None
+        if user_id != get_jwt_identity():
+            return None
+        return UserModel.get_version(user_id)
 
     def list_view(self, user_id):
-        if get_korean_datetime() > MESSAGE_OPEN_DATETIME:
-            user = UserModel.find_by_id(user_id)
-            if not user:
-                return get_response(False, NOT_FOUND.format("사용자"), 400)
-            if not user.id == get_jwt_identity():
+        if get_korean_datetime() > get_message_open_datetime():
+            if user_id != get_jwt_identity():
+                if not UserModel.get(user_id):
+                    return get_response(False, NOT_FOUND.format("사용자"), 400)
                 return get_response(False, "쪽지는 본인만 조회할 수 있습니다", 403)
-            paginated_posts = user.message_set.order_by(
-                MessageModel.id.desc()
-            ).paginate(
-                page=request.args.get("page", type=int, default=1),
-                per_page=6,
-                error_out=False,
+            # 공개 시각에는 같은 사용자의 같은 요청이 동시에 몰리므로, 한 번만 조회하여 함께 사용
+            body, status = message_list_single_flight.do(
+                (user_id, request.query_string),
+                partial(
+                    self.get_list_page,
+                    user_id,
+                    cursor=request.args.get("cursor"),
+                    page=request.args.get("page", type=int, default=1),
+                ),
             )
+            if status != 200:
+                return body, status
+            return {
+                **body,
+                "next": request.base_url + body["next"] if body["next"] else None,
+                "prev": request.base_url + body["prev"] if body["prev"] else None,
+            }, 200
+        return get_response(
+            False, MESSAGE_NOT_OPENED.format(get_message_open_datetime().day), 400
+        )
+
+    def get_list_page(self, user_id, cursor=None, page=1, ttl=None):
+        """
+        받은 쪽지 목록의 한 페이지를 조회
+        cursor 가 None 이면 page 방식으로, 아니라면 cursor 방식으로 조회하며
+        next, prev 에는 URL 대신 쿼리 문자열 ("?page=2") 이 담김
+
+        첫 페이지 (page <= 1 또는 cursor == "") 는 캐시에 저장되고 (ttl 을 지정하지 않으면
+        CACHE_DEFAULT_TTL 동안), 사용자 정보 캐시와 함께 무효화됩니다.
+
+        Returns:
+            tuple: (응답, 상태 코드)
+        """
+        mode = "cursor" if cursor is not None else "page"
+        is_first_page = cursor == "" if cursor is not None else page <= 1
+        cache_key = UserModel.get_message_list_cache_key(user_id, mode)
+        if is_first_page:
+            body = cache.get(cache_key)
+            if body is not None:
+                return body, 200
+        user = UserModel.get(user_id)
+        if not user:
+            return get_response(False, NOT_FOUND.format("사용자"), 400)
+        # ORM 객체 없이 응답에 필요한 컬럼만 조회 (응답은 같음)
+        lean_read = current_app.config["MESSAGE_LIST_LEAN_READ"]
+        if cursor is not None:
+            try:
+                messages, next_cursor, prev_cursor = paginate_by_cursor(
+                    partial(
+                        MessageModel.find_received_rows_by_keyset
+                        if lean_read
+                        else MessageModel.find_received_by_keyset,
+                        user.id,
+                    ),
+                    cursor=cursor,
+                    per_page=MESSAGES_PER_PAGE,
+                )
+            except NotValidDataException as e:
+                return get_response(False, str(e), 400)
+            next_page = f"?cursor={next_cursor}" if next_cursor else None
+            prev_page = f"?cursor={prev_cursor}" if prev_cursor else None
+        else:
+            if lean_read:
+                # paginate(error_out=False) 와 같은 규칙으로 page 를 보정
+                page = max(page, 1)
+                rows, total = MessageModel.find_received_rows_by_page(
+                    user.id, page, MESSAGES_PER_PAGE
+                )
+                paginated_posts = Pagination(None, page, MESSAGES_PER_PAGE, total, rows)
+            else:
+                paginated_posts = MessageModel.received_query(user.id).paginate(
+                    page=page, per_page=MESSAGES_PER_PAGE, error_out=False
+                )
+            messages = paginated_posts.items
             next_page = (
-                f"{request.base_url}?page={paginated_posts.next_num}"
+                f"?page={paginated_posts.next_num}"
                 if paginated_posts.next_num
                 else None
             )
             prev_page = (
-                f"{request.base_url}?page={paginated_posts.prev_num}"
+                f"?page={paginated_posts.prev_num}"
                 if paginated_posts.prev_num
                 else None
             )
-            return {
-                "user_info": {
-                    "username": user.username,
-                    "email": user.email,
-                    "total_amount": user.total_amount,
-                },
-                "message_set_count": user.message_set_count,
-                "next": next_page,
-                "prev": prev_page,
-                "messages": MessageSchema(many=True).dump(paginated_posts.items),
-            }
-        return get_response(False, "쪽지는 22일 이후에만 조회할 수 있습니다.", 400)
+        body = {
+            "user_info": {
+                "username": user.username,
+                "email": user.email,
+                "total_amount": user.total_amount,
+            },
+            "message_set_count": user.message_set_count,
+            "next": next_page,
+            "prev": prev_page,
+            "messages": schema_registry.dump_rows(
+                MessageSchema, messages, MESSAGE_ROW_FIELDS
+            )
+            if lean_read
+            else schema_registry.dump(MessageSchema, messages, many=True),
+        }
+        if is_first_page:
+            cache.set(cache_key, body, ttl=ttl)
+        return body, 200
+
+    def archive_list_view(self, user_id, season):
+        """
+        끝난 시즌에 받은 쪽지 목록을 보관 파일에서 조회 (읽기 전용, page 방식)
+        """
+        if user_id != get_jwt_identity():
+            return get_response(False, "쪽지는 본인만 조회할 수 있습니다", 403)
+        messages = message_archive.find_user_messages(season, user_id)
+        if messages is None:
+            return get_response(False, NOT_FOUND.format("보관된 쪽지"), 404)
+        page = max(request.args.get("page", type=int, default=1), 1)
+        start = (page - 1) * MESSAGES_PER_PAGE
+        paginated_posts = Pagination(
+            None,
+            page,
+            MESSAGES_PER_PAGE,
+            len(messages),
+            messages[start : start + MESSAGES_PER_PAGE],
+        )
+        return {
+            "season": season,
+            "message_set_count": len(messages),
+            "next": f"{request.base_url}?page={paginated_posts.next_num}"
+            if paginated_posts.next_num
+            else None,
+            "prev": f"{request.base_url}?page={paginated_posts.prev_num}"
+            if paginated_posts.prev_num
+            else None,
+            "messages": schema_registry.dump_rows(
+                MessageSchema, paginated_posts.items, MESSAGE_ROW_FIELDS
+            ),
+        }, 200
 
     def write(self, user_id):
         message_json = request.get_json()
-        author = UserModel.find_by_id(get_jwt_identity())
-        reader = UserModel.find_by_id(user_id)
+        users = UserModel.get_many([get_jwt_identity(), user_id])
+        author, reader = users.get(get_jwt_identity()), users.get(user_id)
         if not reader:
             return get_response(False, NOT_FOUND.format("사용자"), 400)
-        validate_result = MessageSchema().validate(message_json)
-        if validate_result:
-            return get_response(False, validate_result, 400)
-        new_message = MessageSchema().load(message_json)
+        try:
+            new_message = schema_registry.load(MessageSchema, message_json)
+        except ValidationError as e:
+            return get_response(False, e.messages, 400)
+        except ValueError as e:
+            # MessageModel 에서 검증하는 화폐 단위
+            return get_response(False, str(e), 400)
         new_message.user_id = user_id
         new_message.author_id = author.id
-        new_message.save_to_db()
-        return MessageSchema().dump(new_message), 201
+        if message_write_buffer.enabled:
+            return self.write_behind(new_message, author)
+        with unit_of_work():
+            new_message.save_to_db()
+            # 커밋 후에는 속성이 만료되어 다시 조회하게 되므로, 커밋 전에 직렬화
+            result = schema_registry.dump(MessageSchema, new_message)
+        return result, 201
+
+    def write_behind(self, new_message, author):
+        """
+        쪽지를 쓰기 버퍼에 넣고 바로 응답 (아직 저장 전이므로 id 는 없음)
+        """
+        try:
+            message_write_buffer.submit(new_message)
+        except WriteBufferFull:
+            return get_response(False, "잠시 후 다시 시도해 주세요.", 503)
+        result = schema_registry.dump(
+            MessageSchema, new_message, exclude=("author_name",)
+        )
+        result["author_name"] = author.username
+        return result, 202
+
+    def write_batch(self):
+        """
+        여러 사용자에게 쪽지를 한 번에 작성
+        쪽지마다 스키마 검증은 한 번 (load) 만 하고, 받는 사용자들은 하나의 쿼리로 조회하며,
+        올바른 쪽지들은 한 트랜잭션으로 저장합니다. 쪽지별 결과를 요청 순서대로 응답합니다.
+        """
+        items = (request.get_json(silent=True) or {}).get("messages")
+        if not isinstance(items, list) or not items:
+            return get_response(False, "messages 는 쪽지의 목록이어야 합니다.", 400)
+        if len(items) > MESSAGES_PER_BATCH:
+            return get_response(
+                False, f"쪽지는 한 번에 {MESSAGES_PER_BATCH}개까지 작성할 수 있습니다.", 400
+            )
+        author = get_current_user()
+        readers = UserModel.get_many(
+            [
+                item["user_id"]
+                for item in items
+                if isinstance(item, dict) and isinstance(item.get("user_id"), int)
+            ]
+        )
+        results, new_messages = [], []
+        for item in items:
+            if not isinstance(item, dict) or item.get("user_id") not in readers:
+                results.append({"error": NOT_FOUND.format("사용자")})
+                continue
+            data = dict(item)
+            user_id = data.pop("user_id")
+            # id 가 있으면 기존 쪽지를 불러와 덮어쓰게 되므로 무시
+            data.pop("id", None)
+            try:
+                new_message = schema_registry.load(MessageSchema, data)
+            except ValidationError as e:
+                results.append({"error": e.messages})
+                continue
+            except ValueError as e:
+                results.append({"error": str(e)})
+                continue
+            new_message.user_id = user_id
+            new_message.author_id = author.id
+            results.append(new_message)
+            new_messages.append(new_message)
+        if not new_messages:
+            return {"results": results}, 400
+        with unit_of_work():
+            MessageModel.save_all(new_messages)
+            results = [
+                schema_registry.dump(MessageSchema, result)
+                if isinstance(result, MessageModel)
+                else result
+                for result in results
+            ]
+        return {"results": results}, 201 if len(new_messages) == len(items) else 207
@@ -1,13 +1,18 @@
-from werkzeug.security import check_password_hash, generate_password_hash
+from flask_jwt_extended import get_jwt
 
+from api.cache import cache
+from api.db import after_commit, unit_of_work
 from api.models.user import RefreshTokenModel, UserModel
+from api.revocation import token_revocation
+from api.schemas.registry import schema_registry
 from api.schemas.user import (UserInformationSchema, UserLoginSchema,
                               UserRegisterSchema, UserWithdrawSchema)
 from api.utils.auth import (create_userid_refresh_token,
                             create_username_access_token)
+from api.utils.password import password_hasher
 from api.utils.response import (ACCOUNT_INFORMATION_NOT_MATCH,
                                 EMAIL_DUPLICATED, EMAIL_NOT_CONFIRMED,
-                                WELCOME_NEWBIE, get_response)
+                                NOT_FOUND, WELCOME_NEWBIE, get_response)
 from api.utils.validation import (NotValidDataException, validate_email,
                                   validate_password, validate_username)
 
@@ -20,23 +25,47 @@ class UserService:
         - 회원가입
         - 회원탈퇴
         - 로그인
+        - 로그아웃
     """
 
     def __init__(self, user=None):
         self.user = user
 
     def get_info(self):
-        return {"user_info": UserInformationSchema().dump(self.user)}
+        return {"user_info": schema_registry.dump(UserInformationSchema, self.user)}
+
+    @staticmethod
+    def get_info_version(user_id):
+        """
+        공개 사용자 정보 응답의 버전 정보 (ETag 용)
+        """
+        return UserModel.get_version(user_id)
+
+    def get_public_info(self, user_id):
+        """
+        공유 링크로 들어오는 공개 사용자 정보 조회
+        직렬화된 응답을 캐시에 저장해두고, 쪽지 작성 / 닉네임 변경 / 회원탈퇴 시 무효화됩니다.
+        """
+        cache_key = UserModel.get_info_cache_key(user_id)
+        user_info = cache.get(cache_key)
+        if user_info is None:
+            self.user = UserModel.get(user_id)
+            if not self.user:
+                return get_response(False, NOT_FOUND.format("사용자"), 404)
+            user_info = self.get_info()
+            cache.set(cache_key, user_info)
+        return user_info, 200
 
     def update_info(self, data):
-        validate_result = UserInformationSchema().validate(data)
+        validate_result = schema_registry.get(UserInformationSchema).validate(data)
         if validate_result:
             return get_response(False, validate_result, 400)
-        self.user.update_user_info(data["username"])
-        return get_response(True, f"닉네임이 {self.user.username} 으로 변경되었습니다.", 200)
+        with unit_of_work():
+            self.user.update_user_info(data["username"])
+        return get_response(True, f"닉네임이 {data['username']} 으로 변경되었습니다.", 200)
 
     def register(self, data):
-        validate_result = UserRegisterSchema().validate(data)
+        validate_result = schema_registry.get(UserRegisterSchema).validate(data)
         if validate_result:
             return get_response(False, validate_result, 400)
         try:
@@ -54,59 +83,78 @@ class UserService:
         if UserModel.find_by_email(data["email"]):
             return get_response(False, EMAIL_DUPLICATED, 400)
         else:
-            password = generate_password_hash(data["password"])
-            user = UserRegisterSchema().load(
+            password = password_hasher.hash(data["password"])
+            user = schema_registry.get(UserRegisterSchema).load(
                 {
                     "username": data["username"],
                     "email": data["email"],
                     "password": password,
                 }
             )
-        user.save_to_db()
-        user.send_email()
+        with unit_of_work():
+            user.register()
         return get_response(True, WELCOME_NEWBIE.format(user.username), 201)
 
     def withdraw(self, data):
-        validate_result = UserWithdrawSchema().validate(data)
+        validate_result = schema_registry.get(UserWithdrawSchema).validate(data)
         if validate_result:
             return get_response(False, validate_result, 400)
         if self.user.username == data["username"]:
-            self.user.delete_from_db()
+            with unit_of_work():
+                self.user.delete_from_db()
             return "", 204
         else:
             return get_response(False, "잘못된 접근입니다.", 400)
 
     def login(self, data):
-        validate_result = UserLoginSchema().validate(data)
+        """
+        비밀번호 재해시와 refresh token 저장을 한 번의 커밋으로 처리
+        """
+        validate_result = schema_registry.get(UserLoginSchema).validate(data)
         if validate_result:
             return get_response(False, validate_result, 400)
-        if not check_password_hash(self.user.password, data["password"]):
-            return get_response(False, ACCOUNT_INFORMATION_NOT_MATCH, 401)
-        if not self.user.email_confirmed:
-            return get_response(False, EMAIL_NOT_CONFIRMED, 400)
-        new_access_token = create_username_access_token(self.user)
-        new_refresh_token = create_userid_refresh_token(self.user)
-        if self.user.token:
-            token = self.user.token[0]
-            token.refresh_token_value = new_refresh_token
+        with unit_of_work():
+            if not self.user.check_password(data["password"]):
+                return get_response(False, ACCOUNT_INFORMATION_NOT_MATCH, 401)
+            if not self.user.email_confirmed:
+                return get_response(False, EMAIL_NOT_CONFIRMED, 400)
+            new_access_token = create_username_access_token(self.user)
+            new_refresh_token = create_userid_refresh_token(self.user)
+            if self.user.token:
+                token = self.user.token[0]
+            else:
+                token = RefreshTokenModel(user_id=self.user.id)
+            token.set_token(new_refresh_token)
             token.save_to_db()
-        else:
-            new_token = RefreshTokenModel(
-                user_id=self.user.id, refresh_token_value=new_refresh_token
-            )
-            new_token.save_to_db()
         return {
             "access_token": new_access_token,
             "refresh_token": new_refresh_token,
         }, 200
 
     def refresh_login(self):
+        """
+        refresh token 을 교체하고, 사용한 refresh token 은 폐기
+        """
+        jwt_payload = get_jwt()
         new_access_token = create_username_access_token(self.user)
         new_refresh_token = create_userid_refresh_token(self.user)
-        token = self.user.token[0]
-        token.refresh_token_value = new_refresh_token
-        token.save_to_db()
+        with unit_of_work():
+            token = self.user.token[0]
+            token.set_token(new_refresh_token)
+            token.save_to_db()
+            after_commit(lambda: token_revocation.revoke(jwt_payload))
         return {
             "access_token": new_access_token,
             "refresh_token": new_refresh_token,
         }, 200
+
+    def logout(self):
+        """
+        사용 중인 access token 을 폐기하고, refresh token 을 삭제
+        """
+        jwt_payload = get_jwt()
+        with unit_of_work():
+            for token in list(self.user.token):
+                token.delete_from_db()
+            after_commit(lambda: token_revocation.revoke(jwt_payload))
+        return "", 204
@@ -1,6 +1,10 @@
 import unittest
+from contextlib import contextmanager
+
+from sqlalchemy import event
 
 from api import create_app
+from api.cache import cache, message_cache
 from api.db import db
 
 app = create_app(is_production=False)
@@ -15,8 +19,59 @@ class CommonTestCaseSetting(unittest.TestCase):
 
             warnings.simplefilter("ignore", category=DeprecationWarning)
             db.create_all()
+        cache.clear()
+        message_cache.clear()
 
     def tearDown(self):
         with self.client.application.app_context():
             db.session.remove()
             db.drop_all()
+
+    @contextmanager
+    def count_queries(self):
+        """
+        블록 안에서 실행된 SQL 문을 목록에 담아 돌려줍니다.
+        """
+        # 앱 컨텍스트를 새로 열면 닫힐 때 세션이 정리되므로, 컨텍스트 없이 엔진을 가져옴
+        engine = db.get_engine(self.client.application)
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    @contextmanager
+    def assertMaxQueries(self, budget):
+        """
+        블록 안에서 실행된 SQL 문의 개수가 budget 을 넘으면 실패합니다.
+        """
+        with self.count_queries() as statements:
+            yield statements
+        self.assertLessEqual(
+            len(statements),
+            budget,
+            f"{len(statements)} queries executed, budget is {budget}:\n"
+            + "\n".join(statements),
+        )
+
+    @contextmanager
+    def count_commits(self):
+        """
+        블록 안에서 실행된 커밋의 횟수를 목록에 담아 돌려줍니다.
+        """
+        engine = db.get_engine(self.client.application)
+        commits = []
+
+        def commit(conn):
+            commits.append(conn)
+
+        event.listen(engine, "commit", commit)
+        try:
+            yield commits
+        finally:
+            event.remove(engine, "commit", commit)
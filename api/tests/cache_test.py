@@ -0,0 +1,230 @@
+import fnmatch
+import json
+
+from api.cache import cache, message_cache
+from api.models.user import UserModel
+from api.tests import CommonTestCaseSetting
+from api.utils.auth import create_username_access_token
+from api.utils.cache import MemoryCacheBackend, RedisCacheBackend
+
+
+class RedisStandIn:
+    """테스트에서 redis 서버 대신 사용하는 최소한의 client 입니다."""
+
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value.encode()
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+
+    def scan_iter(self, match):
+        return [key for key in list(self.values) if fnmatch.fnmatch(key, match)]
+
+
+class MemoryCacheBackendTest(CommonTestCaseSetting):
+    """프로세스 내부 LRU + TTL 캐시를 테스트합니다."""
+
+    def test_least_recently_used_item_should_be_evicted(self):
+        backend = MemoryCacheBackend(max_size=2, ttl=60)
+        backend.set("a", 1)
+        backend.set("b", 2)
+        backend.get("a")
+        backend.set("c", 3)
+        self.assertIsNone(backend.get("b"))
+        self.assertEqual(backend.get("a"), 1)
+        self.assertEqual(backend.get("c"), 3)
+        self.assertEqual(backend.stats()["evictions"], 1)
+
+    def test_expired_item_should_be_missed(self):
+        now = [0]
+        backend = MemoryCacheBackend(max_size=2, ttl=10, clock=lambda: now[0])
+        backend.set("a", 1)
+        self.assertEqual(backend.get("a"), 1)
+        now[0] = 10
+        self.assertIsNone(backend.get("a"))
+        stats = backend.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertEqual(stats["expirations"], 1)
+
+    def test_memory_message_cache_should_use_short_ttl(self):
+        """프로세스 내부 캐시라면, 쪽지 상세 캐시는 긴 기본 TTL 대신 짧은 TTL 을 사용해야 합니다."""
+        config = self.client.application.config
+        self.assertEqual(message_cache.backend.ttl, config["MESSAGE_CACHE_MEMORY_TTL"])
+        self.assertLess(config["MESSAGE_CACHE_MEMORY_TTL"], 60)
+        self.assertEqual(cache.backend.ttl, config["CACHE_DEFAULT_TTL"])
+
+
+class UserCacheTestCase(CommonTestCaseSetting):
+    def setUp(self):
+        super().setUp()
+        with self.client.application.app_context():
+            UserModel(
+                username="미미",
+                password="1234",
+                email="meme@naver.com",
+                email_confirmed=True,
+            ).save_to_db()
+            # 테스트를 위한 사용자 "미미" 생성, id = 1
+            UserModel(
+                username="민수",
+                password="1234",
+                email="minsu@naver.com",
+                email_confirmed=True,
+            ).save_to_db()
+            # 테스트를 위한 사용자 "민수" 생성, id = 2
+            self.headers = {
+                user_id: {
+                    "Authorization": "Bearer "
+                    + create_username_access_token(UserModel.find_by_id(user_id))
+                }
+                for user_id in [1, 2]
+            }
+
+    def get_user_info(self):
+        return self.client.get(self.url + "/api/user/1").get_json()["user_info"]
+
+
+class UserInformationCacheTest(UserCacheTestCase):
+    """공개 사용자 정보 캐시와 무효화를 테스트합니다."""
+
+    def test_cached_user_information_should_not_query(self):
+        """같은 사용자의 정보를 다시 조회하면, 데이터베이스를 조회하지 않아야 합니다."""
+        self.get_user_info()
+        with self.assertMaxQueries(0):
+            self.assertEqual(self.get_user_info()["username"], "미미")
+
+    def test_message_write_should_invalidate(self):
+        """쪽지가 작성되면, 받은 사람의 캐시된 정보가 무효화되어야 합니다."""
+        self.assertEqual(self.get_user_info()["total_amount"], 0)
+        self.client.post(
+            self.url + "/api/user/1/messages",
+            content_type="application/json",
+            data=json.dumps(
+                {"message": "새해 복 많이 받아.", "amount": 1000, "is_moneybag": False}
+            ),
+            headers=self.headers[2],
+        )
+        self.assertEqual(self.get_user_info()["total_amount"], 1000)
+
+    def test_username_update_should_invalidate(self):
+        """닉네임이 변경되면, 캐시된 정보가 무효화되어야 합니다."""
+        self.assertEqual(self.get_user_info()["username"], "미미")
+        self.client.put(
+            self.url + "/api/user/1",
+            content_type="application/json",
+            data=json.dumps({"username": "미미미"}),
+            headers=self.headers[1],
+        )
+        self.assertEqual(self.get_user_info()["username"], "미미미")
+
+    def test_withdraw_should_invalidate(self):
+        """회원탈퇴한 사용자의 정보는 더 이상 조회되지 않아야 합니다."""
+        self.get_user_info()
+        self.client.delete(
+            self.url + "/api/user/withdraw",
+            content_type="application/json",
+            data=json.dumps({"username": "미미"}),
+            headers=self.headers[1],
+        )
+        self.assertEqual(404, self.client.get(self.url + "/api/user/1").status_code)
+
+    def test_shared_backend_should_serve_cached_information(self):
+        """공유 캐시 백엔드를 사용해도, 같은 응답과 무효화가 동작해야 합니다."""
+        memory_backend = cache.backend
+        cache.backend = RedisCacheBackend(RedisStandIn())
+        try:
+            self.test_username_update_should_invalidate()
+            hits = cache.stats()["hits"]
+            with self.assertMaxQueries(0):
+                self.assertEqual(self.get_user_info()["username"], "미미미")
+            self.assertGreater(cache.stats()["hits"], hits)
+        finally:
+            cache.backend = memory_backend
+
+
+class ConditionalGetTest(UserCacheTestCase):
+    """사용자 정보, 쪽지 목록의 ETag 와 조건부 조회를 테스트합니다."""
+
+    def write_message(self):
+        self.client.post(
+            self.url + "/api/user/1/messages",
+            content_type="application/json",
+            data=json.dumps(
+                {"message": "새해 복 많이 받아.", "amount": 1000, "is_moneybag": False}
+            ),
+            headers=self.headers[2],
+        )
+
+    def test_user_information_should_304_until_changed(self):
+        etag = self.client.get(self.url + "/api/user/1").headers["ETag"]
+        with self.assertMaxQueries(0):
+            response = self.client.get(
+                self.url + "/api/user/1", headers={"If-None-Match": etag}
+            )
+        self.assertEqual(304, response.status_code)
+        self.assertEqual(response.headers["ETag"], etag)
+        self.write_message()
+        response = self.client.get(
+            self.url + "/api/user/1", headers={"If-None-Match": etag}
+        )
+        self.assertEqual(200, response.status_code)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+    def test_message_list_should_304_until_new_message(self):
+        url = self.url + "/api/user/1/messages?page=1"
+        self.write_message()
+        etag = self.client.get(url, headers=self.headers[1]).headers["ETag"]
+        response = self.client.get(
+            url, headers={**self.headers[1], "If-None-Match": etag}
+        )
+        self.assertEqual(304, response.status_code)
+        self.assertEqual(
+            self.client.get(
+                self.url + "/api/user/1/messages?page=2",
+                headers={**self.headers[1], "If-None-Match": etag},
+            ).status_code,
+            200,
+        )
+        self.write_message()
+        response = self.client.get(
+            url, headers={**self.headers[1], "If-None-Match": etag}
+        )
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(len(response.get_json()["messages"]), 2)
+
+    def test_message_list_should_not_304_after_author_rename(self):
+        """작성자가 닉네임을 바꾸면, 집계가 같아도 목록의 ETag 가 바뀌어야 합니다."""
+        url = self.url + "/api/user/1/messages?page=1"
+        self.write_message()
+        etag = self.client.get(url, headers=self.headers[1]).headers["ETag"]
+        self.client.put(
+            self.url + "/api/user/2",
+            content_type="application/json",
+            data=json.dumps({"username": "민수수"}),
+            headers=self.headers[2],
+        )
+        response = self.client.get(
+            url, headers={**self.headers[1], "If-None-Match": etag}
+        )
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(response.get_json()["messages"][0]["author_name"], "민수수")
+        response = self.client.get(
+            url,
+            headers={**self.headers[1], "If-None-Match": response.headers["ETag"]},
+        )
+        self.assertEqual(304, response.status_code)
+
+    def test_message_list_of_other_user_should_not_304(self):
+        url = self.url + "/api/user/1/messages?page=1"
+        etag = self.client.get(url, headers=self.headers[1]).headers["ETag"]
+        response = self.client.get(
+            url, headers={**self.headers[2], "If-None-Match": etag}
+        )
+        self.assertEqual(403, response.status_code)
@@ -0,0 +1,166 @@
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+from api import MessageModel, UserModel
+from api.db import db
+from api.models.campaign import CampaignModel
+from api.tests import CommonTestCaseSetting
+from api.utils.campaign import CampaignRunner
+from api.utils.mail import FileTransport
+
+
+class StoppingTransport(FileTransport):
+    """첫 번째 메일을 발송하면서 발송 작업에 중단을 요청합니다."""
+
+    runner = None
+
+    def send(self, message):
+        super().send(message)
+        self.runner.stop()
+
+
+class StopRequestingTransport(FileTransport):
+    """첫 번째 메일을 발송하면서 데이터베이스에 발송 작업의 중단을 요청합니다. (관리자 페이지의 중단)"""
+
+    campaign_id = None
+
+    def send(self, message):
+        super().send(message)
+        CampaignModel.request_stop(self.campaign_id)
+
+
+class CampaignTest(CommonTestCaseSetting):
+    """알림 메일 발송 작업을 테스트합니다."""
+
+    def setUp(self):
+        super().setUp()
+        self.app = self.client.application
+        self.app.config.update(
+            MAIL_CAMPAIGN_CHUNK_SIZE=2,
+            MAIL_CAMPAIGN_CONCURRENCY=2,
+            MAIL_CAMPAIGN_RATE_LIMIT=None,
+        )
+        self.directory = tempfile.TemporaryDirectory()
+        with self.app.app_context():
+            for number in range(1, 6):
+                UserModel(
+                    username=f"토끼{number}",
+                    password="1234",
+                    email=f"rabbit{number}@naver.com",
+                    email_confirmed=True,
+                ).save_to_db()
+            # 테스트를 위한 사용자 5명 생성, id = 1 ~ 5
+            for user_id in [1, 3]:
+                MessageModel(
+                    user_id=user_id,
+                    author_id=2,
+                    message="새해 복 많이 받아.",
+                    amount=1000,
+                    is_moneybag=False,
+                ).save_to_db()
+            # 1, 3 번 사용자만 쪽지를 받음
+            self.campaign_id = CampaignModel.create().id
+
+    def tearDown(self):
+        super().tearDown()
+        self.directory.cleanup()
+        self.app.config.update(
+            MAIL_CAMPAIGN_CHUNK_SIZE=500,
+            MAIL_CAMPAIGN_CONCURRENCY=4,
+            MAIL_CAMPAIGN_RATE_LIMIT=10,
+        )
+
+    def get_campaign(self):
+        with self.app.app_context():
+            return CampaignModel.find_by_id(self.campaign_id)
+
+    def test_campaign_should_send_each_user_once(self):
+        """발송 작업은 쪽지를 받았는지에 따라 나누어 모든 사용자에게 한 번씩 메일을 보내야 합니다."""
+        CampaignRunner(
+            self.app, self.campaign_id, FileTransport(self.directory.name)
+        ).run()
+        campaign = self.get_campaign()
+        self.assertEqual(campaign.status, CampaignModel.FINISHED)
+        self.assertEqual(campaign.received_count, 2)
+        self.assertEqual(campaign.not_received_count, 3)
+        self.assertEqual(campaign.progress, 100)
+        self.assertEqual(len(os.listdir(self.directory.name)), 5)
+
+    def test_messages_of_finished_season_should_not_count(self):
+        """지난 시즌에만 쪽지를 받은 사용자는 쪽지를 받지 않은 사용자로 발송해야 합니다."""
+        with self.app.app_context():
+            db.session.execute(
+                MessageModel.__table__.insert(),
+                {
+                    "user_id": 5,
+                    "author_id": 2,
+                    "message": "작년에 보낸 쪽지",
+                    "amount": 1000,
+                    "is_moneybag": False,
+                    "season": self.app.config["MESSAGE_SEASON"] - 1,
+                },
+            )
+            db.session.commit()
+        CampaignRunner(
+            self.app, self.campaign_id, FileTransport(self.directory.name)
+        ).run()
+        campaign = self.get_campaign()
+        self.assertEqual(campaign.received_count, 2)
+        self.assertEqual(campaign.not_received_count, 3)
+
+    def test_interrupted_campaign_should_resume(self):
+        """중단된 발송 작업은, 이미 보낸 사용자를 제외하고 이어서 발송해야 합니다."""
+        transport = StoppingTransport(self.directory.name)
+        transport.runner = CampaignRunner(self.app, self.campaign_id, transport)
+        transport.runner.run()
+        campaign = self.get_campaign()
+        self.assertEqual(campaign.status, CampaignModel.PAUSED)
+        self.assertEqual(campaign.last_user_id, 2)
+
+        CampaignRunner(
+            self.app, self.campaign_id, FileTransport(self.directory.name)
+        ).run()
+        campaign = self.get_campaign()
+        self.assertEqual(campaign.status, CampaignModel.FINISHED)
+        self.assertEqual(campaign.processed_count, 5)
+        self.assertEqual(len(os.listdir(self.directory.name)), 5)
+
+    def test_stop_request_should_stop_after_current_chunk(self):
+        """데이터베이스에서 중단을 요청한 작업은, 현재 묶음까지만 발송하고 중단해야 합니다."""
+        transport = StopRequestingTransport(self.directory.name)
+        transport.campaign_id = self.campaign_id
+        CampaignRunner(self.app, self.campaign_id, transport).run()
+        campaign = self.get_campaign()
+        self.assertEqual(campaign.status, CampaignModel.PAUSED)
+        self.assertEqual(campaign.last_user_id, 2)
+        self.assertEqual(campaign.processed_count, 2)
+        self.assertFalse(
+            campaign.is_running(self.app.config["MAIL_CAMPAIGN_LEASE_SECONDS"])
+        )
+
+    def test_campaign_leased_by_other_process_should_not_run(self):
+        """다른 프로세스가 lease 를 가진 작업은 발송하지 않고, lease 가 만료되면 이어서 발송해야 합니다."""
+        lease_seconds = self.app.config["MAIL_CAMPAIGN_LEASE_SECONDS"]
+        with self.app.app_context():
+            self.assertIsNotNone(CampaignModel.claim(self.campaign_id, lease_seconds))
+            self.assertIsNone(CampaignModel.claim(self.campaign_id, lease_seconds))
+        CampaignRunner(
+            self.app, self.campaign_id, FileTransport(self.directory.name)
+        ).run()
+        self.assertEqual(len(os.listdir(self.directory.name)), 0)
+        self.assertTrue(self.get_campaign().is_running(lease_seconds))
+
+        with self.app.app_context():
+            campaign = CampaignModel.find_by_id(self.campaign_id)
+            campaign.updated_at = datetime.utcnow() - timedelta(
+                seconds=lease_seconds + 1
+            )
+            db.session.commit()
+        self.assertFalse(self.get_campaign().is_running(lease_seconds))
+        CampaignRunner(
+            self.app, self.campaign_id, FileTransport(self.directory.name)
+        ).run()
+        campaign = self.get_campaign()
+        self.assertEqual(campaign.status, CampaignModel.FINISHED)
+        self.assertEqual(len(os.listdir(self.directory.name)), 5)
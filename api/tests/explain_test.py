@@ -0,0 +1,12 @@
+from api.tests import CommonTestCaseSetting
+from api.utils.explain import explain_query, get_hot_queries
+
+
+class HotQueryIndexTest(CommonTestCaseSetting):
+    """서비스들이 실행하는 주요 쿼리가 인덱스를 사용하는지 테스트합니다."""
+
+    def test_hot_queries_should_use_index(self):
+        with self.client.application.app_context():
+            for name, query in get_hot_queries():
+                uses_index, plan = explain_query(query)
+                self.assertTrue(uses_index, f"{name} : {plan}")
@@ -0,0 +1,116 @@
+import threading
+import time
+
+from api.cache import cache
+from api.models.message import MessageModel
+from api.models.user import UserModel
+from api.tests import CommonTestCaseSetting
+from api.tests.message_test import MessageTest
+from api.utils.prewarm import message_list_prewarmer
+from api.utils.single_flight import SingleFlight
+
+
+class MessageListCacheTest(MessageTest):
+    """쪽지 목록 첫 페이지 캐시와, 공개 시각 전에 캐시를 미리 채우는 작업을 테스트합니다."""
+
+    FIRST_PAGE_URLS = ["/api/user/1/messages", "/api/user/1/messages?cursor="]
+
+    def setUp(self):
+        super().setUp()
+        self.headers = self.get_headers(1)
+
+    def get_list(self, url):
+        response = self.client.get(self.url + url, headers=self.headers)
+        self.assertEqual(200, response.status_code)
+        return response
+
+    def test_cached_first_page_should_skip_list_queries(self):
+        for url in self.FIRST_PAGE_URLS:
+            expected = self.get_list(url).data
+            with self.assertMaxQueries(1):  # 토큰의 사용자 조회
+                self.assertEqual(self.get_list(url).data, expected)
+
+    def test_new_message_should_invalidate_first_page(self):
+        for url in self.FIRST_PAGE_URLS:
+            self.get_list(url)
+        with self.client.application.app_context():
+            MessageModel(
+                user_id=1, author_id=2, message="또 받아.", amount=500, is_moneybag=False
+            ).save_to_db()
+        for url in self.FIRST_PAGE_URLS:
+            body = self.get_list(url).get_json()
+            self.assertEqual(body["message_set_count"], 2)
+            self.assertEqual(body["messages"][0]["message"], "또 받아.")
+
+    def test_renamed_author_should_invalidate_recipient_first_page(self):
+        self.get_list(self.FIRST_PAGE_URLS[0])
+        with self.client.application.app_context():
+            UserModel.find_by_id(2).update_user_info("철수")
+        body = self.get_list(self.FIRST_PAGE_URLS[0]).get_json()
+        self.assertEqual(body["messages"][0]["author_name"], "철수")
+
+    def test_prewarm_should_fill_caches_with_same_response(self):
+        expected = [self.get_list(url).data for url in self.FIRST_PAGE_URLS]
+        cache.clear()
+        with self.client.application.app_context():
+            self.assertEqual(message_list_prewarmer.warm_once(), 1)
+        for url, data in zip(self.FIRST_PAGE_URLS, expected):
+            with self.assertMaxQueries(1):  # 토큰의 사용자 조회
+                self.assertEqual(self.get_list(url).data, data)
+
+
+class SingleFlightTest(CommonTestCaseSetting):
+    """같은 키로 동시에 들어온 호출이 한 번만 실행되는지 테스트합니다."""
+
+    def run_concurrently(self, single_flight, func, count=5):
+        results, errors = [], []
+
+        def call():
+            try:
+                results.append(single_flight.do("key", func))
+            except ValueError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        return threads, results, errors
+
+    def wait_until_shared(self, single_flight, count):
+        while single_flight.shared < count:
+            time.sleep(0.001)
+
+    def test_concurrent_calls_should_share_one_result(self):
+        single_flight, release, calls = SingleFlight(), threading.Event(), []
+
+        def compute():
+            calls.append(1)
+            release.wait(5)
+            return {"value": 1}
+
+        threads, results, _ = self.run_concurrently(single_flight, compute)
+        self.wait_until_shared(single_flight, 4)
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(results), 5)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(single_flight.stats()["in_flight"], 0)
+        # 실행이 끝난 뒤의 호출은 다시 실행됨
+        single_flight.do("key", compute)
+        self.assertEqual(len(calls), 2)
+
+    def test_error_should_be_shared(self):
+        single_flight, release = SingleFlight(), threading.Event()
+
+        def fail():
+            release.wait(5)
+            raise ValueError("실패")
+
+        threads, results, errors = self.run_concurrently(single_flight, fail, 3)
+        self.wait_until_shared(single_flight, 2)
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual((len(results), len(errors)), (0, 3))
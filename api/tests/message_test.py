@@ -6,7 +6,10 @@
 - 쪽지 생성
 """
 from api import MessageModel, UserModel
+from api.cache import cache
 from api.tests import CommonTestCaseSetting
+from api.utils.auth import create_username_access_token
+from api.utils.pagination import encode_cursor
 
 
 class MessageTest(CommonTestCaseSetting):
@@ -17,7 +20,7 @@ class MessageTest(CommonTestCaseSetting):
                 username="미미",
                 password="1234",
                 email="meme@naver.com",
-                email_confrimed=True,
+                email_confirmed=True,
             ).create_user()
             # 테스트를 위한 사용자 "미미" 생성, id = 1
             UserModel(
@@ -33,4 +36,278 @@ class MessageTest(CommonTestCaseSetting):
                 message="새해 복 많이 받아.",
                 amount=1000,
                 is_moneybag=True,
-            )
+            ).save_to_db()
+            # 민수가 미미에게 보낸 쪽지 생성, id = 1
+
+    def get_headers(self, user_id):
+        with self.client.application.app_context():
+            access_token = create_username_access_token(UserModel.find_by_id(user_id))
+        return {"Authorization": "Bearer " + access_token}
+
+
+class MessageListPaginationTest(MessageTest):
+    """쪽지 목록의 page, cursor 기반 페이지네이션을 테스트합니다."""
+
+    def setUp(self):
+        super().setUp()
+        with self.client.application.app_context():
+            for amount in [100, 500, 1000, 5000, 10000, 50000, 99999] * 2:
+                MessageModel(
+                    user_id=1,
+                    author_id=2,
+                    message="새해 복 많이 받아.",
+                    amount=amount,
+                    is_moneybag=False,
+                ).save_to_db()
+            # 미미가 받은 쪽지는 모두 15개, id = 1 ~ 15
+
+    def get_message_ids(self, url):
+        response = self.client.get(url, headers=self.get_headers(1))
+        self.assertEqual(200, response.status_code)
+        body = response.get_json()
+        return [message["id"] for message in body["messages"]], body
+
+    def test_page_mode_should_keep_working(self):
+        """page 파라미터로 조회하면, 기존과 같이 최신순으로 6개씩 응답해야 합니다."""
+        ids, body = self.get_message_ids(self.url + "/api/user/1/messages?page=2")
+        self.assertEqual(ids, [9, 8, 7, 6, 5, 4])
+        self.assertTrue(body["next"].endswith("?page=3"))
+        self.assertTrue(body["prev"].endswith("?page=1"))
+        self.assertEqual(body["message_set_count"], 15)
+
+    def test_cursor_mode_should_walk_forward_and_backward(self):
+        """cursor 를 따라가면, 모든 쪽지를 한 번씩 조회하고 다시 되돌아올 수 있어야 합니다."""
+        ids, first = self.get_message_ids(self.url + "/api/user/1/messages?cursor=")
+        self.assertEqual(ids, [15, 14, 13, 12, 11, 10])
+        self.assertIsNone(first["prev"])
+
+        ids, second = self.get_message_ids(first["next"])
+        self.assertEqual(ids, [9, 8, 7, 6, 5, 4])
+
+        ids, last = self.get_message_ids(second["next"])
+        self.assertEqual(ids, [3, 2, 1])
+        self.assertIsNone(last["next"])
+
+        ids, body = self.get_message_ids(last["prev"])
+        self.assertEqual(ids, [9, 8, 7, 6, 5, 4])
+        ids, body = self.get_message_ids(body["prev"])
+        self.assertEqual(ids, [15, 14, 13, 12, 11, 10])
+        self.assertIsNone(body["prev"])
+        self.assertIsNotNone(body["next"])
+
+    def test_invalid_cursor_should_400(self):
+        """해석할 수 없는 cursor 로 조회하면, 400 상태 코드로 응답해야 합니다."""
+        response = self.client.get(
+            self.url + "/api/user/1/messages?cursor=@@@",
+            headers=self.get_headers(1),
+        )
+        self.assertEqual(400, response.status_code)
+        self.assertEqual(response.get_json(), {"error": "유효한 cursor 값이 아닙니다."})
+
+
+class MessageLeanReadTest(MessageListPaginationTest):
+    """
+    MESSAGE_LIST_LEAN_READ 를 켜고 쪽지 목록의 페이지네이션 테스트를 다시 실행하고,
+    Core 로 조회한 응답이 ORM 으로 조회한 응답과 바이트 단위로 같은지 테스트합니다.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.client.application.config["MESSAGE_LIST_LEAN_READ"] = True
+
+    def tearDown(self):
+        self.client.application.config["MESSAGE_LIST_LEAN_READ"] = False
+        super().tearDown()
+
+    def get_response_data(self, url, lean_read):
+        self.client.application.config["MESSAGE_LIST_LEAN_READ"] = lean_read
+        cache.clear()  # 첫 페이지 캐시를 거치지 않고 비교
+        response = self.client.get(self.url + url, headers=self.get_headers(1))
+        self.assertEqual(200, response.status_code)
+        return response.data
+
+    def test_lean_read_should_be_byte_identical(self):
+        urls = [f"/api/user/1/messages?page={page}" for page in [-1, 0, 1, 2, 3, 4]]
+        urls += [
+            "/api/user/1/messages",
+            "/api/user/1/messages?cursor=",
+            "/api/user/1/messages?cursor=" + encode_cursor("next", 10),
+            "/api/user/1/messages?cursor=" + encode_cursor("next", 4),
+            "/api/user/1/messages?cursor=" + encode_cursor("prev", 3),
+            "/api/user/1/messages?cursor=" + encode_cursor("prev", 12),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(
+                    self.get_response_data(url, lean_read=True),
+                    self.get_response_data(url, lean_read=False),
+                )
+
+
+class MessageQueryCountTest(MessageTest):
+    """
+    쪽지 조회 API 가 쪽지 개수와 상관없이 정해진 개수의 SQL 문만 실행하는지 테스트합니다.
+    작성자를 쪽지마다 따로 조회 (N+1) 하게 되면 실패합니다.
+    """
+
+    LIST_QUERY_BUDGET = 4  # 버전 정보, 사용자 + 집계, 쪽지 목록, (page 방식) 개수
+    DETAIL_QUERY_BUDGET = 1  # 쪽지 + 작성자 (캐시되지 않은 경우)
+
+    def setUp(self):
+        super().setUp()
+        with self.client.application.app_context():
+            for number in range(3, 9):
+                UserModel(
+                    username=f"토끼{number}",
+                    password="1234",
+                    email=f"rabbit{number}@naver.com",
+                    email_confirmed=True,
+                ).save_to_db()
+                MessageModel(
+                    user_id=1,
+                    author_id=number,
+                    message="새해 복 많이 받아.",
+                    amount=1000,
+                    is_moneybag=False,
+                ).save_to_db()
+            # 서로 다른 작성자 6명이 미미에게 쪽지를 하나씩 더 보냄, id = 2 ~ 7
+
+    def test_list_view_should_stay_within_query_budget(self):
+        headers = self.get_headers(1)
+        app = self.client.application
+        for lean_read in [False, True]:
+            app.config["MESSAGE_LIST_LEAN_READ"] = lean_read
+            cache.clear()
+            for url in ["/api/user/1/messages?page=1", "/api/user/1/messages?cursor="]:
+                with self.assertMaxQueries(self.LIST_QUERY_BUDGET):
+                    response = self.client.get(self.url + url, headers=headers)
+                self.assertEqual(200, response.status_code)
+                self.assertEqual(
+                    {
+                        message["author_name"]
+                        for message in response.get_json()["messages"]
+                    },
+                    {f"토끼{number}" for number in range(3, 9)},
+                )
+        app.config["MESSAGE_LIST_LEAN_READ"] = False
+
+    def test_detail_view_should_stay_within_query_budget(self):
+        with self.assertMaxQueries(self.DETAIL_QUERY_BUDGET):
+            response = self.client.get(self.url + "/api/user/1/messages/1")
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(response.get_json()["author_name"], "민수")
+
+
+class MessageDetailCacheTest(MessageTest):
+    """쪽지 상세 응답 캐시와, 다른 사용자의 쪽지 조회 차단을 테스트합니다."""
+
+    def get_detail(self, user_id, message_id):
+        return self.client.get(self.url + f"/api/user/{user_id}/messages/{message_id}")
+
+    def test_cached_detail_should_not_query(self):
+        self.assertEqual(200, self.get_detail(1, 1).status_code)
+        with self.assertMaxQueries(0):
+            response = self.get_detail(1, 1)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(response.get_json()["author_name"], "민수")
+
+    def test_other_users_message_should_404(self):
+        """쪽지를 받은 사용자가 아닌 user_id 로 조회하면, 캐시 여부와 상관없이 404 로 응답해야 합니다."""
+        for _ in range(2):
+            response = self.get_detail(2, 1)
+            self.assertEqual(404, response.status_code)
+            self.assertEqual(response.get_json(), {"error": "쪽지를 찾을 수 없습니다."})
+        self.assertEqual(200, self.get_detail(1, 1).status_code)
+        self.assertEqual(404, self.get_detail(2, 1).status_code)
+        self.assertEqual(404, self.get_detail(99, 1).status_code)
+
+    def test_deleted_message_should_be_dropped_from_cache(self):
+        self.assertEqual(200, self.get_detail(1, 1).status_code)
+        with self.client.application.app_context():
+            MessageModel.find_by_id(1).delete_from_db()
+        self.assertEqual(404, self.get_detail(1, 1).status_code)
+
+    def test_withdrawn_user_messages_should_be_dropped_from_cache(self):
+        self.assertEqual(200, self.get_detail(1, 1).status_code)
+        with self.client.application.app_context():
+            UserModel.find_by_id(2).delete_from_db()
+        self.assertEqual(404, self.get_detail(1, 1).status_code)
+
+    def test_renamed_author_should_be_dropped_from_cache(self):
+        self.assertEqual(200, self.get_detail(1, 1).status_code)
+        with self.client.application.app_context():
+            UserModel.find_by_id(2).update_user_info("철수")
+        self.assertEqual(self.get_detail(1, 1).get_json()["author_name"], "철수")
+
+
+class MessageBatchTest(MessageTest):
+    """여러 사용자에게 쪽지를 한 번에 작성하는 API 를 테스트합니다."""
+
+    def setUp(self):
+        super().setUp()
+        with self.client.application.app_context():
+            UserModel(
+                username="토끼",
+                password="1234",
+                email="rabbit@naver.com",
+                email_confirmed=True,
+            ).create_user()
+            # 테스트를 위한 사용자 "토끼" 생성, id = 3
+        self.headers = self.get_headers(2)
+
+    def write_batch(self, messages):
+        return self.client.post(
+            self.url + "/api/messages/batch",
+            json={"messages": messages},
+            headers=self.headers,
+        )
+
+    def test_batch_should_save_valid_messages_in_one_commit(self):
+        messages = [
+            {"user_id": 1, "message": "새해 복", "amount": 500, "is_moneybag": False},
+            {"user_id": 3, "message": "많이 받아", "amount": 5001, "is_moneybag": True},
+            {"user_id": 99, "message": "없는 사용자", "amount": 100, "is_moneybag": False},
+            {"user_id": 3, "message": "잘못된 액수", "amount": 777, "is_moneybag": False},
+            {"user_id": 1, "amount": 100, "is_moneybag": False},
+        ]
+        with self.count_queries() as statements, self.count_commits() as commits:
+            response = self.write_batch(messages)
+        self.assertEqual(207, response.status_code)
+        self.assertEqual(len(commits), 1)
+        # 받는 사용자들은 (토큰의 사용자를 제외하고) 하나의 쿼리로 조회
+        self.assertEqual(
+            len([s for s in statements if s.startswith('SELECT "User".id')]), 2
+        )
+        results = response.get_json()["results"]
+        self.assertEqual([result.get("id") for result in results[:2]], [2, 3])
+        self.assertEqual(results[0]["author_name"], "민수")
+        self.assertEqual(results[2], {"error": "사용자를 찾을 수 없습니다."})
+        self.assertEqual(results[3], {"error": "화폐단위에 벗어난 액수를 선택하려면 돈봉투를 사용하세요."})
+        self.assertIn("message", results[4]["error"])
+        with self.client.application.app_context():
+            self.assertEqual(UserModel.get(1).total_amount, 1500)
+            self.assertEqual(UserModel.get(3).total_amount, 5001)
+            self.assertEqual(UserModel.get(3).aggregate.last_message_id, 3)
+
+    def test_all_valid_batch_should_201(self):
+        response = self.write_batch(
+            [
+                {
+                    "user_id": user_id,
+                    "message": "새해 복",
+                    "amount": 100,
+                    "is_moneybag": False,
+                }
+                for user_id in [1, 3]
+            ]
+        )
+        self.assertEqual(201, response.status_code)
+        self.assertEqual(len(response.get_json()["results"]), 2)
+
+    def test_invalid_batch_should_400(self):
+        self.assertEqual(400, self.write_batch([]).status_code)
+        self.assertEqual(400, self.write_batch([{"user_id": 99}]).status_code)
+        too_many = [
+            {"user_id": 1, "message": "새해 복", "amount": 100, "is_moneybag": False}
+        ] * 51
+        self.assertEqual(400, self.write_batch(too_many).status_code)
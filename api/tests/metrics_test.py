@@ -0,0 +1,129 @@
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+
+from flask_mail import Message
+
+from api.metrics import metrics
+from api.tests.message_test import MessageTest
+from api.utils.mail import FileTransport
+
+
+class MetricsTest(MessageTest):
+    """/metrics 로 내보내는 요청, SQL, 메일 발송 지표를 테스트합니다."""
+
+    def setUp(self):
+        super().setUp()
+        metrics.registry.clear()
+        shutil.rmtree(metrics.registry.directory, ignore_errors=True)
+
+    def get_samples(self):
+        response = self.client.get(self.url + "/metrics")
+        self.assertEqual(200, response.status_code)
+        self.assertTrue(response.content_type.startswith("text/plain; version=0.0.4"))
+        samples = {}
+        for line in response.get_data(as_text=True).splitlines():
+            if line and not line.startswith("#"):
+                name, value = line.rsplit(" ", 1)
+                samples[name] = float(value)
+        return samples
+
+    def write_process_file(self, pid, metrics_values):
+        os.makedirs(metrics.registry.directory, exist_ok=True)
+        path = os.path.join(metrics.registry.directory, f"metrics-{pid}.json")
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"pid": pid, "metrics": metrics_values}, file)
+
+    def test_request_should_be_recorded_by_resource(self):
+        for _ in range(2):
+            self.assertEqual(200, self.client.get(self.url + "/api/user/1").status_code)
+        samples = self.get_samples()
+        labels = 'method="GET",resource="UserInformation"'
+        self.assertEqual(
+            samples[f'mfr_http_requests_total{{{labels},status="200"}}'], 2
+        )
+        self.assertEqual(
+            samples[f"mfr_http_request_duration_seconds_count{{{labels}}}"], 2
+        )
+        self.assertEqual(
+            samples[f'mfr_http_request_duration_seconds_bucket{{{labels},le="+Inf"}}'],
+            2,
+        )
+        self.assertEqual(
+            samples['mfr_http_requests_in_flight{resource="UserInformation"}'], 0
+        )
+        self.assertGreaterEqual(
+            samples['mfr_sql_statements_total{resource="UserInformation"}'], 2
+        )
+        self.assertIn(
+            'mfr_sql_duration_seconds_total{resource="UserInformation"}', samples
+        )
+
+    def test_unmatched_request_should_be_recorded(self):
+        self.assertEqual(404, self.client.get(self.url + "/api/unknown").status_code)
+        samples = self.get_samples()
+        self.assertEqual(
+            samples[
+                'mfr_http_requests_total{method="GET",resource="unmatched",status="404"}'
+            ],
+            1,
+        )
+
+    def test_other_process_files_should_be_merged(self):
+        """
+        다른 프로세스의 counter 는 종료된 프로세스의 것도 합치고,
+        gauge 는 살아있는 프로세스의 것만 합쳐야 합니다.
+        """
+        exited = subprocess.Popen(["true"])
+        exited.wait()
+        for pid in [exited.pid, os.getppid()]:
+            self.write_process_file(
+                pid,
+                [
+                    [
+                        "mfr_http_requests_total",
+                        [["method", "GET"], ["resource", "Batch"], ["status", "200"]],
+                        3,
+                    ],
+                    ["mfr_http_requests_in_flight", [["resource", "Batch"]], 1],
+                ],
+            )
+        metrics.registry.inc(
+            "mfr_http_requests_total", method="GET", resource="Batch", status="200"
+        )
+        samples = self.get_samples()
+        self.assertEqual(
+            samples[
+                'mfr_http_requests_total{method="GET",resource="Batch",status="200"}'
+            ],
+            7,
+        )
+        self.assertEqual(samples['mfr_http_requests_in_flight{resource="Batch"}'], 1)
+
+    def test_written_file_should_be_read_by_other_registry(self):
+        metrics.registry.observe(
+            "mfr_mail_send_duration_seconds", 0.02, transport="smtp", result="ok"
+        )
+        metrics.registry.write_file()
+        with open(metrics.registry.path, encoding="utf-8") as file:
+            data = json.load(file)
+        self.assertEqual(data["pid"], os.getpid())
+        self.assertEqual(data["metrics"], metrics.registry.snapshot())
+
+    def test_mail_send_should_be_timed(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with self.client.application.app_context():
+                with FileTransport(directory).connect() as connection:
+                    connection.send(
+                        Message("인증", sender="a@b.c", recipients=["rabbit@naver.com"])
+                    )
+        samples = self.get_samples()
+        labels = 'result="ok",transport="file"'
+        self.assertEqual(
+            samples[f"mfr_mail_send_duration_seconds_count{{{labels}}}"], 1
+        )
+        self.assertGreater(
+            samples[f"mfr_mail_send_duration_seconds_sum{{{labels}}}"], 0
+        )
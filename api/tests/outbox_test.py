@@ -0,0 +1,82 @@
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from api.db import db
+from api.models.outbox import EmailOutboxModel
+from api.tests import CommonTestCaseSetting
+from api.utils.mail import FileTransport
+from api.utils.outbox import outbox_worker
+
+
+class BrokenTransport:
+    """연결할 때마다 실패하는 메일 발송 수단입니다."""
+
+    @contextmanager
+    def connect(self):
+        raise ConnectionError("SMTP 서버에 연결할 수 없습니다.")
+        yield
+
+
+class EmailOutboxTest(CommonTestCaseSetting):
+    """회원가입 인증 메일의 발송 대기열을 테스트합니다."""
+
+    def register(self):
+        return self.client.post(
+            self.url + "/api/user/register",
+            content_type="application/json",
+            data=json.dumps(
+                {
+                    "username": "토끼",
+                    "email": "rabbit@naver.com",
+                    "password": "SomeVali@123",
+                }
+            ),
+        )
+
+    def test_register_should_queue_confirmation_email(self):
+        """회원가입은 메일을 발송하지 않고, 발송 대기열에 추가한 뒤 응답해야 합니다."""
+        self.assertEqual(201, self.register().status_code)
+        with self.client.application.app_context():
+            email = EmailOutboxModel.query.one()
+            self.assertEqual(email.status, EmailOutboxModel.PENDING)
+            self.assertEqual(email.recipient, "rabbit@naver.com")
+            self.assertIn("/api/confirm-user/1/", email.html)
+
+    def test_worker_should_send_queued_email(self):
+        """워커는 대기 중인 메일을 발송하고, 발송 완료로 기록해야 합니다."""
+        self.register()
+        with tempfile.TemporaryDirectory() as directory:
+            with self.client.application.app_context():
+                processed = outbox_worker.drain_once(FileTransport(directory))
+                self.assertEqual(processed, 1)
+                self.assertEqual(
+                    EmailOutboxModel.query.one().status, EmailOutboxModel.SENT
+                )
+            self.assertEqual(len(os.listdir(directory)), 1)
+
+    def test_failed_email_should_be_retried_and_dead_lettered(self):
+        """
+        발송에 실패한 메일은 점점 긴 간격으로 재시도되어야 하고,
+        최대 시도 횟수를 넘으면 dead 상태가 되어야 합니다.
+        """
+        self.register()
+        with self.client.application.app_context():
+            max_attempts = self.client.application.config["MAIL_OUTBOX_MAX_ATTEMPTS"]
+            delays = []
+            for _ in range(max_attempts):
+                started_at = datetime.utcnow()
+                self.assertEqual(outbox_worker.drain_once(BrokenTransport()), 1)
+                email = EmailOutboxModel.query.one()
+                delays.append(email.next_attempt_at - started_at)
+                # 다음 시도 시각까지 기다린 것으로 처리
+                email.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+                db.session.commit()
+            email = EmailOutboxModel.query.one()
+            self.assertEqual(email.status, EmailOutboxModel.DEAD)
+            self.assertEqual(email.attempts, max_attempts)
+            self.assertIn("SMTP", email.last_error)
+            self.assertLess(delays[0], delays[1])
+            self.assertEqual(outbox_worker.drain_once(BrokenTransport()), 0)
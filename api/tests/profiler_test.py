@@ -0,0 +1,91 @@
+import os
+import shutil
+
+from api.models.user import UserModel
+from api.tests.message_test import MessageTest
+from api.utils.profiler import request_profiler
+
+
+class RequestProfilerTest(MessageTest):
+    """요청 프로파일링과 관리자 페이지의 프로파일 목록을 테스트합니다."""
+
+    def setUp(self):
+        super().setUp()
+        self.app = self.client.application
+        shutil.rmtree(self.app.config["PROFILER_DIR"], ignore_errors=True)
+        with self.app.app_context():
+            UserModel(
+                username="관리자",
+                password="1234",
+                email="admin@naver.com",
+                is_admin=True,
+            ).create_user()
+            # 관리자 id = 3
+
+    def tearDown(self):
+        self.app.config.update(PROFILER_SAMPLE_RATE=0.0, PROFILER_MAX_FILES=500)
+        super().tearDown()
+
+    def get_user(self, headers=None):
+        response = self.client.get(self.url + "/api/user/1", headers=headers or {})
+        self.assertEqual(200, response.status_code)
+
+    def get_token(self, user_id):
+        with self.app.app_context():
+            return request_profiler.create_token(user_id)
+
+    def test_unsampled_request_should_not_be_profiled(self):
+        self.get_user()
+        with self.app.app_context():
+            self.assertEqual(request_profiler.list_profiles(), [])
+
+    def test_sampled_request_should_be_saved_with_resource_and_latency(self):
+        self.app.config["PROFILER_SAMPLE_RATE"] = 1.0
+        self.get_user()
+        with self.app.app_context():
+            [profile] = request_profiler.list_profiles()
+            self.assertEqual(profile.resource, "UserInformation")
+            self.assertGreater(profile.latency_ms, 0)
+            self.assertIn("get_public_info", request_profiler.summarize(profile.name))
+
+    def test_signed_header_should_profile_only_for_admin(self):
+        header = self.app.config["PROFILER_HEADER"]
+        self.get_user({header: self.get_token(1)})  # 관리자가 아닌 사용자
+        self.get_user({header: self.get_token(3)[:-2] + "xx"})  # 변조된 값
+        with self.app.app_context():
+            self.assertEqual(request_profiler.list_profiles(), [])
+        self.get_user({header: self.get_token(3)})
+        with self.app.app_context():
+            self.assertEqual(len(request_profiler.list_profiles()), 1)
+
+    def test_only_slowest_profiles_should_be_kept(self):
+        self.app.config.update(PROFILER_SAMPLE_RATE=1.0, PROFILER_MAX_FILES=2)
+        for _ in range(4):
+            self.get_user()
+        with self.app.app_context():
+            profiles = request_profiler.list_profiles()
+        self.assertEqual(len(os.listdir(self.app.config["PROFILER_DIR"])), 2)
+        self.assertGreaterEqual(profiles[0].latency_ms, profiles[1].latency_ms)
+
+    def test_admin_should_list_and_download_profiles(self):
+        self.app.config["PROFILER_SAMPLE_RATE"] = 1.0
+        self.get_user()
+        self.app.config["PROFILER_SAMPLE_RATE"] = 0.0
+        self.client.post(
+            self.url + "/mfr-admin/login",
+            data={"email": "admin@naver.com", "password": "1234"},
+        )
+        response = self.client.get(self.url + "/mfr-admin/profiles")
+        self.assertEqual(200, response.status_code)
+        self.assertIn("UserInformation", response.get_data(as_text=True))
+
+        with self.app.app_context():
+            [profile] = request_profiler.list_profiles()
+        response = self.client.get(self.url + f"/mfr-admin/profiles/{profile.name}")
+        self.assertEqual(200, response.status_code)
+        with open(
+            os.path.join(self.app.config["PROFILER_DIR"], profile.name), "rb"
+        ) as file:
+            self.assertEqual(response.data, file.read())
+        response = self.client.get(self.url + "/mfr-admin/profiles/..%2Fapi.prof")
+        self.assertEqual(404, response.status_code)
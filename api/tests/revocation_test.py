@@ -0,0 +1,142 @@
+import json
+
+from flask_jwt_extended import decode_token
+
+from api.models.user import UserModel
+from api.revocation import token_revocation
+from api.tests import CommonTestCaseSetting
+from api.utils.revocation import (
+    BloomFilter,
+    MemoryRevocationBackend,
+    RedisRevocationBackend,
+    RevocationStore,
+)
+
+
+class RedisStandIn:
+    """테스트에서 redis 서버 대신 사용하는 최소한의 sorted set client 입니다."""
+
+    def __init__(self):
+        self.counters = {}
+        self.sorted_sets = {}
+
+    def eval(self, script, numkeys, *keys_and_args):
+        # RedisRevocationBackend.ADD_SCRIPT 만 흉내냄 (INCR 후 그 순번으로 ZADD)
+        assert script == RedisRevocationBackend.ADD_SCRIPT and numkeys == 2
+        sequence_key, log_key, member = keys_and_args
+        self.counters[sequence_key] = self.counters.get(sequence_key, 0) + 1
+        sequence = self.counters[sequence_key]
+        self.sorted_sets.setdefault(log_key, {})[member.encode()] = sequence
+        return sequence
+
+    def zrangebyscore(self, key, min, max, withscores=False):
+        minimum = float(min.lstrip("("))
+        items = sorted(self.sorted_sets.get(key, {}).items(), key=lambda x: x[1])
+        return [(member, score) for member, score in items if score > minimum]
+
+    def zscan_iter(self, key):
+        return list(self.sorted_sets.get(key, {}).items())
+
+    def zrem(self, key, *members):
+        for member in members:
+            self.sorted_sets.get(key, {}).pop(member, None)
+
+
+class FakeClock:
+    def __init__(self, now=1000):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class RevocationStoreTest(CommonTestCaseSetting):
+    """bloom filter 와 폐기 목록의 동작을 테스트합니다."""
+
+    def test_bloom_filter_should_not_have_false_negative(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for number in range(1000):
+            bloom.add(f"jti-{number}")
+        self.assertTrue(all(f"jti-{number}" in bloom for number in range(1000)))
+        false_positives = sum(f"other-{number}" in bloom for number in range(10000))
+        self.assertLess(false_positives, 300)
+
+    def test_revoked_token_should_expire(self):
+        clock = FakeClock()
+        store = RevocationStore(capacity=100, purge_seconds=60, clock=clock)
+        store.revoke("a", exp=1030)
+        store.revoke("b", exp=2000)
+        self.assertTrue(store.is_revoked("a"))
+        self.assertFalse(store.is_revoked("c"))
+        clock.now = 1100
+        self.assertFalse(store.is_revoked("a"))
+        self.assertTrue(store.is_revoked("b"))
+        self.assertEqual(len(store), 1)
+
+    def test_revocation_should_be_shared_through_backend(self):
+        for backend in [
+            MemoryRevocationBackend(),
+            RedisRevocationBackend(RedisStandIn()),
+        ]:
+            clock = FakeClock()
+            first = RevocationStore(backend, capacity=100, clock=clock)
+            second = RevocationStore(backend, capacity=100, clock=clock)
+            self.assertFalse(second.is_revoked("a"))
+            first.revoke("a", exp=2000)
+            # 동기화 주기가 지나기 전까지는 다른 워커에 반영되지 않음
+            self.assertFalse(second.is_revoked("a"))
+            clock.now += 1
+            self.assertTrue(second.is_revoked("a"))
+            clock.now = 3000
+            second.sync()
+            first.sync()
+            self.assertEqual(backend.load_since(0)[0], [])
+
+
+class TokenRevocationTest(CommonTestCaseSetting):
+    """로그아웃, refresh token 교체 시 토큰이 폐기되는지 테스트합니다."""
+
+    def setUp(self):
+        super().setUp()
+        with self.client.application.app_context():
+            UserModel(
+                username="미미",
+                password="1234",
+                email="meme@naver.com",
+                email_confirmed=True,
+            ).create_user()
+            # 테스트를 위한 사용자 "미미" 생성, id = 1
+
+    def login(self):
+        return self.client.post(
+            self.url + "/api/user/login",
+            content_type="application/json",
+            data=json.dumps({"email": "meme@naver.com", "password": "1234"}),
+        ).get_json()
+
+    def test_logout_should_revoke_access_token(self):
+        headers = {"Authorization": "Bearer " + self.login()["access_token"]}
+        response = self.client.post(self.url + "/api/user/logout", headers=headers)
+        self.assertEqual(204, response.status_code)
+        response = self.client.post(self.url + "/api/user/logout", headers=headers)
+        self.assertEqual(401, response.status_code)
+        self.assertEqual(response.get_json(), {"error": "폐기된 토큰입니다."})
+
+    def test_not_revoked_token_check_should_not_query(self):
+        access_token = self.login()["access_token"]
+        with self.client.application.app_context():
+            jwt_payload = decode_token(access_token)
+        with self.assertMaxQueries(0):
+            self.assertFalse(token_revocation.is_revoked(jwt_payload))
+
+    def test_used_refresh_token_should_be_revoked(self):
+        refresh_token = self.login()["refresh_token"]
+        headers = {"Authorization": "Bearer " + refresh_token}
+        self.assertEqual(
+            200,
+            self.client.post(
+                self.url + "/api/user/refresh", headers=headers
+            ).status_code,
+        )
+        with self.client.application.app_context():
+            self.assertTrue(token_revocation.is_revoked(decode_token(refresh_token)))
@@ -0,0 +1,81 @@
+from marshmallow import ValidationError
+
+from api.models.message import MessageModel
+from api.models.user import UserModel
+from api.schemas.message import MessageSchema
+from api.schemas.registry import schema_registry
+from api.schemas.user import UserInformationSchema
+from api.tests.message_test import MessageTest
+
+
+class SchemaRegistryTest(MessageTest):
+    """스키마 레지스트리의 dump / load 가 marshmallow 와 같은 결과를 만드는지 테스트합니다."""
+
+    def assertSameLoadError(self, data):
+        with self.assertRaises(ValidationError) as expected:
+            MessageSchema().load(data)
+        with self.assertRaises(ValidationError) as actual:
+            schema_registry.load(MessageSchema, data)
+        self.assertEqual(actual.exception.messages, expected.exception.messages)
+
+    def test_schema_instance_should_be_cached(self):
+        self.assertIs(
+            schema_registry.get(MessageSchema), schema_registry.get(MessageSchema)
+        )
+        self.assertIsNot(
+            schema_registry.get(MessageSchema),
+            schema_registry.get(MessageSchema, exclude=("author_name",)),
+        )
+
+    def test_dump_should_be_identical(self):
+        with self.client.application.app_context():
+            MessageModel(
+                user_id=1, author_id=2, message="", amount=99999, is_moneybag=True
+            ).save_to_db()
+            messages = MessageModel.query.all()
+            self.assertEqual(
+                list(schema_registry.dump(MessageSchema, messages, many=True)),
+                list(MessageSchema(many=True).dump(messages)),
+            )
+            for message in messages:
+                expected = MessageSchema(exclude=("author_name",)).dump(message)
+                actual = schema_registry.dump(
+                    MessageSchema, message, exclude=("author_name",)
+                )
+                self.assertEqual(list(actual.items()), list(expected.items()))
+            for user in UserModel.query.all():
+                self.assertEqual(
+                    list(schema_registry.dump(UserInformationSchema, user).items()),
+                    list(UserInformationSchema().dump(user).items()),
+                )
+
+    def test_load_should_be_identical(self):
+        data = {"message": "새해 복 많이 받아.", "amount": 1000, "is_moneybag": False}
+        with self.client.application.app_context():
+            expected = MessageSchema().load(dict(data))
+            actual = schema_registry.load(MessageSchema, dict(data))
+            for field in ["message", "amount", "is_moneybag", "id", "user_id"]:
+                self.assertEqual(getattr(actual, field), getattr(expected, field))
+            with self.assertRaises(ValueError):
+                schema_registry.load(MessageSchema, {**data, "amount": 777})
+
+            self.assertSameLoadError({"amount": 1000, "is_moneybag": False})
+            self.assertSameLoadError({**data, "amount": "천원"})
+            self.assertSameLoadError({**data, "amount": True})
+            self.assertSameLoadError({**data, "message": "가" * 151})
+            self.assertSameLoadError({**data, "unknown": 1})
+            self.assertSameLoadError([data])
+
+    def test_write_with_invalid_amount_should_400(self):
+        """화폐 단위를 벗어난 액수는 write_batch 와 같이 400 으로 응답해야 합니다."""
+        response = self.client.post(
+            self.url + "/api/user/1/messages",
+            json={"message": "새해 복 많이 받아.", "amount": 777, "is_moneybag": False},
+            headers=self.get_headers(2),
+        )
+        self.assertEqual(400, response.status_code)
+        self.assertEqual(
+            response.get_json(), {"error": "화폐단위에 벗어난 액수를 선택하려면 돈봉투를 사용하세요."}
+        )
+        with self.client.application.app_context():
+            self.assertEqual(MessageModel.query.count(), 1)
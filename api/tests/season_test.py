@@ -0,0 +1,129 @@
+import glob
+import os
+from datetime import datetime
+
+from api import MessageModel, UserAggregateModel, UserModel
+from api.cache import cache
+from api.db import db
+from api.tests.message_test import MessageTest
+from api.utils.archive import message_archive
+
+
+class MessageSeasonTest(MessageTest):
+    """시즌별 쪽지 저장, 끝난 시즌의 보관과 보관된 쪽지 조회를 테스트합니다."""
+
+    def setUp(self):
+        super().setUp()
+        self.app = self.client.application
+        for path in glob.glob(
+            os.path.join(self.app.config["MESSAGE_ARCHIVE_DIR"], "*")
+        ):
+            os.remove(path)
+        self.original_season = self.app.config["MESSAGE_SEASON"]
+        self.original_open_datetimes = self.app.config["MESSAGE_OPEN_DATETIMES"]
+        with self.app.app_context():
+            for user_id, amount in [(1, 100), (2, 500), (1, 5000), (2, 10000)]:
+                MessageModel(
+                    user_id=user_id,
+                    author_id=3 - user_id,
+                    message="새해 복 많이 받아.",
+                    amount=amount,
+                    is_moneybag=False,
+                ).save_to_db()
+            # 2023 시즌의 쪽지 : 미미 (1, 2, 4), 민수 (3, 5)
+        self.headers = self.get_headers(1)
+
+    def tearDown(self):
+        self.app.config["MESSAGE_SEASON"] = self.original_season
+        self.app.config["MESSAGE_OPEN_DATETIMES"] = self.original_open_datetimes
+        super().tearDown()
+
+    def start_season(self, season, open_datetime):
+        self.app.config["MESSAGE_SEASON"] = season
+        self.app.config["MESSAGE_OPEN_DATETIMES"] = {
+            **self.original_open_datetimes,
+            season: open_datetime,
+        }
+        cache.clear()
+
+    def get_list(self, url):
+        return self.client.get(self.url + url, headers=self.headers)
+
+    def test_open_datetime_should_be_configurable_per_season(self):
+        self.start_season(2099, datetime(2099, 2, 10))
+        response = self.get_list("/api/user/1/messages")
+        self.assertEqual(400, response.status_code)
+        self.assertEqual(response.get_json(), {"error": "쪽지는 10일 이후에만 조회할 수 있습니다."})
+
+    def test_hot_queries_should_read_only_current_season(self):
+        self.start_season(2024, datetime(2024, 2, 10))
+        with self.app.app_context():
+            MessageModel(
+                user_id=1, author_id=2, message="올해도", amount=1000, is_moneybag=False
+            ).save_to_db()
+            self.assertEqual(MessageModel.find_by_id(6).season, 2024)
+            UserAggregateModel.reconcile()
+            db.session.commit()
+        for url in ["/api/user/1/messages", "/api/user/1/messages?cursor="]:
+            body = self.get_list(url).get_json()
+            self.assertEqual([message["id"] for message in body["messages"]], [6])
+            self.assertEqual(body["message_set_count"], 1)
+            self.assertEqual(body["user_info"]["total_amount"], 1000)
+        self.assertEqual(
+            404, self.client.get(self.url + "/api/user/1/messages/1").status_code
+        )
+        self.assertEqual(
+            200, self.client.get(self.url + "/api/user/1/messages/6").status_code
+        )
+
+    def test_archive_should_move_finished_season_to_files(self):
+        expected = self.get_list("/api/user/1/messages").get_json()["messages"]
+        self.start_season(2024, datetime(2024, 2, 10))
+        with self.app.app_context():
+            MessageModel(
+                user_id=1, author_id=2, message="올해도", amount=1000, is_moneybag=False
+            ).save_to_db()
+            self.assertEqual(MessageModel.finished_seasons(), [2023])
+            self.assertEqual(message_archive.archive_season(2023, chunk_size=2), 5)
+            self.assertEqual([message.id for message in MessageModel.query], [6])
+            self.assertEqual(MessageModel.finished_seasons(), [])
+            self.assertEqual(len(message_archive.read_index(2023)), 3)
+            self.assertEqual(UserModel.get(1).total_amount, 1000)
+            # 다시 실행해도 중복으로 보관하지 않음
+            self.assertEqual(message_archive.archive_season(2023), 0)
+
+        response = self.get_list("/api/user/1/archive/2023/messages")
+        self.assertEqual(200, response.status_code)
+        body = response.get_json()
+        self.assertEqual(body["season"], 2023)
+        self.assertEqual(body["message_set_count"], 3)
+        self.assertEqual(body["messages"], expected)
+        self.assertIsNone(body["next"])
+
+    def test_archive_should_resume_after_crash(self):
+        self.start_season(2024, datetime(2024, 2, 10))
+        with self.app.app_context():
+            # 파일에 기록했지만 삭제하기 전에 종료된 상황
+            message_archive.append(2023, MessageModel.find_archive_chunk(2023, None, 2))
+            self.assertEqual(message_archive.archive_season(2023, chunk_size=2), 3)
+            self.assertEqual(MessageModel.query.count(), 0)
+            archived = message_archive.find_user_messages(2023, 1)
+            self.assertEqual([message.id for message in archived], [4, 2, 1])
+            self.assertEqual(archived[0].author_name, "민수")
+
+    def test_archive_api_should_be_read_only_for_owner(self):
+        self.start_season(2024, datetime(2024, 2, 10))
+        with self.app.app_context():
+            message_archive.archive_season(2023)
+        self.assertEqual(
+            403, self.get_list("/api/user/2/archive/2023/messages").status_code
+        )
+        response = self.get_list("/api/user/1/archive/2022/messages")
+        self.assertEqual(404, response.status_code)
+        self.assertEqual(response.get_json(), {"error": "보관된 쪽지를 찾을 수 없습니다."})
+        self.assertEqual(
+            405,
+            self.client.post(
+                self.url + "/api/user/1/archive/2023/messages", headers=self.headers
+            ).status_code,
+        )
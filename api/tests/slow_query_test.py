@@ -0,0 +1,93 @@
+import json
+
+from api.db import db
+from api.models.user import UserModel
+from api.tests.message_test import MessageTest
+from api.utils.slow_query import get_query_shape, slow_query_log
+
+
+class SlowQueryLogTest(MessageTest):
+    """느린 SQL 문 기록과 형태별 통계를 테스트합니다."""
+
+    def setUp(self):
+        super().setUp()
+        self.app = self.client.application
+        slow_query_log.clear()
+        slow_query_log.threshold_ms = 0  # 모든 SQL 문을 느린 것으로 기록
+        self.log_path = self.app.config["SLOW_QUERY_LOG_PATH"]
+        # 핸들러가 파일을 열어둔 채로 이어서 쓰므로, 지우지 않고 비움
+        open(self.log_path, "w").close()
+
+    def tearDown(self):
+        slow_query_log.threshold_ms = self.app.config["SLOW_QUERY_THRESHOLD_MS"]
+        slow_query_log.clear()
+        super().tearDown()
+
+    def read_log(self):
+        with open(self.log_path, encoding="utf-8") as file:
+            return [json.loads(line) for line in file]
+
+    def test_slow_query_should_be_logged_with_caller_and_plan(self):
+        response = self.client.get(
+            self.url + "/api/user/1/messages?page=1", headers=self.get_headers(1)
+        )
+        self.assertEqual(200, response.status_code)
+        entries = self.read_log()
+        list_entries = [
+            entry
+            for entry in entries
+            if entry["caller"].startswith("MessageService.")
+            and '"Message"' in entry["statement"]
+        ]
+        self.assertTrue(list_entries, entries)
+        self.assertTrue(list_entries[0]["plan"])
+        self.assertIn("1", list_entries[0]["parameters"])
+
+        stats = slow_query_log.stats()
+        self.assertEqual(
+            [summary["total_ms"] for summary in stats],
+            sorted((summary["total_ms"] for summary in stats), reverse=True),
+        )
+        callers = {caller for summary in stats for caller in summary["callers"]}
+        self.assertIn("MessageService.get_list_page", callers)
+
+    def test_same_shape_should_be_aggregated(self):
+        with self.app.app_context():
+            with db.engine.connect() as connection:
+                for duration_ms in range(1, 101):
+                    slow_query_log.record(
+                        connection,
+                        'SELECT id FROM "Message" WHERE user_id = ?',
+                        (duration_ms,),
+                        duration_ms,
+                    )
+        [summary] = slow_query_log.stats()
+        self.assertEqual(summary["count"], 100)
+        self.assertEqual(summary["p50_ms"], 50)
+        self.assertEqual(summary["p99_ms"], 99)
+        self.assertEqual(summary["last_parameters"], ["100"])
+        self.assertIsNotNone(summary["uses_index"])
+        self.assertEqual(len(self.read_log()), 100)
+
+    def test_parameter_lists_should_have_same_shape(self):
+        self.assertEqual(
+            get_query_shape("SELECT * FROM user WHERE id IN (?, ?)"),
+            get_query_shape("SELECT *\n  FROM user WHERE id IN (?,?,?)"),
+        )
+
+    def test_admin_page_should_list_slow_queries(self):
+        with self.app.app_context():
+            UserModel(
+                username="관리자",
+                password="1234",
+                email="admin@naver.com",
+                is_admin=True,
+            ).create_user()
+        self.client.get(self.url + "/api/user/1")
+        self.client.post(
+            self.url + "/mfr-admin/login",
+            data={"email": "admin@naver.com", "password": "1234"},
+        )
+        response = self.client.get(self.url + "/mfr-admin/slow-queries")
+        self.assertEqual(200, response.status_code)
+        self.assertIn("UserService", response.get_data(as_text=True))
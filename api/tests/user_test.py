@@ -1,9 +1,15 @@
 import json
+from datetime import datetime
 
 from flask_jwt_extended import create_access_token, decode_token
+from werkzeug.security import generate_password_hash
 
-from api.models.user import UserModel
+from api.db import db, unit_of_work
+from api.models.message import MessageModel
+from api.models.user import RefreshTokenModel, UserAggregateModel, UserModel
+from api.resources.admin import MessageAdminView
 from api.utils.auth import create_username_access_token
+from api.utils.password import PasswordHasher, password_hasher
 
 from . import CommonTestCaseSetting
 
@@ -338,3 +344,405 @@ class LoginTest(CommonTestCaseSetting):
         self.assertEqual(
             second_response.get_json(), {"error": "refresh token 은 2회 이상 사용될 수 없습니다."}
         )
+
+
+class PasswordHashTest(CommonTestCaseSetting):
+    """비밀번호 해시 생성, 검증과 해시 갱신을 테스트합니다."""
+
+    def setUp(self):
+        super().setUp()
+        with self.client.application.app_context():
+            UserModel(
+                username="미미",
+                password=generate_password_hash("1234", "pbkdf2:sha256:2000"),
+                email="meme@naver.com",
+                email_confirmed=True,
+            ).save_to_db()
+            # 현재 설정과 다른 비용으로 해시된 비밀번호를 가진 사용자 "미미" 생성, id = 1
+
+    def login(self, password):
+        return self.client.post(
+            self.url + "/api/user/login",
+            content_type="application/json",
+            data=json.dumps({"email": "meme@naver.com", "password": password}),
+        )
+
+    def test_login_should_upgrade_outdated_hash(self):
+        """로그인에 성공하면, 오래된 설정의 해시가 현재 설정의 해시로 바뀌어야 합니다."""
+        self.assertEqual(401, self.login("틀린 비밀번호").status_code)
+        with self.client.application.app_context():
+            self.assertTrue(
+                UserModel.find_by_id(1).password.startswith("pbkdf2:sha256:2000$")
+            )
+        self.assertEqual(200, self.login("1234").status_code)
+        with self.client.application.app_context():
+            password = UserModel.find_by_id(1).password
+            self.assertFalse(password_hasher.needs_rehash(password))
+        self.assertEqual(200, self.login("1234").status_code)
+
+    def test_process_pool_should_hash_and_verify(self):
+        """프로세스 풀에서 만든 해시도 검증할 수 있어야 합니다."""
+        hasher = PasswordHasher()
+        hasher.method, hasher.workers = "pbkdf2:sha256:1000", 1
+        try:
+            pwhash = hasher.hash("1234")
+            self.assertTrue(hasher.verify(pwhash, "1234"))
+            self.assertFalse(hasher.verify(pwhash, "4321"))
+            self.assertFalse(hasher.needs_rehash(pwhash))
+        finally:
+            hasher.shutdown()
+
+
+class UserAggregateTest(CommonTestCaseSetting):
+    """사용자가 받은 쪽지에 대한 집계를 테스트합니다."""
+
+    def setUp(self):
+        super().setUp()
+        with self.client.application.app_context():
+            UserModel(
+                username="미미",
+                password="1234",
+                email="meme@naver.com",
+                email_confirmed=True,
+            ).save_to_db()
+            # 테스트를 위한 사용자 "미미" 생성, id = 1
+            UserModel(
+                username="민수",
+                password="1234",
+                email="minsu@naver.com",
+                email_confirmed=True,
+            ).save_to_db()
+            # 테스트를 위한 사용자 "민수" 생성, id = 2
+
+    def write_message(self, amount, is_moneybag=False):
+        """민수가 미미에게 쪽지를 작성합니다."""
+        with self.client.application.app_context():
+            access_token = create_username_access_token(UserModel.find_by_id(2))
+        return self.client.post(
+            self.url + "/api/user/1/messages",
+            content_type="application/json",
+            data=json.dumps(
+                {
+                    "message": "새해 복 많이 받아.",
+                    "amount": amount,
+                    "is_moneybag": is_moneybag,
+                }
+            ),
+            headers={"Authorization": "Bearer " + access_token},
+        )
+
+    def test_written_messages_should_be_aggregated(self):
+        """쪽지가 작성되면, 받은 사람의 금액 합계와 쪽지 개수가 갱신되어야 합니다."""
+        self.write_message(1000)
+        last_message_id = self.write_message(5001, is_moneybag=True).get_json()["id"]
+        response = self.client.get(self.url + "/api/user/1")
+        self.assertEqual(
+            response.get_json(), {"user_info": {"total_amount": 6001, "username": "미미"}}
+        )
+        with self.client.application.app_context():
+            user = UserModel.find_by_id(1)
+            self.assertEqual(user.message_set_count, 2)
+            self.assertEqual(user.aggregate.last_message_id, last_message_id)
+
+    def test_author_withdraw_should_update_recipient_aggregate(self):
+        """쪽지를 작성한 사용자가 탈퇴하면, 받은 사람의 집계에서 빠져야 합니다."""
+        self.write_message(1000)
+        with self.client.application.app_context():
+            UserModel.find_by_id(2).delete_from_db()
+            user = UserModel.find_by_id(1)
+            self.assertEqual(user.total_amount, 0)
+            self.assertEqual(user.message_set_count, 0)
+            self.assertIsNone(user.aggregate.last_message_id)
+
+    def test_reconcile_should_fix_drifted_aggregate(self):
+        """집계가 실제 쪽지와 어긋나 있다면, reconcile 이 이를 보고하고 바로잡아야 합니다."""
+        self.write_message(1000)
+        with self.client.application.app_context():
+            aggregate = UserAggregateModel.query.get(1)
+            aggregate.total_amount = 0
+            db.session.commit()
+            drifts = UserAggregateModel.reconcile()
+            db.session.commit()
+            self.assertEqual(len(drifts), 1)
+            self.assertEqual(drifts[0][0], 1)
+            self.assertEqual(UserModel.find_by_id(1).total_amount, 1000)
+            self.assertEqual(UserAggregateModel.reconcile(), [])
+
+    def test_first_messages_should_upsert_aggregate(self):
+        """집계 레코드가 없는 사용자의 쪽지도 UPDATE 없이 하나의 upsert 문으로 반영되어야 합니다."""
+        with self.client.application.app_context():
+            message = MessageModel(
+                user_id=1, author_id=2, message="복", amount=100, is_moneybag=False
+            )
+            with self.count_queries() as statements:
+                message.save_to_db()
+            self.assertEqual(
+                [s for s in statements if "UserAggregate" in s][0].split()[:3],
+                ["INSERT", "INTO", '"UserAggregate"'],
+            )
+            self.assertFalse(any(s.startswith("UPDATE") for s in statements))
+            # 다른 요청이 먼저 집계 레코드를 만든 뒤여도 충돌하지 않고 더해짐
+            UserAggregateModel.add_batch({1: (500, 1, 10), 2: (1000, 2, 11)})
+            db.session.commit()
+            self.assertEqual(UserAggregateModel.query.get(1).total_amount, 600)
+            self.assertEqual(UserAggregateModel.query.get(1).message_count, 2)
+            self.assertEqual(UserAggregateModel.query.get(1).last_message_id, 10)
+            self.assertEqual(UserAggregateModel.query.get(2).message_count, 2)
+
+    def login_admin(self):
+        with self.client.application.app_context():
+            UserModel(
+                username="관리자",
+                password="1234",
+                email="admin@naver.com",
+                is_admin=True,
+            ).create_user()
+        self.client.post(
+            self.url + "/mfr-admin/login",
+            data={"email": "admin@naver.com", "password": "1234"},
+        )
+
+    def test_admin_delete_user_should_update_recipient_aggregate(self):
+        """관리자 페이지에서 작성자를 삭제하면, 받은 사람의 집계와 캐시된 정보가 갱신되어야 합니다."""
+        self.write_message(1000)
+        self.assertEqual(
+            self.client.get(self.url + "/api/user/1").get_json()["user_info"][
+                "total_amount"
+            ],
+            1000,
+        )
+        self.login_admin()
+        response = self.client.post(
+            self.url + "/mfr-admin/usermodel/delete/", data={"id": "2"}
+        )
+        self.assertEqual(302, response.status_code)
+        with self.client.application.app_context():
+            self.assertIsNone(UserModel.find_by_id(2))
+            self.assertEqual(UserModel.find_by_id(1).message_set_count, 0)
+        self.assertEqual(
+            self.client.get(self.url + "/api/user/1").get_json()["user_info"][
+                "total_amount"
+            ],
+            0,
+        )
+
+    def test_admin_message_change_and_delete_should_update_aggregate(self):
+        """관리자 페이지에서 쪽지를 수정하거나 삭제하면, 받은 사람의 집계가 갱신되어야 합니다."""
+        message_id = self.write_message(1000).get_json()["id"]
+        self.write_message(500)
+        app = self.client.application
+        view = MessageAdminView(MessageModel, db.session)
+
+        class AmountForm:
+            def populate_obj(self, model):
+                model.amount = 5000
+
+        with app.test_request_context():
+            message = MessageModel.find_by_id(message_id)
+            self.assertTrue(view.update_model(AmountForm(), message))
+            self.assertEqual(UserModel.find_by_id(1).total_amount, 5500)
+        with app.test_request_context():
+            self.assertTrue(view.delete_model(MessageModel.find_by_id(message_id)))
+            self.assertEqual(UserModel.find_by_id(1).total_amount, 500)
+            self.assertEqual(UserModel.find_by_id(1).message_set_count, 1)
+
+
+class UnitOfWorkTest(CommonTestCaseSetting):
+    """쓰기 요청 하나가 한 번의 커밋으로 처리되는지 테스트합니다."""
+
+    def setUp(self):
+        super().setUp()
+        with self.client.application.app_context():
+            UserModel(
+                username="미미",
+                password="1234",
+                email="meme@naver.com",
+                email_confirmed=True,
+            ).create_user()
+            # 테스트를 위한 사용자 "미미" 생성, id = 1
+            UserModel(
+                username="민수",
+                password="1234",
+                email="minsu@naver.com",
+                email_confirmed=True,
+            ).create_user()
+            # 테스트를 위한 사용자 "민수" 생성, id = 2
+
+    def get_headers(self, user_id):
+        with self.client.application.app_context():
+            access_token = create_username_access_token(UserModel.find_by_id(user_id))
+        return {"Authorization": "Bearer " + access_token}
+
+    def login(self):
+        return self.client.post(
+            self.url + "/api/user/login",
+            content_type="application/json",
+            data=json.dumps({"email": "meme@naver.com", "password": "1234"}),
+        )
+
+    def test_login_and_refresh_should_commit_once(self):
+        with self.count_commits() as commits:
+            refresh_token = self.login().get_json()["refresh_token"]
+        self.assertEqual(len(commits), 1)
+        with self.count_commits() as commits:
+            response = self.client.post(
+                self.url + "/api/user/refresh",
+                headers={"Authorization": "Bearer " + refresh_token},
+            )
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(len(commits), 1)
+
+    def test_write_message_should_commit_once(self):
+        """쪽지 저장과 받은 사람의 집계 갱신이 같은 커밋에 포함되어야 합니다."""
+        with self.count_commits() as commits:
+            response = self.client.post(
+                self.url + "/api/user/1/messages",
+                content_type="application/json",
+                data=json.dumps(
+                    {"message": "새해 복 많이 받아.", "amount": 1000, "is_moneybag": False}
+                ),
+                headers=self.get_headers(2),
+            )
+        self.assertEqual(201, response.status_code)
+        self.assertEqual(len(commits), 1)
+        with self.client.application.app_context():
+            self.assertEqual(UserModel.find_by_id(1).total_amount, 1000)
+
+    def test_update_info_and_withdraw_should_commit_once(self):
+        with self.count_commits() as commits:
+            response = self.client.put(
+                self.url + "/api/user/2",
+                content_type="application/json",
+                data=json.dumps({"username": "민수민수"}),
+                headers=self.get_headers(2),
+            )
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(len(commits), 1)
+        with self.count_commits() as commits:
+            response = self.client.delete(
+                self.url + "/api/user/withdraw",
+                content_type="application/json",
+                data=json.dumps({"username": "미미"}),
+                headers=self.get_headers(1),
+            )
+        self.assertEqual(204, response.status_code)
+        self.assertEqual(len(commits), 1)
+
+    def test_failed_unit_of_work_should_rollback(self):
+        """블록 안에서 예외가 발생하면, 블록 안의 변경 사항은 모두 취소되어야 합니다."""
+        with self.client.application.app_context():
+            user = UserModel.find_by_id(1)
+            with self.assertRaises(RuntimeError):
+                with unit_of_work():
+                    user.update_user_info("미미미")
+                    raise RuntimeError
+            self.assertEqual(UserModel.find_by_id(1).username, "미미")
+
+
+class RefreshTokenStorageTest(CommonTestCaseSetting):
+    """refresh token 의 digest 저장, 조회와 만료된 토큰 정리를 테스트합니다."""
+
+    def setUp(self):
+        super().setUp()
+        with self.client.application.app_context():
+            UserModel(
+                username="미미",
+                password="1234",
+                email="meme@naver.com",
+                email_confirmed=True,
+            ).create_user()
+            # 테스트를 위한 사용자 "미미" 생성, id = 1
+
+    def login(self):
+        return self.client.post(
+            self.url + "/api/user/login",
+            content_type="application/json",
+            data=json.dumps({"email": "meme@naver.com", "password": "1234"}),
+        ).get_json()["refresh_token"]
+
+    def test_token_should_be_stored_as_digest(self):
+        refresh_token = self.login()
+        with self.client.application.app_context():
+            token = RefreshTokenModel.query.one()
+            self.assertEqual(len(token.refresh_token_digest), 64)
+            self.assertNotIn(refresh_token, token.refresh_token_digest)
+            with self.assertMaxQueries(1):
+                user = RefreshTokenModel.get_user_by_token(refresh_token)
+                self.assertEqual(user.token[0].id, token.id)
+            self.assertEqual(user.id, 1)
+
+    def test_expired_token_should_401_and_be_swept(self):
+        refresh_token = self.login()
+        with self.client.application.app_context():
+            RefreshTokenModel.query.one().expires_at = datetime.utcnow()
+            db.session.commit()
+        response = self.client.post(
+            self.url + "/api/user/refresh",
+            headers={"Authorization": "Bearer " + refresh_token},
+        )
+        self.assertEqual(401, response.status_code)
+        with self.client.application.app_context():
+            self.assertEqual(RefreshTokenModel.delete_expired(chunk_size=1), 1)
+            self.assertEqual(RefreshTokenModel.query.count(), 0)
+
+
+class UserIdentityMapTest(CommonTestCaseSetting):
+    """한 요청 안에서 같은 사용자를 한 번만 불러오는지 테스트합니다."""
+
+    def setUp(self):
+        super().setUp()
+        with self.client.application.app_context():
+            for number in range(1, 4):
+                UserModel(
+                    username=f"토끼{number}",
+                    password="1234",
+                    email=f"rabbit{number}@naver.com",
+                    email_confirmed=True,
+                ).save_to_db()
+            # 테스트를 위한 사용자 3명 생성, id = 1 ~ 3
+
+    def count_user_queries(self, statements):
+        return len([s for s in statements if s.startswith('SELECT "User".id')])
+
+    def test_get_many_should_query_only_missing_users(self):
+        with self.client.application.app_context():
+            with self.assertMaxQueries(1):
+                user = UserModel.get(1)
+                self.assertIs(UserModel.get(1), user)
+            with self.assertMaxQueries(1):
+                users = UserModel.get_many([1, 2, 3, 4])
+            self.assertEqual(sorted(users), [1, 2, 3])
+            self.assertIs(users[1], user)
+            with self.assertMaxQueries(0):
+                UserModel.get_many([2, 3])
+
+    def test_write_message_should_load_each_user_once(self):
+        with self.client.application.app_context():
+            access_token = create_username_access_token(UserModel.get(2))
+        with self.count_queries() as statements:
+            response = self.client.post(
+                self.url + "/api/user/1/messages",
+                content_type="application/json",
+                data=json.dumps(
+                    {"message": "새해 복 많이 받아.", "amount": 1000, "is_moneybag": False}
+                ),
+                headers={"Authorization": "Bearer " + access_token},
+            )
+        self.assertEqual(201, response.status_code)
+        self.assertEqual(response.get_json()["author_name"], "토끼2")
+        # 토큰의 사용자 (작성자), 받는 사용자
+        self.assertEqual(self.count_user_queries(statements), 2)
+
+    def test_deleted_user_token_should_404(self):
+        with self.client.application.app_context():
+            user = UserModel.get(3)
+            access_token = create_username_access_token(user)
+            user.delete_from_db()
+        response = self.client.delete(
+            self.url + "/api/user/withdraw",
+            content_type="application/json",
+            data=json.dumps({"username": "토끼3"}),
+            headers={"Authorization": "Bearer " + access_token},
+        )
+        self.assertEqual(404, response.status_code)
+        self.assertEqual(response.get_json(), {"error": "사용자를 찾을 수 없습니다."})
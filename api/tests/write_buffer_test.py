@@ -0,0 +1,290 @@
+import glob
+import json
+import os
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+
+from api.db import db
+from api.models.message import MessageModel, MessageWriteCheckpointModel
+from api.models.user import UserModel
+from api.tests.message_test import MessageTest
+from api.utils.write_buffer import (
+    MessageWriteBuffer,
+    WriteBufferFull,
+    message_write_buffer,
+)
+
+
+class FlakyWriteBuffer(MessageWriteBuffer):
+    """첫 번째 저장에서 일시적인 에러 (연결 끊김) 가 발생하는 쓰기 버퍼입니다."""
+
+    failures = 1
+
+    def _save_batch(self, wal_id, batch):
+        if self.failures:
+            self.failures -= 1
+            raise OperationalError("INSERT", {}, Exception("connection lost"))
+        super()._save_batch(wal_id, batch)
+
+
+class DeadLetterFailingWriteBuffer(MessageWriteBuffer):
+    """첫 번째 dead letter 기록에서 에러 (디스크 공간 부족) 가 발생하는 쓰기 버퍼입니다."""
+
+    failures = 1
+
+    def _dead_letter(self, wal_id, record, error):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("No space left on device")
+        super()._dead_letter(wal_id, record, error)
+
+
+class RacingWriteBuffer(MessageWriteBuffer):
+    """WAL 파일을 연 뒤 잠금을 얻기 전에, 다른 프로세스가 같은 파일을 먼저 복구하는 쓰기 버퍼입니다."""
+
+    def _lock_wal(self, wal, path):
+        MessageWriteBuffer(self.app).recover()
+        return super()._lock_wal(wal, path)
+
+
+class MessageWriteBufferTest(MessageTest):
+    """쪽지 쓰기 버퍼의 WAL 기록, 묶음 저장과 복구를 테스트합니다."""
+
+    def setUp(self):
+        super().setUp()
+        self.app = self.client.application
+        for path in glob.glob(
+            os.path.join(self.app.config["MESSAGE_WRITE_BUFFER_WAL_DIR"], "*.wal")
+        ):
+            os.remove(path)
+        self.dead_letter_path = self.app.config["MESSAGE_WRITE_BUFFER_DEAD_LETTER_PATH"]
+        if os.path.exists(self.dead_letter_path):
+            os.remove(self.dead_letter_path)
+
+    def tearDown(self):
+        if message_write_buffer.enabled:
+            with self.app.app_context():
+                message_write_buffer.flush_once()
+            message_write_buffer.close()
+        super().tearDown()
+
+    def make_row(self, amount):
+        return {
+            "user_id": 1,
+            "author_id": 2,
+            "message": "새해 복 많이 받아.",
+            "amount": amount,
+            "is_moneybag": False,
+        }
+
+    @contextmanager
+    def foreign_keys(self):
+        """SQLite 에서도 (MySQL 과 같이) 외래 키 제약을 검사하도록 연결마다 설정합니다."""
+        engine = db.get_engine(self.app)
+
+        def connect(dbapi_connection, connection_record):
+            dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+        event.listen(engine, "connect", connect)
+        engine.dispose()
+        try:
+            yield
+        finally:
+            event.remove(engine, "connect", connect)
+            engine.dispose()
+
+    def read_dead_letters(self):
+        with open(self.dead_letter_path, encoding="utf-8") as dead_letter:
+            return [json.loads(line) for line in dead_letter]
+
+    def crash(self, buffer):
+        """저장하지 않은 기록을 WAL 에 남긴 채로 프로세스가 종료된 상황을 만듭니다."""
+        buffer._wal.close()
+        buffer._wal = None
+
+    def test_flush_should_save_batch_with_aggregate(self):
+        buffer = MessageWriteBuffer(self.app)
+        buffer.open()
+        for amount in [100, 500, 1000]:
+            buffer.submit(self.make_row(amount))
+        with open(buffer.wal_path, encoding="utf-8") as wal:
+            self.assertEqual(len(wal.readlines()), 3)
+        with self.app.app_context():
+            with self.count_commits() as commits:
+                self.assertEqual(buffer.flush_once(), 3)
+            self.assertEqual(len(commits), 1)
+            user = UserModel.get(1)
+            self.assertEqual(user.total_amount, 2600)
+            self.assertEqual(user.message_set_count, 4)
+            self.assertEqual(user.aggregate.last_message_id, 4)
+            self.assertEqual(
+                MessageWriteCheckpointModel.get_last_sequence(buffer._wal_id), 3
+            )
+        wal_path = buffer.wal_path
+        buffer.close()
+        self.assertFalse(os.path.exists(wal_path))
+
+    def test_write_should_202_and_be_saved_after_flush(self):
+        message_write_buffer.open()
+        response = self.client.post(
+            self.url + "/api/user/1/messages",
+            content_type="application/json",
+            data=json.dumps(
+                {"message": "새해 복 많이 받아.", "amount": 5000, "is_moneybag": True}
+            ),
+            headers=self.get_headers(2),
+        )
+        self.assertEqual(202, response.status_code)
+        self.assertIsNone(response.get_json()["id"])
+        self.assertEqual(response.get_json()["author_name"], "민수")
+        self.assertEqual(
+            self.client.get(self.url + "/api/user/1").get_json()["user_info"][
+                "total_amount"
+            ],
+            1000,
+        )
+        with self.app.app_context():
+            message_write_buffer.flush_once()
+        # 저장이 끝나면 캐시된 사용자 정보도 무효화되어야 함
+        self.assertEqual(
+            self.client.get(self.url + "/api/user/1").get_json()["user_info"][
+                "total_amount"
+            ],
+            6000,
+        )
+
+    def test_recover_should_apply_only_unsaved_records(self):
+        buffer = MessageWriteBuffer(self.app)
+        buffer.open()
+        buffer.submit(self.make_row(100))
+        with self.app.app_context():
+            buffer.flush_once()
+        buffer.submit(self.make_row(500))
+        wal_path = buffer.wal_path
+        self.crash(buffer)
+        with open(wal_path, "a", encoding="utf-8") as wal:
+            wal.write('{"sequence": 3, "user_id"')  # 기록 도중 종료되어 잘린 줄
+
+        with self.app.app_context():
+            self.assertEqual(MessageWriteBuffer(self.app).recover(), 1)
+            self.assertEqual(
+                [message.amount for message in MessageModel.query], [1000, 100, 500]
+            )
+            self.assertEqual(UserModel.get(1).total_amount, 1600)
+            self.assertEqual(MessageWriteCheckpointModel.query.count(), 0)
+            self.assertFalse(os.path.exists(wal_path))
+            self.assertEqual(MessageWriteBuffer(self.app).recover(), 0)
+
+    def test_recover_should_skip_wal_of_running_process(self):
+        running = MessageWriteBuffer(self.app)
+        running.open()
+        running.submit(self.make_row(100))
+        with self.app.app_context():
+            self.assertEqual(MessageWriteBuffer(self.app).recover(), 0)
+            self.assertEqual(running.flush_once(), 1)
+        running.close()
+
+    def test_recover_should_skip_wal_recovered_by_other_process(self):
+        buffer = MessageWriteBuffer(self.app)
+        buffer.open()
+        buffer.submit(self.make_row(100))
+        buffer.submit(self.make_row(500))
+        self.crash(buffer)
+
+        with self.app.app_context():
+            self.assertEqual(RacingWriteBuffer(self.app).recover(), 0)
+            self.assertEqual(
+                [message.amount for message in MessageModel.query], [1000, 100, 500]
+            )
+            self.assertEqual(UserModel.get(1).total_amount, 1600)
+            self.assertEqual(MessageWriteCheckpointModel.query.count(), 0)
+
+    def test_full_buffer_should_reject(self):
+        max_size = self.app.config["MESSAGE_WRITE_BUFFER_MAX_SIZE"]
+        self.app.config["MESSAGE_WRITE_BUFFER_MAX_SIZE"] = 1
+        try:
+            buffer = MessageWriteBuffer(self.app)
+            buffer.open()
+        finally:
+            self.app.config["MESSAGE_WRITE_BUFFER_MAX_SIZE"] = max_size
+        buffer.submit(self.make_row(100))
+        with self.assertRaises(WriteBufferFull):
+            buffer.submit(self.make_row(100))
+        with self.app.app_context():
+            buffer.flush_once()
+        buffer.close()
+
+    def test_deleted_recipient_should_be_dead_lettered(self):
+        with self.app.app_context():
+            UserModel(
+                username="토끼", password="1234", email="rabbit@naver.com"
+            ).save_to_db()
+            # 버퍼에 쪽지가 있는 동안 탈퇴할 사용자 "토끼", id = 3
+        buffer = MessageWriteBuffer(self.app)
+        buffer.open()
+        with self.foreign_keys():
+            buffer.submit(self.make_row(100))
+            buffer.submit({**self.make_row(500), "user_id": 3})
+            buffer.submit(self.make_row(1000))
+            with self.app.app_context():
+                UserModel.find_by_id(3).delete_from_db()
+                self.assertEqual(buffer.flush_once(), 3)
+                self.assertEqual(
+                    [message.amount for message in MessageModel.query],
+                    [1000, 100, 1000],
+                )
+                self.assertEqual(UserModel.get(1).total_amount, 2100)
+                self.assertEqual(
+                    MessageWriteCheckpointModel.get_last_sequence(buffer._wal_id), 3
+                )
+            dead_letters = self.read_dead_letters()
+            self.assertEqual(len(dead_letters), 1)
+            self.assertEqual(dead_letters[0]["sequence"], 2)
+            self.assertEqual(dead_letters[0]["user_id"], 3)
+            self.assertIn("FOREIGN KEY", dead_letters[0]["error"])
+
+            # 다시 시작한 프로세스의 복구도 같은 쪽지에서 막히지 않아야 함
+            buffer.submit({**self.make_row(5000), "user_id": 3})
+            buffer.submit(self.make_row(5000))
+            wal_path = buffer.wal_path
+            self.crash(buffer)
+            with self.app.app_context():
+                self.assertEqual(MessageWriteBuffer(self.app).recover(), 2)
+                self.assertEqual(UserModel.get(1).total_amount, 7100)
+            self.assertFalse(os.path.exists(wal_path))
+            self.assertEqual(len(self.read_dead_letters()), 2)
+
+    def test_operational_error_should_be_retried(self):
+        buffer = FlakyWriteBuffer(self.app)
+        buffer.open()
+        buffer.submit(self.make_row(100))
+        batch = [buffer._queue.get_nowait()]
+        with self.app.app_context():
+            self.assertTrue(buffer._save_with_retry(buffer._wal_id, batch))
+            self.assertEqual(UserModel.get(1).total_amount, 1100)
+        self.assertFalse(os.path.exists(self.dead_letter_path))
+        buffer.close()
+
+    def test_failed_dead_letter_should_be_retried(self):
+        with self.app.app_context():
+            UserModel(
+                username="토끼", password="1234", email="rabbit@naver.com"
+            ).save_to_db()
+        buffer = DeadLetterFailingWriteBuffer(self.app)
+        buffer.open()
+        with self.foreign_keys():
+            buffer.submit(self.make_row(100))
+            buffer.submit({**self.make_row(500), "user_id": 3})
+            batch = [buffer._queue.get_nowait() for _ in range(2)]
+            with self.app.app_context():
+                UserModel.find_by_id(3).delete_from_db()
+                self.assertTrue(buffer._save_with_retry(buffer._wal_id, batch))
+                self.assertEqual(UserModel.get(1).total_amount, 1100)
+                self.assertEqual(
+                    MessageWriteCheckpointModel.get_last_sequence(buffer._wal_id), 2
+                )
+        self.assertEqual(len(self.read_dead_letters()), 1)
+        self.assertEqual(buffer._flushed_sequence, buffer._sequence)
+        buffer.close()
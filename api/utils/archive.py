@@ -0,0 +1,162 @@
+import gzip
+import json
+import os
+from collections import namedtuple
+
+from flask import current_app
+
+from api.db import after_commit, commit
+from api.models.message import MessageModel
+
+ArchivedMessage = namedtuple(
+    "ArchivedMessage",
+    ["id", "user_id", "author_id", "author_name", "message", "amount", "is_moneybag"],
+)
+
+
+class MessageArchive:
+    """
+    끝난 시즌의 쪽지를 보관하는 압축된 append-only 파일
+
+    시즌마다 messages-<season>.jsonl.gz 에 쪽지를 (user_id, id) 순서로 한 줄씩 기록합니다.
+    한 번에 보관하는 묶음은 독립된 gzip member 로 파일 끝에 덧붙이고,
+    묶음의 위치와 처음, 마지막 (user_id, id) 를 messages-<season>.index 에 한 줄씩 기록합니다.
+    기록한 내용은 수정하지 않으며, index 에 기록된 묶음만 읽으므로
+    묶음을 덧붙이던 중 종료되어 남은 내용은 무시됩니다.
+
+    사용자의 쪽지를 읽을 때는 index 로 해당 사용자가 포함된 묶음만 찾아 압축을 풉니다.
+    """
+
+    def __init__(self, app=None):
+        self.app = app
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions["message_archive"] = self
+
+    @property
+    def archive_dir(self):
+        return self.app.config["MESSAGE_ARCHIVE_DIR"]
+
+    def _get_paths(self, season):
+        return (
+            os.path.join(self.archive_dir, f"messages-{season}.jsonl.gz"),
+            os.path.join(self.archive_dir, f"messages-{season}.index"),
+        )
+
+    def seasons(self):
+        """
+        보관된 시즌 목록
+        """
+        if not os.path.isdir(self.archive_dir):
+            return []
+        return sorted(
+            int(name[len("messages-") : -len(".index")])
+            for name in os.listdir(self.archive_dir)
+            if name.startswith("messages-") and name.endswith(".index")
+        )
+
+    def read_index(self, season):
+        """
+        시즌의 묶음 목록을 [{"offset", "length", "first", "last", "count"}, ...] 로 반환
+        """
+        _, index_path = self._get_paths(season)
+        if not os.path.exists(index_path):
+            return []
+        with open(index_path, encoding="utf-8") as index:
+            return [json.loads(line) for line in index if line.endswith("\n")]
+
+    def last_key(self, season):
+        """
+        마지막으로 보관한 쪽지의 (user_id, id), 보관한 쪽지가 없다면 None
+        """
+        index = self.read_index(season)
+        return tuple(index[-1]["last"]) if index else None
+
+    def append(self, season, rows):
+        """
+        (user_id, id) 순서로 정렬된 쪽지 묶음을 파일 끝에 덧붙이고, 기록이 끝나면 index 에 추가
+        """
+        os.makedirs(self.archive_dir, exist_ok=True)
+        data_path, index_path = self._get_paths(season)
+        data = gzip.compress(
+            "".join(
+                json.dumps(list(row), ensure_ascii=False) + "\n" for row in rows
+            ).encode("utf-8")
+        )
+        with open(data_path, "ab") as archive:
+            offset = archive.seek(0, os.SEEK_END)
+            archive.write(data)
+            archive.flush()
+            os.fsync(archive.fileno())
+        entry = {
+            "offset": offset,
+            "length": len(data),
+            "first": [rows[0].user_id, rows[0].id],
+            "last": [rows[-1].user_id, rows[-1].id],
+            "count": len(rows),
+        }
+        with open(index_path, "a", encoding="utf-8") as index:
+            index.write(json.dumps(entry) + "\n")
+            index.flush()
+            os.fsync(index.fileno())
+
+    def find_user_messages(self, season, user_id):
+        """
+        시즌에 보관된 사용자의 쪽지를 최신순으로 반환, 보관되지 않은 시즌이라면 None
+        """
+        data_path, _ = self._get_paths(season)
+        if season not in self.seasons():
+            return None
+        messages = []
+        with open(data_path, "rb") as archive:
+            for entry in self.read_index(season):
+                if not entry["first"][0] <= user_id <= entry["last"][0]:
+                    continue
+                archive.seek(entry["offset"])
+                lines = gzip.decompress(archive.read(entry["length"])).splitlines()
+                for line in lines:
+                    message = ArchivedMessage(*json.loads(line))
+                    if message.user_id == user_id:
+                        messages.append(message)
+        return messages[::-1]
+
+    def archive_season(self, season, chunk_size=None):
+        """
+        끝난 시즌의 쪽지를 묶음마다 파일에 덧붙인 뒤 Message 테이블에서 삭제하고,
+        보관한 쪽지 수를 반환합니다. 앱 컨텍스트 안에서 호출해야 합니다.
+
+        중간에 종료되더라도 다시 실행하면, 파일에 기록했지만 삭제하지 못한 쪽지를 삭제한 뒤
+        이어서 보관합니다.
+        """
+        chunk_size = chunk_size or current_app.config["MESSAGE_ARCHIVE_CHUNK_SIZE"]
+        last = self.last_key(season)
+        if last is not None:
+            self._delete_archived(season, last)
+        archived = 0
+        while True:
+            rows = MessageModel.find_archive_chunk(season, last, chunk_size)
+            if not rows:
+                return archived
+            self.append(season, rows)
+            last = (rows[-1].user_id, rows[-1].id)
+            self._delete_archived(season, last)
+            archived += len(rows)
+
+    def _delete_archived(self, season, until):
+        """
+        파일에 기록한 쪽지를 삭제하고, 수신자들의 (현재 시즌) 집계를 같은 트랜잭션에서 다시 계산
+        """
+        from api.models.user import UserAggregateModel, UserModel
+
+        deleted = MessageModel.delete_archived(season, until)
+        user_ids = list({user_id for _, user_id in deleted})
+        UserAggregateModel.rebuild(user_ids)
+        commit()
+        after_commit(lambda: UserModel.invalidate_info_cache(*user_ids))
+        after_commit(
+            lambda: MessageModel.invalidate_detail_cache(*[id for id, _ in deleted])
+        )
+
+
+message_archive = MessageArchive()
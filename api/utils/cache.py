@@ -0,0 +1,142 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+class MemoryCacheBackend:
+    """
+    프로세스 안에서 동작하는 LRU + TTL 캐시
+
+    max_size 개를 넘으면 가장 오래 사용되지 않은 항목부터 제거하고 (eviction),
+    ttl 초가 지난 항목은 조회할 때 제거합니다 (expiration).
+    """
+
+    def __init__(self, max_size=10000, ttl=60, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            value, expires_at = item
+            if expires_at <= self.clock():
+                del self._items[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = self.clock() + (ttl or self.ttl)
+        with self._lock:
+            self._items[key] = (value, expires_at)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._items.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def stats(self):
+        return {
+            "backend": "memory",
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "size": len(self._items),
+            "max_size": self.max_size,
+        }
+
+
+class RedisCacheBackend:
+    """
+    여러 워커 프로세스가 함께 사용하는 캐시
+
+    redis-py 와 같은 get / set(ex=) / delete / scan_iter 인터페이스를 가진 client 를 사용합니다.
+    값은 JSON 으로 직렬화하며, 만료와 eviction 은 서버가 처리합니다.
+    hits, misses 는 현재 프로세스 기준입니다.
+    """
+
+    def __init__(self, client, ttl=60, prefix="mfr:"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(value)
+
+    def set(self, key, value, ttl=None):
+        self.client.set(
+            self.prefix + key,
+            json.dumps(value, ensure_ascii=False),
+            ex=ttl or self.ttl,
+        )
+
+    def delete(self, *keys):
+        if keys:
+            self.client.delete(*[self.prefix + key for key in keys])
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self.prefix + "*"))
+        if keys:
+            self.client.delete(*keys)
+
+    def stats(self):
+        stats = {"backend": "redis", "hits": self.hits, "misses": self.misses}
+        try:
+            stats["evictions"] = self.client.info("stats").get("evicted_keys")
+        except AttributeError:
+            stats["evictions"] = None
+        return stats
+
+
+def create_cache_backend(config, config_prefix="CACHE", key_prefix="mfr:"):
+    """
+    앱 설정으로부터 캐시 백엔드를 생성합니다.
+
+    <config_prefix>_BACKEND 가 "redis" 이면 <config_prefix>_REDIS_URL 로 연결하고
+    (redis 패키지 필요), 그 외에는 프로세스 내부 캐시를 사용합니다.
+    프로세스 내부 캐시는 무효화가 다른 워커에 전달되지 않으므로,
+    <config_prefix>_MEMORY_TTL 이 있으면 기본 TTL 대신 사용합니다.
+    """
+    if config[f"{config_prefix}_BACKEND"] == "redis":
+        import redis
+
+        return RedisCacheBackend(
+            redis.Redis.from_url(config[f"{config_prefix}_REDIS_URL"]),
+            ttl=config[f"{config_prefix}_DEFAULT_TTL"],
+            prefix=key_prefix,
+        )
+    return MemoryCacheBackend(
+        max_size=config[f"{config_prefix}_MAX_SIZE"],
+        ttl=config.get(f"{config_prefix}_MEMORY_TTL")
+        or config[f"{config_prefix}_DEFAULT_TTL"],
+    )
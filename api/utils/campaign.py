@@ -0,0 +1,220 @@
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+
+from flask import render_template
+from flask_mail import Message
+
+from api.db import db
+from api.models.campaign import CampaignModel
+from api.utils.mail import SENDER, create_mail_transport
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """
+    여러 스레드가 함께 사용하는, 초당 rate 회로 실행 빈도를 제한하는 장치
+    rate 가 없으면 제한하지 않습니다.
+    """
+
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate else 0
+        self._next_at = 0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_at)
+            self._next_at = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class CampaignRunner:
+    """
+    알림 메일 발송 작업을 실행합니다.
+
+    - 사용자를 MAIL_CAMPAIGN_CHUNK_SIZE 명씩 id 순서로 나누어 조회하고,
+      받은 쪽지 개수에 따라 보낼 메일 템플릿을 고릅니다. (템플릿은 작업마다 한 번만 렌더링)
+    - MAIL_CAMPAIGN_CONCURRENCY 개의 스레드가 각자 하나의 SMTP 연결을 유지하며 발송하고,
+      전체 발송 속도는 초당 MAIL_CAMPAIGN_RATE_LIMIT 통으로 제한합니다.
+    - 한 묶음의 발송이 끝날 때마다 진행 상황을 저장하므로,
+      중단된 작업은 마지막으로 저장된 사용자 다음부터 이어서 발송할 수 있습니다.
+    - 작업은 데이터베이스에서 lease 로 가져가므로, 여러 프로세스 중 하나만 발송합니다.
+      진행 상황을 저장할 때마다 lease 를 연장하고, 관리자가 작업을 중단하면 (status 가 paused)
+      현재 묶음까지만 발송합니다. lease 가 만료된 작업은 다른 프로세스가 이어서 발송할 수 있습니다.
+    """
+
+    def __init__(self, app, campaign_id, transport=None, leased_at=None):
+        self.app = app
+        self.campaign_id = campaign_id
+        self.transport = transport or create_mail_transport(app)
+        self.leased_at = leased_at  # 이미 CampaignModel.claim 으로 가져간 경우의 lease
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._counts = {True: 0, False: 0, None: 0}  # 받은 사용자, 안 받은 사용자, 실패
+        self._last_error = None
+
+    def start(self):
+        """
+        백그라운드 스레드에서 발송 작업을 시작
+        """
+        thread = threading.Thread(
+            target=self.run, name=f"campaign-{self.campaign_id}", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def stop(self):
+        """
+        현재 묶음의 발송을 마친 뒤 작업을 중단
+        """
+        self._stop_event.set()
+
+    def run(self):
+        try:
+            with self.app.app_context():
+                self._run()
+                db.session.remove()
+        except Exception:
+            logger.exception("알림 메일 발송 작업 %s 이 실패했습니다.", self.campaign_id)
+
+    def _run(self):
+        config = self.app.config
+        leased_at = self.leased_at or CampaignModel.claim(
+            self.campaign_id, config["MAIL_CAMPAIGN_LEASE_SECONDS"]
+        )
+        if leased_at is None:
+            logger.info(
+                "알림 메일 발송 작업 %s 은 이미 끝났거나 다른 프로세스가 실행 중입니다.",
+                self.campaign_id,
+            )
+            return
+        last_user_id = CampaignModel.find_by_id(self.campaign_id).last_user_id
+
+        templates = {
+            True: render_template("received-alert-template.html"),
+            False: render_template("no-received-alert-template.html"),
+        }
+        concurrency = config["MAIL_CAMPAIGN_CONCURRENCY"]
+        send_queue = queue.Queue(maxsize=concurrency * 2)
+        rate_limiter = RateLimiter(config["MAIL_CAMPAIGN_RATE_LIMIT"])
+        senders = [
+            threading.Thread(
+                target=self._send_all,
+                args=(send_queue, rate_limiter),
+                name=f"campaign-{self.campaign_id}-sender-{number}",
+                daemon=True,
+            )
+            for number in range(concurrency)
+        ]
+        for sender in senders:
+            sender.start()
+
+        # 작업을 마칠 때 저장할 상태, None 이면 저장하지 않음 (관리자가 중단했거나 lease 를 잃음)
+        status = CampaignModel.PAUSED
+        try:
+            while not self._stop_event.is_set():
+                recipients = CampaignModel.find_recipients(
+                    last_user_id, config["MAIL_CAMPAIGN_CHUNK_SIZE"]
+                )
+                if not recipients:
+                    status = CampaignModel.FINISHED
+                    break
+                for user_id, username, email, message_count in recipients:
+                    has_received = message_count > 0
+                    message = self._build_message(
+                        username, email, templates[has_received], has_received
+                    )
+                    send_queue.put((message, has_received))
+                send_queue.join()
+                with self._lock:
+                    counts = self._counts
+                    self._counts = {True: 0, False: 0, None: 0}
+                    last_error = self._last_error
+                last_user_id = recipients[-1][0]
+                values = dict(
+                    last_user_id=last_user_id,
+                    received_count=CampaignModel.received_count + counts[True],
+                    not_received_count=CampaignModel.not_received_count + counts[False],
+                    failed_count=CampaignModel.failed_count + counts[None],
+                )
+                if last_error:
+                    values["last_error"] = last_error
+                leased_at = CampaignModel.renew(self.campaign_id, leased_at, **values)
+                if leased_at is None:
+                    logger.warning(
+                        "알림 메일 발송 작업 %s 을 다른 프로세스가 가져가서 중단합니다.",
+                        self.campaign_id,
+                    )
+                    status = None
+                    break
+                if CampaignModel.find_status(self.campaign_id) != CampaignModel.RUNNING:
+                    status = None
+                    break
+        finally:
+            for _ in senders:
+                send_queue.put(None)
+            for sender in senders:
+                sender.join()
+            if status is not None:
+                values = {"status": status}
+                if status == CampaignModel.FINISHED:
+                    values["finished_at"] = datetime.utcnow()
+                CampaignModel.renew(self.campaign_id, leased_at, **values)
+
+    @staticmethod
+    def _build_message(username, email, html, has_received):
+        if has_received:
+            subject = f"[Money For Rabbit] {username}님, 쪽지를 확인해 보세요!"
+        else:
+            subject = f"[Money For Rabbit] {username}님, 쪽지 링크를 공유해 보세요!"
+        return Message(subject, sender=SENDER, recipients=[email], html=html)
+
+    def _send_all(self, send_queue, rate_limiter):
+        """
+        하나의 연결을 유지하면서 큐에 들어오는 메일을 발송
+        연결에 문제가 생기면 다음 메일부터 새로 연결
+        """
+        with self.app.app_context():
+            connection_context = None
+            while True:
+                item = send_queue.get()
+                if item is None:
+                    send_queue.task_done()
+                    break
+                message, has_received = item
+                try:
+                    if connection_context is None:
+                        connection_context = self.transport.connect()
+                        connection = connection_context.__enter__()
+                    rate_limiter.wait()
+                    connection.send(message)
+                except Exception as e:
+                    logger.warning("메일 발송 실패 (%s) : %s", message.recipients, e)
+                    with self._lock:
+                        self._counts[None] += 1
+                        self._last_error = str(e)[:500]
+                    if connection_context is not None:
+                        self._close(connection_context)
+                        connection_context = None
+                else:
+                    with self._lock:
+                        self._counts[has_received] += 1
+                finally:
+                    send_queue.task_done()
+            if connection_context is not None:
+                self._close(connection_context)
+
+    @staticmethod
+    def _close(connection_context):
+        try:
+            connection_context.__exit__(None, None, None)
+        except Exception:
+            pass
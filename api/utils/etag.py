@@ -0,0 +1,43 @@
+import hashlib
+from functools import wraps
+
+from flask import request
+
+
+def make_etag(*parts):
+    """버전 정보들로부터 strong ETag 값 (따옴표 제외) 을 만듭니다."""
+    return hashlib.sha1("|".join(map(str, parts)).encode()).hexdigest()
+
+
+def conditional(get_version):
+    """flask_restful Resource 의 GET 메서드에 ETag, If-None-Match 처리를 추가합니다.
+
+    get_version 은 URL 파라미터를 키워드 인자로 받아, 응답 내용이 바뀌면 함께 바뀌는
+    가벼운 버전 정보 (tuple) 를 반환합니다. None 을 반환하면 (권한 없음, 사용자 없음 등)
+    조건부 처리 없이 원래 메서드를 실행합니다.
+
+    클라이언트가 보낸 ETag 가 현재 버전과 같다면, 원래 메서드와 직렬화를 실행하지 않고
+    304 로 응답합니다.
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            version = get_version(**kwargs)
+            if version is None:
+                return func(*args, **kwargs)
+            etag = make_etag(request.full_path, *version)
+            headers = {"ETag": f'"{etag}"'}
+            if request.if_none_match.contains(etag):
+                return "", 304, headers
+            response = func(*args, **kwargs)
+            if not isinstance(response, tuple):
+                response = (response, 200)
+            data, status, *rest = response
+            if status != 200:
+                return response
+            return data, status, {**(rest[0] if rest else {}), **headers}
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,135 @@
+from sqlalchemy import func
+from sqlalchemy.orm import Query
+
+from api.db import db
+
+
+def get_explain_prefix(dialect_name):
+    """데이터베이스 종류에 맞는 EXPLAIN 구문을 반환합니다."""
+    if dialect_name == "sqlite":
+        return "EXPLAIN QUERY PLAN "
+    return "EXPLAIN "
+
+
+def explain_sql(connection, statement, parameters=None):
+    """DBAPI 형식의 SQL 문과 파라미터로 실행 계획을 조회합니다.
+
+    Args:
+        connection: SQLAlchemy Connection
+        statement (str): 실행할 SQL 문
+        parameters (tuple | dict): statement 에 바인딩할 파라미터
+
+    Returns:
+        tuple: (인덱스 사용 여부, 실행 계획을 사람이 읽을 수 있게 정리한 문자열 목록)
+    """
+    dialect_name = connection.dialect.name
+    result = connection.exec_driver_sql(
+        get_explain_prefix(dialect_name) + statement, parameters or ()
+    )
+    rows = [dict(row._mapping) for row in result]
+    if dialect_name == "sqlite":
+        plan = [row["detail"] for row in rows]
+        full_scans = [
+            detail
+            for detail in plan
+            if detail.startswith("SCAN ") and "USING" not in detail
+        ]
+    else:
+        plan = [
+            f"{row.get('table')}: type={row.get('type')} key={row.get('key')} "
+            f"rows={row.get('rows')} {row.get('Extra') or ''}".strip()
+            for row in rows
+        ]
+        full_scans = [row for row in rows if row.get("type") == "ALL"]
+    return not full_scans, plan
+
+
+def explain_query(query):
+    """SQLAlchemy Query 또는 Core select 의 실행 계획을 조회합니다. 반환값은 explain_sql 과 같습니다."""
+    connection = db.session.connection()
+    statement = query.statement if isinstance(query, Query) else query
+    # IN 절 같은 확장 파라미터는 실행 시점에 펼쳐지므로 컴파일할 때 미리 펼침
+    compiled = statement.compile(
+        dialect=connection.dialect, compile_kwargs={"render_postcompile": True}
+    )
+    if compiled.positional:
+        parameters = tuple(compiled.params[name] for name in compiled.positiontup)
+    else:
+        parameters = compiled.params
+    return explain_sql(connection, str(compiled), parameters)
+
+
+def get_hot_queries(user_id=1, message_id=1, email="", username="", token=""):
+    """
+    서비스들이 실제로 실행하는 주요 조회 쿼리를 (이름, Query 또는 select) 목록으로 반환합니다.
+    쿼리는 모델의 쿼리 메서드로 만들므로 서비스가 실행하는 쿼리와 같습니다.
+    파라미터 값은 실행 계획에만 사용되므로 존재하지 않는 값이어도 됩니다.
+    """
+    from api.models.message import MessageModel
+    from api.models.user import RefreshTokenModel, UserModel
+    from api.services.message import MESSAGES_PER_PAGE
+
+    received_query = MessageModel.received_query(user_id)
+    return [
+        ("UserModel.find_by_id", UserModel.by_id_query(user_id)),
+        ("UserModel.find_by_email", UserModel.by_email_query(email)),
+        ("UserModel.find_by_username", UserModel.by_username_query(username)),
+        ("UserModel.get_many", UserModel.many_query([user_id])),
+        ("UserModel.get_version", UserModel.version_query(user_id)),
+        (
+            "MessageService.list_view (page)",
+            received_query.limit(MESSAGES_PER_PAGE).offset(MESSAGES_PER_PAGE),
+        ),
+        (
+            # paginate 는 Query.count() 로 전체 수를 셈
+            "MessageService.list_view (page count)",
+            db.session.query(func.count()).select_from(
+                received_query.order_by(None).subquery()
+            ),
+        ),
+        (
+            "MessageService.list_view (cursor next)",
+            MessageModel.received_by_keyset_query(
+                user_id, "next", message_id, MESSAGES_PER_PAGE + 1
+            ),
+        ),
+        (
+            "MessageService.list_view (cursor prev)",
+            MessageModel.received_by_keyset_query(
+                user_id, "prev", message_id, MESSAGES_PER_PAGE + 1
+            ),
+        ),
+        (
+            "MessageService.list_view (lean page)",
+            MessageModel.received_rows_page_query(user_id, 2, MESSAGES_PER_PAGE),
+        ),
+        (
+            "MessageService.list_view (lean page count)",
+            MessageModel.received_count_query(user_id),
+        ),
+        (
+            "MessageService.list_view (lean cursor next)",
+            MessageModel.received_rows_by_keyset_query(
+                user_id, "next", message_id, MESSAGES_PER_PAGE + 1
+            ),
+        ),
+        (
+            "MessageService.list_view (lean cursor prev)",
+            MessageModel.received_rows_by_keyset_query(
+                user_id, "prev", message_id, MESSAGES_PER_PAGE + 1
+            ),
+        ),
+        (
+            "MessageService.detail_view",
+            MessageModel.received_with_author_query(user_id, message_id),
+        ),
+        (
+            "UserModel.delete_from_db (recipients)",
+            MessageModel.recipient_ids_query(user_id),
+        ),
+        (
+            "RefreshTokenModel.get_user_by_token",
+            RefreshTokenModel.user_by_token_query(token),
+        ),
+        ("UserModel.token", RefreshTokenModel.query.filter_by(user_id=user_id)),
+    ]
@@ -1,9 +1,27 @@
 from datetime import datetime
 
 import pytz
+from flask import current_app
 
-MESSAGE_OPEN_DATETIME = datetime(2023, 1, 22, tzinfo=pytz.timezone("Asia/Seoul"))
+KST = pytz.timezone("Asia/Seoul")
 
 
 def get_korean_datetime():
-    return datetime.now(pytz.timezone("Asia/Seoul"))
+    return datetime.now(KST)
+
+
+def get_current_season():
+    """
+    현재 시즌 (설정 MESSAGE_SEASON, 연도)
+    새로 작성되는 쪽지는 현재 시즌으로 저장되고, 쪽지 조회는 현재 시즌만 대상으로 함
+    """
+    return current_app.config["MESSAGE_SEASON"]
+
+
+def get_message_open_datetime(season=None):
+    """
+    시즌의 쪽지 공개 시각 (설정 MESSAGE_OPEN_DATETIMES 의 한국 시간)
+    season 을 지정하지 않으면 현재 시즌의 공개 시각을 반환
+    """
+    open_datetimes = current_app.config["MESSAGE_OPEN_DATETIMES"]
+    return KST.localize(open_datetimes[season or get_current_season()])
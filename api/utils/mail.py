@@ -0,0 +1,75 @@
+import os
+import time
+import uuid
+from contextlib import contextmanager
+
+from flask_mail import Mail
+
+from api.metrics import metrics
+
+SENDER = "moneyforrabbit@5nonymous.tk"
+
+
+class TimedConnection:
+    """
+    메일 한 통을 발송하는 데 걸린 시간을 mfr_mail_send_duration_seconds 에 기록합니다.
+    """
+
+    def __init__(self, connection, transport):
+        self.connection = connection
+        self.transport = transport
+
+    def send(self, message):
+        started = time.perf_counter()
+        result = "error"
+        try:
+            self.connection.send(message)
+            result = "ok"
+        finally:
+            metrics.observe_mail_send(
+                self.transport, time.perf_counter() - started, result
+            )
+
+
+class SMTPTransport:
+    """
+    Flask-Mail 로 메일을 발송합니다.
+    connect() 로 연 하나의 SMTP 연결로 여러 통의 메일을 보낼 수 있습니다.
+    """
+
+    def __init__(self, app):
+        self.mail = app.extensions.get("mail") or Mail(app)
+
+    @contextmanager
+    def connect(self):
+        with self.mail.connect() as connection:
+            yield TimedConnection(connection, "smtp")
+
+
+class FileTransport:
+    """
+    메일을 발송하는 대신 directory 에 .eml 파일로 저장합니다. (개발, 테스트용)
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    @contextmanager
+    def connect(self):
+        os.makedirs(self.directory, exist_ok=True)
+        yield TimedConnection(self, "file")
+
+    def send(self, message):
+        path = os.path.join(self.directory, f"{uuid.uuid4().hex}.eml")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(message.as_string())
+
+
+def create_mail_transport(app):
+    """
+    MAIL_TRANSPORT 설정에 맞는 메일 발송 수단을 생성합니다.
+    "file" 이면 MAIL_FILE_SINK_DIR 에 저장하고, 그 외에는 SMTP 로 발송합니다.
+    """
+    if app.config["MAIL_TRANSPORT"] == "file":
+        return FileTransport(app.config["MAIL_FILE_SINK_DIR"])
+    return SMTPTransport(app)
@@ -0,0 +1,228 @@
+import glob
+import json
+import logging
+import math
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def is_process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    pairs = []
+    for name, value in labels:
+        value = (
+            str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        )
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class MetricsRegistry:
+    """
+    프로세스 안에서 counter, gauge, histogram 값을 모으고, 여러 워커 프로세스의 값을 합쳐 내보냅니다.
+
+    값은 프로세스마다 메모리에 모으며, 갱신할 때는 짧은 lock 하나만 잡습니다.
+    directory 를 지정하면 flusher 스레드가 flush_seconds 마다 현재 값을
+    metrics-<pid>.json 파일로 저장하고 (임시 파일에 쓴 뒤 rename),
+    collect 는 현재 프로세스의 값과 다른 프로세스의 파일을 합칩니다.
+
+    counter 와 histogram 은 종료된 프로세스의 값도 합치고 (값이 줄어들지 않도록),
+    gauge 는 살아있는 프로세스의 값만 합칩니다. 배포할 때 directory 를 비워야 합니다.
+    """
+
+    def __init__(self, directory=None, flush_seconds=5, buckets=DEFAULT_BUCKETS):
+        self.directory = directory
+        self.flush_seconds = flush_seconds
+        self.buckets = tuple(buckets)
+        self._descriptions = {}
+        self._values = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._pid = os.getpid()
+        self._thread = None
+        self._stop_event = threading.Event()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def describe(self, name, kind, help):
+        """
+        metric 의 종류 ("counter", "gauge", "histogram") 와 설명을 등록
+        """
+        self._descriptions[name] = (kind, help)
+
+    def inc(self, name, amount=1, **labels):
+        """
+        counter 또는 gauge 에 amount 를 더함 (gauge 는 음수도 가능)
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+            self._dirty = True
+
+    def observe(self, name, value, **labels):
+        """
+        histogram 에 값을 기록
+        [버킷별 개수 ..., +Inf 개수, 합계] 로 저장하며, 누적 개수는 내보낼 때 계산
+        """
+        key = (name, tuple(sorted(labels.items())))
+        index = len(self.buckets)
+        for number, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = number
+                break
+        with self._lock:
+            histogram = self._values.get(key)
+            if histogram is None:
+                histogram = self._values[key] = [0] * (len(self.buckets) + 2)
+            histogram[index] += 1
+            histogram[-1] += value
+            self._dirty = True
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+            self._dirty = True
+
+    def snapshot(self):
+        """
+        현재 프로세스의 값을 [[이름, 레이블, 값], ...] 으로 반환
+        """
+        with self._lock:
+            return [
+                [
+                    name,
+                    [list(pair) for pair in labels],
+                    list(value) if isinstance(value, list) else value,
+                ]
+                for (name, labels), value in self._values.items()
+            ]
+
+    @property
+    def path(self):
+        return os.path.join(self.directory, f"metrics-{self._pid}.json")
+
+    def write_file(self):
+        """
+        현재 프로세스의 값을 파일로 저장 (다른 프로세스가 읽는 중에도 안전하도록 rename)
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        self._dirty = False
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump({"pid": self._pid, "metrics": self.snapshot()}, file)
+        os.replace(temp_path, self.path)
+
+    def collect(self):
+        """
+        모든 프로세스의 값을 합쳐 {(이름, 레이블): 값} 으로 반환
+        """
+        merged = {}
+
+        def merge(metrics, alive):
+            for name, labels, value in metrics:
+                kind, _ = self._descriptions.get(name, ("untyped", ""))
+                if kind == "gauge" and not alive:
+                    continue
+                key = (name, tuple(tuple(pair) for pair in labels))
+                if isinstance(value, list):
+                    current = merged.setdefault(key, [0] * len(value))
+                    for index, item in enumerate(value):
+                        current[index] += item
+                else:
+                    merged[key] = merged.get(key, 0) + value
+
+        merge(self.snapshot(), alive=True)
+        if self.directory:
+            for path in glob.glob(os.path.join(self.directory, "metrics-*.json")):
+                if path == self.path:
+                    continue
+                try:
+                    with open(path, encoding="utf-8") as file:
+                        data = json.load(file)
+                except (OSError, ValueError):
+                    continue
+                merge(data["metrics"], alive=is_process_alive(data["pid"]))
+        return merged
+
+    def render(self):
+        """
+        Prometheus text exposition format (0.0.4) 으로 변환
+        """
+        by_name = {}
+        for (name, labels), value in sorted(self.collect().items()):
+            by_name.setdefault(name, []).append((labels, value))
+        lines = []
+        for name, samples in by_name.items():
+            kind, help = self._descriptions.get(name, ("untyped", ""))
+            lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+            for labels, value in samples:
+                if kind != "histogram":
+                    lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(self.buckets + (math.inf,), value[:-1]):
+                    cumulative += count
+                    bucket_labels = labels + (("le", format_value(bound)),)
+                    lines.append(
+                        f"{name}_bucket{format_labels(bucket_labels)} {cumulative}"
+                    )
+                lines.append(f"{name}_sum{format_labels(labels)} {repr(value[-1])}")
+                lines.append(f"{name}_count{format_labels(labels)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+    def start(self):
+        if not self.directory:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="metrics-flusher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        while not self._stop_event.wait(self.flush_seconds):
+            if not self._dirty:
+                continue
+            try:
+                self.write_file()
+            except OSError:
+                logger.exception("metric 파일 저장 중 에러가 발생했습니다.")
+
+    def _after_fork(self):
+        """
+        fork 된 워커는 부모의 값을 이어받지 않고 새로 시작 (부모의 값은 부모의 파일에 있음)
+        """
+        self._lock = threading.Lock()
+        self._values = {}
+        self._pid = os.getpid()
+        if self._thread is not None:
+            self.start()
@@ -0,0 +1,105 @@
+import logging
+import threading
+
+from flask import current_app
+
+from api.db import db
+from api.models.outbox import EmailOutboxModel
+from api.utils.mail import create_mail_transport
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxWorker:
+    """
+    EmailOutbox 테이블에서 발송할 메일을 꺼내 발송하는 백그라운드 워커 풀
+
+    MAIL_OUTBOX_WORKERS 개의 스레드가 각자 MAIL_OUTBOX_BATCH_SIZE 개씩 메일을 가져가
+    하나의 연결로 발송하고, 실패한 메일은 MAIL_OUTBOX_BACKOFF_SECONDS 부터 두 배씩
+    늘어나는 간격으로 재시도합니다. MAIL_OUTBOX_MAX_ATTEMPTS 번 실패하면 dead 상태가 됩니다.
+    """
+
+    def __init__(self, app=None):
+        self.app = app
+        self._threads = []
+        self._stop_event = threading.Event()
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions["outbox_worker"] = self
+        if app.config["MAIL_OUTBOX_AUTOSTART"]:
+            self.start()
+
+    def start(self):
+        self._stop_event.clear()
+        for number in range(self.app.config["MAIL_OUTBOX_WORKERS"]):
+            thread = threading.Thread(
+                target=self._run, name=f"outbox-worker-{number}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=None):
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _run(self):
+        poll_seconds = self.app.config["MAIL_OUTBOX_POLL_SECONDS"]
+        while not self._stop_event.is_set():
+            processed = 0
+            try:
+                with self.app.app_context():
+                    processed = self.drain_once()
+                    db.session.remove()
+            except Exception:
+                logger.exception("메일 발송 대기열 처리 중 에러가 발생했습니다.")
+            if not processed:
+                self._stop_event.wait(poll_seconds)
+
+    def drain_once(self, transport=None):
+        """
+        발송할 차례가 된 메일을 한 묶음 발송하고, 처리한 메일 개수를 반환합니다.
+        앱 컨텍스트 안에서 호출해야 합니다.
+        """
+        config = current_app.config
+        emails = EmailOutboxModel.claim(
+            limit=config["MAIL_OUTBOX_BATCH_SIZE"],
+            lease_seconds=config["MAIL_OUTBOX_LEASE_SECONDS"],
+        )
+        if not emails:
+            return 0
+        transport = transport or create_mail_transport(current_app)
+        remaining = list(emails)
+        try:
+            with transport.connect() as connection:
+                while remaining:
+                    email = remaining[0]
+                    try:
+                        connection.send(email.to_message())
+                    except Exception as e:
+                        logger.warning("메일 발송 실패 (%s) : %s", email.recipient, e)
+                        self._mark_failed(email, e)
+                    else:
+                        email.mark_sent()
+                    db.session.commit()
+                    remaining.pop(0)
+        except Exception as e:
+            # 연결 자체에 실패한 경우, 아직 보내지 못한 메일은 모두 재시도
+            logger.warning("메일 서버 연결 실패 : %s", e)
+            for email in remaining:
+                self._mark_failed(email, e)
+            db.session.commit()
+        return len(emails)
+
+    def _mark_failed(self, email, error):
+        config = current_app.config
+        email.mark_failed(
+            error,
+            max_attempts=config["MAIL_OUTBOX_MAX_ATTEMPTS"],
+            backoff_seconds=config["MAIL_OUTBOX_BACKOFF_SECONDS"],
+        )
+
+
+outbox_worker = OutboxWorker()
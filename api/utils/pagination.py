@@ -0,0 +1,55 @@
+import base64
+import binascii
+
+from api.utils.validation import NotValidDataException
+
+CURSOR_DIRECTIONS = {"n": "next", "p": "prev"}
+
+
+def encode_cursor(direction, message_id):
+    """방향과 쪽지 id 를 클라이언트에게 전달할 불투명한 cursor 문자열로 변환합니다."""
+    raw = f"{direction[0]}:{message_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """cursor 문자열을 (방향, 쪽지 id) 로 변환합니다. 빈 cursor 는 첫 페이지를 의미합니다.
+
+    Raises:
+        NotValidDataException: 해석할 수 없는 cursor 인 경우
+    """
+    if not cursor:
+        return "next", None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        direction, message_id = raw.split(":")
+        return CURSOR_DIRECTIONS[direction], int(message_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError, KeyError):
+        raise NotValidDataException("cursor")
+
+
+def paginate_by_cursor(find_page, cursor, per_page):
+    """keyset 방식으로 한 페이지를 조회하고, 다음/이전 페이지의 cursor 를 함께 반환합니다.
+
+    COUNT 쿼리 없이 per_page + 1 개를 조회하여 해당 방향에 더 많은 쪽지가 있는지 판단합니다.
+
+    Args:
+        find_page (callable): (direction, message_id, limit) 를 받아 최신순 목록을 반환하는 함수
+        cursor (str): 클라이언트가 보낸 cursor
+        per_page (int): 페이지 크기
+
+    Returns:
+        tuple: (쪽지 목록, 다음 페이지 cursor, 이전 페이지 cursor)
+    """
+    direction, message_id = decode_cursor(cursor)
+    items = find_page(direction, message_id, per_page + 1)
+    has_more = len(items) > per_page
+    if direction == "prev":
+        items = items[-per_page:] if has_more else items
+        has_next, has_prev = bool(items), has_more
+    else:
+        items = items[:per_page]
+        has_next, has_prev = has_more, message_id is not None and bool(items)
+    next_cursor = encode_cursor("next", items[-1].id) if has_next else None
+    prev_cursor = encode_cursor("prev", items[0].id) if has_prev else None
+    return items, next_cursor, prev_cursor
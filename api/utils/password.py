@@ -0,0 +1,63 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class PasswordHasher:
+    """
+    비밀번호 해시 생성 / 검증을 요청 스레드가 아닌 프로세스 풀에서 실행합니다.
+
+    PASSWORD_HASH_METHOD = werkzeug 해시 방식과 비용 (예: "pbkdf2:sha256:260000")
+    PASSWORD_HASH_SALT_LENGTH = salt 길이
+    PASSWORD_HASH_WORKERS = 프로세스 풀 크기, 0 이면 요청 스레드에서 바로 실행
+    """
+
+    def __init__(self):
+        self.method = "pbkdf2:sha256:260000"
+        self.salt_length = 16
+        self.workers = 0
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.method = app.config["PASSWORD_HASH_METHOD"]
+        self.salt_length = app.config["PASSWORD_HASH_SALT_LENGTH"]
+        self.workers = app.config["PASSWORD_HASH_WORKERS"]
+        self.shutdown()
+
+    def _run(self, func, *args):
+        if not self.workers:
+            return func(*args)
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # 스레드를 사용하는 프로세스에서 fork 하지 않도록 spawn 으로 생성
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+        return self._executor.submit(func, *args).result()
+
+    def hash(self, password):
+        """현재 설정된 방식과 비용으로 비밀번호 해시를 생성합니다."""
+        return self._run(
+            generate_password_hash, password, self.method, self.salt_length
+        )
+
+    def verify(self, pwhash, password):
+        """비밀번호가 해시와 일치하는지 검증합니다."""
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        """해시가 현재 설정과 다른 방식이나 비용으로 만들어졌는지 확인합니다."""
+        return pwhash.split("$", 1)[0] != self.method
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+password_hasher = PasswordHasher()
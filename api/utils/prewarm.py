@@ -0,0 +1,99 @@
+import logging
+import threading
+
+from flask import current_app
+
+from api.db import db
+from api.models.user import UserAggregateModel, UserModel
+from api.utils.korean_datetime import get_korean_datetime, get_message_open_datetime
+
+logger = logging.getLogger(__name__)
+
+
+class MessageListPrewarmer:
+    """
+    쪽지 공개 시각 직전에 사용자 캐시를 미리 채워두는 백그라운드 스레드
+
+    쪽지 공개 시각 (MESSAGE_OPEN_DATETIMES) 에는 모든 사용자가 동시에 쪽지 목록을 조회하므로,
+    MESSAGE_LIST_PREWARM_LEAD_SECONDS 초 전에 받은 쪽지가 많은 사용자부터
+    MESSAGE_LIST_PREWARM_MAX_USERS 명의 버전 정보 (집계) 와 목록 첫 페이지를 캐시에 저장합니다.
+    공개 시각이 이미 지났다면 실행하지 않습니다.
+    """
+
+    def __init__(self, app=None):
+        self.app = app
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions["message_list_prewarmer"] = self
+        if app.config["MESSAGE_LIST_PREWARM_AUTOSTART"]:
+            self.start()
+
+    def start(self):
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="message-list-prewarmer", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        lead_seconds = self.app.config["MESSAGE_LIST_PREWARM_LEAD_SECONDS"]
+        with self.app.app_context():
+            open_datetime = get_message_open_datetime()
+        remaining = (open_datetime - get_korean_datetime()).total_seconds()
+        if remaining <= 0:
+            return
+        if self._stop_event.wait(max(remaining - lead_seconds, 0)):
+            return
+        try:
+            with self.app.app_context():
+                warmed = self.warm_once()
+            logger.info("쪽지 목록 캐시를 %d 명의 사용자에 대해 미리 채웠습니다.", warmed)
+        except Exception:
+            logger.exception("쪽지 목록 캐시를 미리 채우는 중 에러가 발생했습니다.")
+
+    def warm_once(self):
+        """
+        받은 쪽지가 많은 사용자부터 버전 정보와 목록 첫 페이지 (page, cursor 방식) 를 캐시에 저장하고,
+        채운 사용자 수를 반환합니다. 앱 컨텍스트 안에서 호출해야 합니다.
+
+        캐시는 공개 시각 이후 CACHE_DEFAULT_TTL 초까지 유지되며, 그 전에 쪽지가 작성되면
+        평소와 같이 무효화됩니다.
+        """
+        from api.services.message import MessageService
+
+        config = current_app.config
+        chunk_size = config["MESSAGE_LIST_PREWARM_CHUNK_SIZE"]
+        remaining = (
+            get_message_open_datetime() - get_korean_datetime()
+        ).total_seconds()
+        ttl = max(remaining, 0) + config["CACHE_DEFAULT_TTL"]
+        user_ids = [
+            user_id
+            for (user_id,) in UserAggregateModel.busiest_user_ids_query(
+                config["MESSAGE_LIST_PREWARM_MAX_USERS"]
+            )
+        ]
+        service = MessageService()
+        for start in range(0, len(user_ids), chunk_size):
+            chunk = user_ids[start : start + chunk_size]
+            # 기본 TTL 로 캐시된 값이 공개 전에 만료되지 않도록 새로 채움
+            UserModel.invalidate_info_cache(*chunk)
+            UserModel.get_many(chunk)
+            for user_id in chunk:
+                UserModel.get_version(user_id, ttl=ttl)
+                service.get_list_page(user_id, page=1, ttl=ttl)
+                service.get_list_page(user_id, cursor="", ttl=ttl)
+            db.session.remove()
+        return len(user_ids)
+
+
+message_list_prewarmer = MessageListPrewarmer()
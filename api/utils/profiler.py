@@ -0,0 +1,164 @@
+import cProfile
+import glob
+import io
+import os
+import pstats
+import random
+import re
+import time
+import uuid
+from collections import namedtuple
+from datetime import datetime
+
+from flask import g, request
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+from api.metrics import Metrics
+
+# <리소스>-<지연 시간>ms-<시각>-<임의 값>.prof
+PROFILE_NAME = re.compile(
+    r"^(?P<resource>[\w.]+)-(?P<latency_ms>\d+\.\d)ms-"
+    r"(?P<created_at>\d{14})-[0-9a-f]{8}\.prof$"
+)
+
+ProfileDump = namedtuple(
+    "ProfileDump", ["name", "resource", "latency_ms", "created_at"]
+)
+
+
+def parse_profile_name(name):
+    """
+    프로파일 파일 이름으로부터 ProfileDump 를 만듦 (형식이 다르면 None)
+    """
+    match = PROFILE_NAME.match(name)
+    if match is None:
+        return None
+    return ProfileDump(
+        name,
+        match["resource"],
+        float(match["latency_ms"]),
+        datetime.strptime(match["created_at"], "%Y%m%d%H%M%S"),
+    )
+
+
+class RequestProfiler:
+    """
+    일부 요청을 cProfile 로 실행하고, 결과를 PROFILER_DIR 에 리소스와 지연 시간을 담은 이름으로 저장합니다.
+
+    PROFILER_SAMPLE_RATE 의 비율로 무작위 요청을, 또는 관리자가 발급받은 서명된
+    PROFILER_HEADER 헤더가 있는 요청을 프로파일링합니다.
+    PROFILER_ENABLED 가 꺼져 있으면 요청 hook 을 등록하지 않으므로 비용이 없습니다.
+    파일은 가장 느린 PROFILER_MAX_FILES 개만 남깁니다.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.enabled = False
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions["request_profiler"] = self
+        if not app.config["PROFILER_ENABLED"]:
+            return
+        self.enabled = True
+        app.before_request(self._before_request)
+        app.teardown_request(self._teardown_request)
+
+    @property
+    def directory(self):
+        return self.app.config["PROFILER_DIR"]
+
+    @property
+    def serializer(self):
+        return URLSafeTimedSerializer(self.app.config["SECRET_KEY"], salt="mfr-profile")
+
+    def create_token(self, user_id):
+        """
+        관리자가 요청에 PROFILER_HEADER 로 담아 보낼 서명된 값
+        """
+        return self.serializer.dumps(user_id)
+
+    def is_admin_token(self, token):
+        from api.models.user import UserModel
+
+        try:
+            user_id = self.serializer.loads(
+                token, max_age=self.app.config["PROFILER_TOKEN_MAX_AGE"]
+            )
+        except BadSignature:
+            return False
+        user = UserModel.get(user_id)
+        return bool(user and user.is_admin)
+
+    def should_profile(self):
+        token = request.headers.get(self.app.config["PROFILER_HEADER"])
+        if token is not None:
+            return self.is_admin_token(token)
+        sample_rate = self.app.config["PROFILER_SAMPLE_RATE"]
+        return sample_rate > 0 and random.random() < sample_rate
+
+    def _before_request(self):
+        if not self.should_profile():
+            return
+        g.profiler_started = time.perf_counter()
+        g.profiler = cProfile.Profile()
+        g.profiler.enable()
+
+    def _teardown_request(self, exc):
+        profiler = g.pop("profiler", None)
+        if profiler is None:
+            return
+        profiler.disable()
+        latency_ms = (time.perf_counter() - g.profiler_started) * 1000
+        self.save(profiler, Metrics.get_resource_name(), latency_ms)
+
+    def save(self, profiler, resource, latency_ms):
+        os.makedirs(self.directory, exist_ok=True)
+        name = (
+            f"{resource}-{latency_ms:.1f}ms-"
+            f"{datetime.utcnow():%Y%m%d%H%M%S}-{uuid.uuid4().hex[:8]}.prof"
+        )
+        profiler.dump_stats(os.path.join(self.directory, name))
+        self.prune()
+        return name
+
+    def list_profiles(self):
+        """
+        저장된 프로파일을 지연 시간이 긴 순서로 반환
+        """
+        profiles = [
+            parse_profile_name(os.path.basename(path))
+            for path in glob.glob(os.path.join(self.directory, "*.prof"))
+        ]
+        return sorted(
+            (profile for profile in profiles if profile is not None),
+            key=lambda profile: -profile.latency_ms,
+        )
+
+    def prune(self):
+        for profile in self.list_profiles()[self.app.config["PROFILER_MAX_FILES"] :]:
+            try:
+                os.remove(os.path.join(self.directory, profile.name))
+            except FileNotFoundError:
+                pass
+
+    def get_path(self, name):
+        """
+        저장된 프로파일의 경로 (이름이 형식에 맞지 않거나 파일이 없으면 None)
+        """
+        if parse_profile_name(name) is None:
+            return None
+        path = os.path.join(self.directory, name)
+        return path if os.path.exists(path) else None
+
+    def summarize(self, name, limit=40):
+        """
+        프로파일을 누적 시간 순으로 정리한 문자열
+        """
+        stream = io.StringIO()
+        stats = pstats.Stats(self.get_path(name), stream=stream)
+        stats.sort_stats("cumulative").print_stats(limit)
+        return stream.getvalue()
+
+
+request_profiler = RequestProfiler()
@@ -0,0 +1,217 @@
+import hashlib
+import math
+import threading
+import time
+
+
+class BloomFilter:
+    """
+    폐기된 토큰이 "확실히 아님" 을 빠르게 판단하기 위한 bloom filter
+
+    capacity 개를 넣었을 때 거짓 양성 비율이 error_rate 가 되도록 크기를 정합니다.
+    blake2b digest 하나로 두 개의 해시를 만들고, 이를 조합해 위치를 계산합니다.
+    """
+
+    def __init__(self, capacity=100000, error_rate=0.001):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for number in range(self.hash_count):
+            yield (first + number * second) % self.size
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        bits = self.bits
+        for position in self._positions(key):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+
+class MemoryRevocationBackend:
+    """
+    프로세스 안에서만 공유되는 폐기 기록
+
+    폐기된 토큰을 (순번, jti, 만료 시각) 으로 쌓아두고,
+    load_since 로 주어진 순번 이후에 추가된 기록만 돌려줍니다.
+    """
+
+    def __init__(self):
+        self._entries = []
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    def add(self, jti, exp):
+        with self._lock:
+            self._sequence += 1
+            self._entries.append((self._sequence, jti, exp))
+
+    def load_since(self, cursor):
+        with self._lock:
+            entries = [(jti, exp) for seq, jti, exp in self._entries if seq > cursor]
+            return entries, self._sequence
+
+    def purge(self, now):
+        with self._lock:
+            self._entries = [entry for entry in self._entries if entry[2] > now]
+
+
+class RedisRevocationBackend:
+    """
+    여러 워커 프로세스가 함께 사용하는 폐기 기록
+
+    "jti:exp" 를 멤버로, 추가된 순번을 점수로 하는 sorted set 에 기록합니다.
+    순번 증가와 기록은 하나의 Lua 스크립트로 실행하므로, 다른 워커가 더 큰 순번까지 읽은 뒤에
+    작은 순번의 기록이 추가되어 건너뛰는 일이 없습니다.
+    redis-py 와 같은 eval / zrangebyscore / zscan_iter / zrem 인터페이스를 가진
+    client 를 사용합니다.
+    """
+
+    ADD_SCRIPT = """
+local sequence = redis.call("INCR", KEYS[1])
+redis.call("ZADD", KEYS[2], sequence, ARGV[1])
+return sequence
+"""
+
+    def __init__(self, client, prefix="mfr:revoked:"):
+        self.client = client
+        self.sequence_key = prefix + "sequence"
+        self.log_key = prefix + "log"
+
+    def add(self, jti, exp):
+        self.client.eval(
+            self.ADD_SCRIPT, 2, self.sequence_key, self.log_key, f"{jti}:{exp}"
+        )
+
+    def load_since(self, cursor):
+        entries = []
+        for member, score in self.client.zrangebyscore(
+            self.log_key, f"({cursor}", "+inf", withscores=True
+        ):
+            if isinstance(member, bytes):
+                member = member.decode()
+            jti, exp = member.rsplit(":", 1)
+            entries.append((jti, int(exp)))
+            cursor = max(cursor, int(score))
+        return entries, cursor
+
+    def purge(self, now):
+        expired = [
+            member
+            for member, score in self.client.zscan_iter(self.log_key)
+            if int(
+                (member.decode() if isinstance(member, bytes) else member).rsplit(
+                    ":", 1
+                )[1]
+            )
+            <= now
+        ]
+        if expired:
+            self.client.zrem(self.log_key, *expired)
+
+
+def create_revocation_backend(config):
+    """
+    앱 설정으로부터 폐기 기록 백엔드를 생성합니다.
+
+    REVOCATION_BACKEND 가 "redis" 이면 REVOCATION_REDIS_URL 로 연결하고 (redis 패키지 필요),
+    그 외에는 프로세스 내부 기록을 사용합니다.
+    """
+    if config["REVOCATION_BACKEND"] == "redis":
+        import redis
+
+        return RedisRevocationBackend(
+            redis.Redis.from_url(config["REVOCATION_REDIS_URL"])
+        )
+    return MemoryRevocationBackend()
+
+
+class RevocationStore:
+    """
+    폐기된 JWT 의 jti 를 관리합니다.
+
+    조회는 로컬 bloom filter 를 먼저 확인하므로, 폐기되지 않은 토큰은 DB 나 네트워크 접근 없이
+    판단합니다. bloom filter 를 통과한 경우에만 정확한 집합 (jti -> 만료 시각) 을 확인합니다.
+    다른 워커가 폐기한 토큰은 sync_seconds 마다 백엔드에서 가져오고,
+    만료 시각이 지난 항목은 purge_seconds 마다 지운 뒤 bloom filter 를 다시 만듭니다.
+    """
+
+    def __init__(
+        self,
+        backend=None,
+        capacity=100000,
+        error_rate=0.001,
+        sync_seconds=1,
+        purge_seconds=600,
+        clock=time.time,
+    ):
+        self.backend = backend or MemoryRevocationBackend()
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_seconds = sync_seconds
+        self.purge_seconds = purge_seconds
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._bloom = BloomFilter(self.capacity, self.error_rate)
+        self._revoked = {}
+        self._cursor = 0
+        now = self.clock()
+        self._next_sync = now
+        self._next_purge = now + self.purge_seconds
+
+    def _add_local(self, jti, exp):
+        self._revoked[jti] = exp
+        self._bloom.add(jti)
+
+    def revoke(self, jti, exp):
+        """
+        토큰을 폐기합니다. exp 는 토큰의 만료 시각 (epoch 초) 입니다.
+        """
+        self.backend.add(jti, exp)
+        with self._lock:
+            self._add_local(jti, exp)
+
+    def is_revoked(self, jti):
+        now = self.clock()
+        if now >= self._next_sync:
+            self.sync(now)
+        if jti not in self._bloom:
+            return False
+        exp = self._revoked.get(jti)
+        return exp is not None and exp > now
+
+    def sync(self, now=None):
+        """
+        다른 워커가 폐기한 토큰을 가져오고, 때가 되었다면 만료된 항목을 정리합니다.
+        """
+        now = now or self.clock()
+        with self._lock:
+            entries, self._cursor = self.backend.load_since(self._cursor)
+            for jti, exp in entries:
+                self._add_local(jti, exp)
+            self._next_sync = now + self.sync_seconds
+            if now >= self._next_purge:
+                self._purge(now)
+
+    def _purge(self, now):
+        self.backend.purge(now)
+        revoked = {jti: exp for jti, exp in self._revoked.items() if exp > now}
+        self._bloom = BloomFilter(self.capacity, self.error_rate)
+        self._revoked = {}
+        for jti, exp in revoked.items():
+            self._add_local(jti, exp)
+        self._next_purge = now + self.purge_seconds
+
+    def __len__(self):
+        return len(self._revoked)
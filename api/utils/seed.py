@@ -0,0 +1,221 @@
+import bisect
+import multiprocessing
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from sqlalchemy import create_engine
+
+from api.models.message import MessageModel
+from api.models.user import UserModel
+
+KOREAN_SURNAMES = "김이박최정강조윤장임한오서신권황안송류홍전고문양손배백허유남심노하곽성차주우구민진나지엄채원천방공현함변염여추도소석선설마길연위표명기반왕금옥육인맹제모탁국어은편용예경봉"
+GIVEN_NAME_SYLLABLES = "민서지수현준우진영하은예도윤재희연호성아주유원승태시혜경동채정다소한나상미보건혁규빈찬율온슬린"
+NICKNAMES = [
+    "토끼",
+    "산토끼",
+    "집토끼",
+    "복덩이",
+    "떡국",
+    "세뱃돈",
+    "까치",
+    "설날",
+    "새해",
+    "복주머니",
+    "윷놀이",
+    "한복",
+    "햇살",
+    "별빛",
+    "구름",
+    "감자",
+    "고구마",
+    "호떡",
+]
+EMAIL_DOMAINS = ["naver.com", "gmail.com", "daum.net", "kakao.com", "hanmail.net"]
+
+GREETINGS = [
+    "새해 복 많이 받아!",
+    "새해 복 많이 받으세요.",
+    "계묘년 새해가 밝았어요!",
+    "올해도 잘 부탁해.",
+    "작년 한 해 정말 고마웠어.",
+    "토끼해가 왔다!",
+    "설 연휴 잘 보내고 있어?",
+]
+WISHES = [
+    "올해는 하는 일마다 다 잘 되길 바라.",
+    "건강이 최고야, 아프지 말고.",
+    "원하는 곳에 꼭 합격하길!",
+    "토끼처럼 깡총깡총 높이 뛰어오르는 한 해가 되길.",
+    "맛있는 거 많이 먹고 행복하자.",
+    "늘 웃는 일만 가득하길 바랄게.",
+    "올해는 꼭 같이 여행 가자!",
+    "로또 1등 당첨되게 해주세요.",
+    "다이어트는 내일부터 하자.",
+    "",
+]
+CLOSINGS = ["", "사랑해 ❤", "보고 싶다!", "곧 만나자.", "세뱃돈은 쪽지로 대신할게 ㅎㅎ", "파이팅!"]
+
+# MessageModel.MONEY_TYPES 의 화폐 단위별 선택 비율, 돈봉투에 담는 금액
+MONEY_TYPE_WEIGHTS = [4, 8, 25, 25, 25, 10, 3]
+MONEYBAG_AMOUNTS = [5001, 7000, 20000, 30000, 55555, 77777, 100000, 123456, 300000]
+
+
+def get_seed_email(user_id):
+    """생성된 사용자의 이메일 (user_id 로부터 정해짐)"""
+    return f"user{user_id}@{EMAIL_DOMAINS[user_id % len(EMAIL_DOMAINS)]}"
+
+
+def generate_username(rng):
+    """
+    2 ~ 5자의 한글 닉네임 (validate_username 을 통과하는 형식)
+    이름 (성 + 이름 두 글자) 또는 별명, 별명 뒤에는 숫자가 붙기도 함
+    """
+    if rng.random() < 0.6:
+        return rng.choice(KOREAN_SURNAMES) + "".join(
+            rng.choices(GIVEN_NAME_SYLLABLES, k=2)
+        )
+    nickname = rng.choice(NICKNAMES)
+    if len(nickname) <= 3 and rng.random() < 0.5:
+        nickname += str(rng.randint(1, 10 ** (5 - len(nickname)) - 1))
+    return nickname
+
+
+def generate_message(rng):
+    """150자를 넘지 않는 새해 인사 쪽지"""
+    parts = [rng.choice(GREETINGS), rng.choice(WISHES), rng.choice(CLOSINGS)]
+    return " ".join(part for part in parts if part)[:150]
+
+
+class PopularitySampler:
+    """
+    인기 순위가 r 번째인 사용자를 1 / r ** skew 에 비례하는 확률로 고름 (Zipf)
+    first_id 의 사용자가 가장 인기가 많고, id 순서대로 인기 순위가 정해집니다.
+    """
+
+    def __init__(self, first_id, count, skew):
+        self.first_id = first_id
+        self.cumulative_weights = []
+        total = 0.0
+        for rank in range(1, count + 1):
+            total += 1 / rank**skew
+            self.cumulative_weights.append(total)
+        self.total = total
+
+    def sample(self, rng):
+        return self.first_id + bisect.bisect_left(
+            self.cumulative_weights, rng.random() * self.total
+        )
+
+
+def insert_users(engine, first_id, count, password, seed, batch_size):
+    """
+    id 가 first_id 부터 시작하는 count 명의 사용자를 batch_size 개씩 Core bulk insert (묶음마다 커밋)
+    모든 사용자는 미리 만든 같은 비밀번호 해시 (password) 를 사용합니다.
+    """
+    rng = random.Random(f"users-{seed}-{first_id}")
+    table = UserModel.__table__
+    for start in range(first_id, first_id + count, batch_size):
+        rows = [
+            {
+                "id": user_id,
+                "username": generate_username(rng),
+                "password": password,
+                "email": get_seed_email(user_id),
+                "email_confirmed": True,
+                "is_admin": False,
+            }
+            for user_id in range(start, min(start + batch_size, first_id + count))
+        ]
+        with engine.begin() as connection:
+            connection.execute(table.insert(), rows)
+
+
+def insert_messages(
+    engine,
+    first_id,
+    count,
+    users,
+    skew,
+    season,
+    seed,
+    batch_size,
+    moneybag_ratio=0.1,
+    previous_season_ratio=0.0,
+):
+    """
+    id 가 first_id 부터 시작하는 count 개의 쪽지를 batch_size 개씩 Core bulk insert (묶음마다 커밋)
+
+    받는 사람은 users (첫 번째 id, 사용자 수) 범위에서 인기 순위에 따라 (skew) 고르고,
+    작성자는 같은 범위에서 무작위로 고릅니다. moneybag_ratio 만큼은 돈봉투 쪽지이며,
+    previous_season_ratio 만큼은 지난 시즌의 쪽지입니다.
+    """
+    rng = random.Random(f"messages-{seed}-{first_id}")
+    first_user_id, user_count = users
+    sampler = PopularitySampler(first_user_id, user_count, skew)
+    table = MessageModel.__table__
+    for start in range(first_id, first_id + count, batch_size):
+        rows = []
+        for message_id in range(start, min(start + batch_size, first_id + count)):
+            is_moneybag = rng.random() < moneybag_ratio
+            rows.append(
+                {
+                    "id": message_id,
+                    "user_id": sampler.sample(rng),
+                    "author_id": first_user_id + rng.randrange(user_count),
+                    "message": generate_message(rng),
+                    "amount": rng.choice(MONEYBAG_AMOUNTS)
+                    if is_moneybag
+                    else rng.choices(MessageModel.MONEY_TYPES, MONEY_TYPE_WEIGHTS)[0],
+                    "is_moneybag": is_moneybag,
+                    "season": season - 1
+                    if rng.random() < previous_season_ratio
+                    else season,
+                }
+            )
+        with engine.begin() as connection:
+            connection.execute(table.insert(), rows)
+
+
+def run_shard(database_uri, insert, kwargs):
+    """프로세스 풀에서 실행: 자신의 엔진으로 한 구간을 생성"""
+    engine = create_engine(database_uri)
+    try:
+        insert(engine, **kwargs)
+    finally:
+        engine.dispose()
+
+
+def split(first_id, count, parts):
+    """[first_id, first_id + count) 를 parts 개의 연속된 (first_id, count) 구간으로 나눔"""
+    size, remainder = divmod(count, parts)
+    shards = []
+    for part in range(parts):
+        shard_size = size + (1 if part < remainder else 0)
+        if shard_size:
+            shards.append((first_id, shard_size))
+        first_id += shard_size
+    return shards
+
+
+def run_shards(engine, insert, first_id, count, processes, **kwargs):
+    """
+    구간을 processes 개로 나누어 각 프로세스가 자신의 연결로 생성 (1 이면 현재 프로세스에서 생성)
+    """
+    if processes <= 1:
+        insert(engine, first_id=first_id, count=count, **kwargs)
+        return
+    database_uri = engine.url.render_as_string(hide_password=False)
+    with ProcessPoolExecutor(
+        max_workers=processes, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        futures = [
+            executor.submit(
+                run_shard,
+                database_uri,
+                insert,
+                {"first_id": shard_id, "count": shard_count, **kwargs},
+            )
+            for shard_id, shard_count in split(first_id, count, processes)
+        ]
+        for future in futures:
+            future.result()
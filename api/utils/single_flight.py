@@ -0,0 +1,60 @@
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    같은 키로 동시에 들어온 호출 중 먼저 들어온 하나만 실행하고,
+    실행 중에 들어온 나머지 호출은 기다렸다가 그 결과 (또는 예외) 를 함께 사용합니다.
+
+    실행이 끝난 결과는 보관하지 않으므로 캐시와 함께 사용합니다.
+    결과는 여러 스레드가 공유하므로 호출하는 쪽에서 수정하면 안 됩니다.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.shared = 0
+
+    def do(self, key, func):
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.shared += 1
+        if not is_leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def stats(self):
+        return {
+            "executed": self.executed,
+            "shared": self.shared,
+            "in_flight": len(self._calls),
+        }
+
+
+# 같은 사용자의 같은 쪽지 목록 요청을 하나로 묶음
+message_list_single_flight = SingleFlight()
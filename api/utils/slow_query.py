@@ -0,0 +1,230 @@
+import json
+import logging
+import re
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+from sqlalchemy import event
+
+from api.db import db
+from api.utils.explain import explain_sql
+
+logger = logging.getLogger(__name__)
+
+# 길이가 다른 IN (?, ?, ...) 목록을 같은 형태로 묶기 위한 패턴
+PARAMETER_LIST = re.compile(r"\(\s*(\?|%s|:\w+)(\s*,\s*(\?|%s|:\w+))+\s*\)")
+EXPLAINABLE = ("SELECT", "UPDATE", "DELETE", "WITH")
+# 호출한 코드를 찾을 때 건너뛰는 모듈 (이 모듈과 DB 접근을 감싸는 모듈)
+SKIPPED_MODULES = ("api.utils.slow_query", "api.db", "api.metrics")
+
+
+def get_query_shape(statement):
+    """
+    바인딩 파라미터 개수와 공백만 다른 SQL 문을 같은 문자열로 정규화
+    """
+    return PARAMETER_LIST.sub("(?...)", " ".join(statement.split()))
+
+
+def get_caller():
+    """
+    SQL 문을 실행한 서비스 메서드 (예: MessageService.list_view) 의 이름
+    서비스를 거치지 않았다면 가장 가까운 api 패키지의 함수 이름을 반환합니다.
+    """
+    fallback = None
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        code = frame.f_code
+        name = getattr(code, "co_qualname", code.co_name)
+        if module.startswith("api.services."):
+            return name
+        if (
+            fallback is None
+            and module.startswith("api.")
+            and not module.startswith(SKIPPED_MODULES)
+        ):
+            fallback = f"{module}.{name}"
+        frame = frame.f_back
+    return fallback or "unknown"
+
+
+def format_parameters(parameters, executemany=False):
+    """
+    로그에 남길 수 있도록 파라미터를 길이가 제한된 문자열로 변환
+    executemany 라면 앞의 5개 묶음만 남깁니다.
+    """
+    if executemany:
+        return [format_parameters(item) for item in parameters[:5]]
+    if isinstance(parameters, dict):
+        return {name: repr(value)[:200] for name, value in parameters.items()}
+    return [repr(value)[:200] for value in parameters or ()]
+
+
+def percentile(sorted_values, ratio):
+    """
+    정렬된 값 목록의 백분위 값 (nearest-rank)
+    """
+    index = max(0, min(len(sorted_values) - 1, round(ratio * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class QueryShapeStats:
+    """
+    같은 형태의 느린 SQL 문의 횟수, 최근 실행 시간, 실행 계획
+    """
+
+    def __init__(self, shape, sample_size):
+        self.shape = shape
+        self.count = 0
+        self.total_ms = 0.0
+        self.durations = deque(maxlen=sample_size)
+        self.callers = {}
+        self.plan = None
+        self.uses_index = None
+        self.last_parameters = None
+
+    def add(self, duration_ms, caller, parameters):
+        self.count += 1
+        self.total_ms += duration_ms
+        self.durations.append(duration_ms)
+        self.callers[caller] = self.callers.get(caller, 0) + 1
+        self.last_parameters = parameters
+
+    def summary(self):
+        durations = sorted(self.durations)
+        return {
+            "shape": self.shape,
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "p50_ms": round(percentile(durations, 0.5), 3),
+            "p99_ms": round(percentile(durations, 0.99), 3),
+            "callers": dict(sorted(self.callers.items(), key=lambda item: -item[1])),
+            "uses_index": self.uses_index,
+            "plan": self.plan,
+            "last_parameters": self.last_parameters,
+        }
+
+
+class SlowQueryLog:
+    """
+    SLOW_QUERY_THRESHOLD_MS 보다 오래 걸린 SQL 문을 기록합니다. (SLOW_QUERY_LOG_ENABLED)
+
+    느린 SQL 문마다 실행 시간, 파라미터, 실행한 서비스 메서드, 실행 계획을
+    SLOW_QUERY_LOG_PATH 에 한 줄의 JSON 으로 기록하고 (크기에 따라 rotate),
+    프로세스 안에서 같은 형태의 SQL 문끼리 모아 횟수와 p50, p99 를 관리자 페이지에 보여줍니다.
+    실행 계획은 형태마다 처음 느렸을 때 같은 연결에서 EXPLAIN 으로 한 번만 조회합니다.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.threshold_ms = 0
+        self.sample_size = 1000
+        self.explain = True
+        self._shapes = {}
+        self._lock = threading.Lock()
+        self._handler = None
+        self._file_logger = logging.getLogger(f"{__name__}.file")
+        self._file_logger.propagate = False
+        self._file_logger.setLevel(logging.INFO)
+
+    def init_app(self, app):
+        if not app.config["SLOW_QUERY_LOG_ENABLED"]:
+            return
+        self.enabled = True
+        self.threshold_ms = app.config["SLOW_QUERY_THRESHOLD_MS"]
+        self.sample_size = app.config["SLOW_QUERY_SAMPLE_SIZE"]
+        self.explain = app.config["SLOW_QUERY_EXPLAIN"]
+        if self._handler is not None:
+            self._file_logger.removeHandler(self._handler)
+            self._handler.close()
+        self._handler = RotatingFileHandler(
+            app.config["SLOW_QUERY_LOG_PATH"],
+            maxBytes=app.config["SLOW_QUERY_LOG_MAX_BYTES"],
+            backupCount=app.config["SLOW_QUERY_LOG_BACKUP_COUNT"],
+            encoding="utf-8",
+            delay=True,
+        )
+        self._file_logger.addHandler(self._handler)
+        engine = db.get_engine(app)
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        app.extensions["slow_query_log"] = self
+
+    def _before_cursor_execute(self, conn, cursor, statement, *args):
+        conn.info["slow_query_started"] = time.perf_counter()
+
+    def _after_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        started = conn.info.pop("slow_query_started", None)
+        if started is None or conn.info.get("slow_query_explaining"):
+            return
+        duration_ms = (time.perf_counter() - started) * 1000
+        if duration_ms < self.threshold_ms:
+            return
+        self.record(conn, statement, parameters, duration_ms, executemany)
+
+    def record(self, conn, statement, parameters, duration_ms, executemany=False):
+        shape = get_query_shape(statement)
+        caller = get_caller()
+        logged_parameters = format_parameters(parameters, executemany)
+        with self._lock:
+            stats = self._shapes.get(shape)
+            if stats is None:
+                stats = self._shapes[shape] = QueryShapeStats(shape, self.sample_size)
+            stats.add(duration_ms, caller, logged_parameters)
+            needs_plan = stats.plan is None
+            if needs_plan:
+                stats.plan = []
+        if needs_plan:
+            uses_index, plan = self._explain(conn, statement, parameters, executemany)
+            stats.uses_index, stats.plan = uses_index, plan
+        self._file_logger.info(
+            json.dumps(
+                {
+                    "time": datetime.utcnow().isoformat(),
+                    "duration_ms": round(duration_ms, 3),
+                    "caller": caller,
+                    "statement": statement,
+                    "parameters": logged_parameters,
+                    "uses_index": stats.uses_index,
+                    "plan": stats.plan,
+                },
+                ensure_ascii=False,
+            )
+        )
+
+    def _explain(self, conn, statement, parameters, executemany):
+        if (
+            not self.explain
+            or executemany
+            or not statement.lstrip().upper().startswith(EXPLAINABLE)
+        ):
+            return None, []
+        conn.info["slow_query_explaining"] = True
+        try:
+            return explain_sql(conn, statement, parameters)
+        except Exception as e:
+            logger.warning("실행 계획 조회 실패 : %s", e)
+            return None, [f"EXPLAIN 실패 : {e}"]
+        finally:
+            conn.info.pop("slow_query_explaining", None)
+
+    def stats(self):
+        """
+        형태별 느린 SQL 문 통계를 전체 실행 시간이 긴 순서로 반환
+        """
+        with self._lock:
+            summaries = [stats.summary() for stats in self._shapes.values()]
+        return sorted(summaries, key=lambda summary: -summary["total_ms"])
+
+    def clear(self):
+        with self._lock:
+            self._shapes.clear()
+
+
+slow_query_log = SlowQueryLog()
@@ -0,0 +1,66 @@
+import logging
+import threading
+
+from flask import current_app
+
+from api.db import db
+from api.models.user import RefreshTokenModel
+
+logger = logging.getLogger(__name__)
+
+
+class RefreshTokenSweeper:
+    """
+    만료된 refresh token 을 주기적으로 삭제하는 백그라운드 스레드
+
+    REFRESH_TOKEN_SWEEP_INTERVAL_SECONDS 마다 만료된 토큰을
+    REFRESH_TOKEN_SWEEP_CHUNK_SIZE 개씩 나누어 삭제합니다.
+    """
+
+    def __init__(self, app=None):
+        self.app = app
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions["refresh_token_sweeper"] = self
+        if app.config["REFRESH_TOKEN_SWEEP_AUTOSTART"]:
+            self.start()
+
+    def start(self):
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="refresh-token-sweeper", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        interval = self.app.config["REFRESH_TOKEN_SWEEP_INTERVAL_SECONDS"]
+        while not self._stop_event.wait(interval):
+            try:
+                with self.app.app_context():
+                    deleted = self.sweep_once()
+                    db.session.remove()
+                if deleted:
+                    logger.info("만료된 refresh token %d 개를 삭제했습니다.", deleted)
+            except Exception:
+                logger.exception("만료된 refresh token 삭제 중 에러가 발생했습니다.")
+
+    def sweep_once(self):
+        """
+        만료된 토큰을 모두 삭제하고, 삭제한 개수를 반환합니다.
+        앱 컨텍스트 안에서 호출해야 합니다.
+        """
+        return RefreshTokenModel.delete_expired(
+            chunk_size=current_app.config["REFRESH_TOKEN_SWEEP_CHUNK_SIZE"]
+        )
+
+
+refresh_token_sweeper = RefreshTokenSweeper()
@@ -0,0 +1,380 @@
+import fcntl
+import glob
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy.exc import OperationalError
+
+from api.db import db, unit_of_work
+from api.models.message import MessageModel, MessageWriteCheckpointModel
+
+logger = logging.getLogger(__name__)
+
+MESSAGE_FIELDS = ["user_id", "author_id", "message", "amount", "is_moneybag"]
+
+
+class WriteBufferFull(Exception):
+    """
+    쓰기 버퍼가 가득 차서 쪽지를 받을 수 없는 경우
+    """
+
+    pass
+
+
+class MessageWriteBuffer:
+    """
+    쪽지를 모아서 한 번에 저장하는 쓰기 버퍼 (write-behind)
+
+    submit 은 쪽지를 로컬 WAL 파일에 기록하고 큐에 넣은 뒤, fsync 가 끝나면 반환합니다.
+    fsync 는 group commit 방식으로, 한 번의 fsync 가 그때까지 기록된 모든 쪽지를 보장합니다.
+    flusher 스레드는 MESSAGE_WRITE_BUFFER_FLUSH_MS 마다, 또는
+    MESSAGE_WRITE_BUFFER_BATCH_SIZE 개가 모이면 한 트랜잭션으로 쪽지와 수신자 집계를 저장하고,
+    같은 트랜잭션에서 WAL 의 어디까지 저장했는지 (MessageWriteCheckpoint) 를 기록합니다.
+
+    프로세스가 비정상 종료되면 남은 WAL 파일은 다음에 시작하는 프로세스가 다시 적용하며,
+    체크포인트 이후의 기록만 적용하므로 쪽지가 중복 저장되지 않습니다.
+
+    저장에 실패하면 다시 시도하고, 외래 키 위반처럼 다시 시도해도 실패하는 쪽지는
+    MESSAGE_WRITE_BUFFER_DEAD_LETTER_PATH 로 옮긴 뒤 건너뜁니다.
+    """
+
+    def __init__(self, app=None):
+        self.app = app
+        self._queue = None
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._synced_sequence = 0
+        self._wal = None
+        self._wal_id = None
+        self._sequence = 0
+        self._flushed_sequence = 0
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions["message_write_buffer"] = self
+        # 버퍼를 끈 뒤에도 이전에 남은 WAL 은 적용
+        with app.app_context():
+            self.recover()
+        if app.config["MESSAGE_WRITE_BUFFER_ENABLED"]:
+            self.open()
+            self.start()
+
+    @property
+    def enabled(self):
+        return self._wal is not None
+
+    @property
+    def wal_path(self):
+        return self._get_wal_path(self._wal_id)
+
+    def _get_wal_path(self, wal_id):
+        return os.path.join(
+            self.app.config["MESSAGE_WRITE_BUFFER_WAL_DIR"], f"messages-{wal_id}.wal"
+        )
+
+    def open(self):
+        """
+        새 WAL 파일을 만들고, 다른 프로세스가 적용하지 않도록 잠금
+        """
+        os.makedirs(self.app.config["MESSAGE_WRITE_BUFFER_WAL_DIR"], exist_ok=True)
+        self._queue = queue.Queue(self.app.config["MESSAGE_WRITE_BUFFER_MAX_SIZE"])
+        self._wal_id = uuid.uuid4().hex
+        self._wal = open(self.wal_path, "a", encoding="utf-8")
+        fcntl.flock(self._wal, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        self._sequence = self._flushed_sequence = self._synced_sequence = 0
+
+    def close(self):
+        """
+        모두 저장되었다면 WAL 파일을 지우고, 아니라면 다음 recover 때 적용되도록 남겨둠
+        """
+        if self._wal is None:
+            return
+        wal, self._wal = self._wal, None
+        if self._flushed_sequence == self._sequence:
+            os.remove(self._get_wal_path(self._wal_id))
+            with self.app.app_context():
+                MessageWriteCheckpointModel.delete(self._wal_id)
+        wal.close()
+
+    def start(self):
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="message-write-buffer", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """
+        큐에 남은 쪽지를 모두 저장한 뒤 flusher 스레드를 멈추고 WAL 파일을 닫음
+        """
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self._thread = None
+        self.close()
+
+    def submit(self, message):
+        """
+        쪽지 (MessageModel 또는 dict) 를 WAL 에 기록하고 큐에 넣음
+        버퍼가 가득 찼다면 WriteBufferFull 을 발생시킴
+        """
+        if isinstance(message, dict):
+            row = {field: message[field] for field in MESSAGE_FIELDS}
+        else:
+            row = {field: getattr(message, field) for field in MESSAGE_FIELDS}
+        with self._lock:
+            # 큐를 비우는 쪽은 flusher 뿐이므로, 잠금 안에서 확인하면 put 이 실패하지 않음
+            if self._queue.full():
+                raise WriteBufferFull()
+            self._sequence += 1
+            sequence = self._sequence
+            self._wal.write(
+                json.dumps({"sequence": sequence, **row}, ensure_ascii=False) + "\n"
+            )
+            self._wal.flush()
+            self._queue.put_nowait((sequence, row))
+        if self.app.config["MESSAGE_WRITE_BUFFER_FSYNC"]:
+            self._sync(sequence)
+        return sequence
+
+    def _sync(self, sequence):
+        """
+        sequence 까지의 기록이 디스크에 쓰여질 때까지 기다림
+        먼저 잠금을 얻은 스레드가 그때까지 기록된 모든 쪽지를 한 번에 fsync 함
+        """
+        with self._sync_lock:
+            if self._synced_sequence >= sequence:
+                return
+            with self._lock:
+                target = self._sequence
+            os.fsync(self._wal.fileno())
+            self._synced_sequence = target
+
+    def _run(self):
+        while not (self._stop_event.is_set() and self._queue.empty()):
+            batch = self._take_batch()
+            if not batch:
+                continue
+            with self.app.app_context():
+                try:
+                    if not self._save_with_retry(self._wal_id, batch):
+                        # 종료 중이라면 WAL 을 남겨두고 다음 recover 에 맡김
+                        return
+                finally:
+                    db.session.remove()
+                try:
+                    self._rotate_if_needed()
+                except Exception:
+                    # 교체하지 못해도 쪽지는 모두 저장되었으므로, 다음 묶음을 저장한 뒤 다시 시도
+                    logger.exception("쓰기 버퍼의 WAL 파일을 교체하지 못했습니다.")
+                finally:
+                    db.session.remove()
+
+    def _save_with_retry(self, wal_id, batch):
+        """
+        저장에 실패하면 1초 간격으로 다시 시도
+        다시 시도해도 실패하는 쪽지는 _save_batch_isolated 가 dead letter 로 옮기므로,
+        여기까지 오는 에러는 일시적인 에러 (OperationalError, 연결 끊김 등) 나
+        dead letter 파일에 기록하지 못한 경우처럼 고쳐지면 저장할 수 있는 에러임
+        묶음을 버리면 WAL 을 교체하거나 지울 수 없게 되므로, 저장할 때까지 다시 시도함
+        나누어 저장하던 중에 실패했다면 앞부분은 이미 저장되었으므로, 체크포인트 이후만 다시 저장
+        종료 요청으로 저장을 포기했다면 False 를 반환합니다.
+        """
+        last_sequence = 0
+        while True:
+            try:
+                if last_sequence is None:
+                    last_sequence = MessageWriteCheckpointModel.get_last_sequence(
+                        wal_id
+                    )
+                pending = [record for record in batch if record[0] > last_sequence]
+                if pending:
+                    self._save_batch_isolated(wal_id, pending)
+                return True
+            except Exception:
+                logger.exception("쓰기 버퍼의 쪽지를 저장하지 못했습니다. 다시 시도합니다.")
+                last_sequence = None
+                if self._stop_event.wait(1):
+                    return False
+
+    def _save_batch_isolated(self, wal_id, batch):
+        """
+        묶음을 저장하다 일시적이지 않은 에러 (IntegrityError, DataError 등) 가 발생하면
+        묶음을 반으로 나누어 저장하고, 저장할 수 없는 쪽지는 dead letter 로 옮김
+        (예: 버퍼에 있는 동안 받는 사람이 탈퇴하여 외래 키 제약을 위반하는 쪽지)
+        """
+        try:
+            self._save_batch(wal_id, batch)
+        except OperationalError:
+            raise
+        except Exception as e:
+            if len(batch) == 1:
+                self._dead_letter(wal_id, batch[0], e)
+                return
+            middle = len(batch) // 2
+            self._save_batch_isolated(wal_id, batch[:middle])
+            self._save_batch_isolated(wal_id, batch[middle:])
+
+    def _dead_letter(self, wal_id, record, error):
+        """
+        저장할 수 없는 쪽지를 MESSAGE_WRITE_BUFFER_DEAD_LETTER_PATH 에 기록하고,
+        체크포인트를 그 다음으로 옮겨 큐와 복구가 더 이상 막히지 않도록 함
+        """
+        sequence, row = record
+        logger.error("쓰기 버퍼의 쪽지 %s:%d 를 저장할 수 없습니다 : %s", wal_id, sequence, error)
+        path = self.app.config["MESSAGE_WRITE_BUFFER_DEAD_LETTER_PATH"]
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "a", encoding="utf-8") as dead_letter:
+            dead_letter.write(
+                json.dumps(
+                    {
+                        "wal_id": wal_id,
+                        "sequence": sequence,
+                        **row,
+                        "error": str(error)[:500],
+                        "failed_at": datetime.utcnow().isoformat(),
+                    },
+                    ensure_ascii=False,
+                )
+                + "\n"
+            )
+            dead_letter.flush()
+            os.fsync(dead_letter.fileno())
+        with unit_of_work():
+            MessageWriteCheckpointModel.advance(wal_id, sequence)
+        if wal_id == self._wal_id:
+            self._flushed_sequence = sequence
+
+    def _take_batch(self):
+        """
+        첫 쪽지를 기다린 뒤, FLUSH_MS 가 지나거나 BATCH_SIZE 개가 모일 때까지 모음
+        """
+        config = self.app.config
+        flush_seconds = config["MESSAGE_WRITE_BUFFER_FLUSH_MS"] / 1000
+        try:
+            batch = [self._queue.get(timeout=flush_seconds)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + flush_seconds
+        while len(batch) < config["MESSAGE_WRITE_BUFFER_BATCH_SIZE"]:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def flush_once(self):
+        """
+        큐에 쌓인 쪽지를 기다리지 않고 모두 저장하고, 처리한 (dead letter 포함) 개수를 반환합니다.
+        앱 컨텍스트 안에서 호출해야 합니다.
+        """
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            self._save_batch_isolated(self._wal_id, batch)
+        return len(batch)
+
+    def _save_batch(self, wal_id, batch):
+        with unit_of_work():
+            MessageModel.bulk_save([row for sequence, row in batch])
+            MessageWriteCheckpointModel.advance(wal_id, batch[-1][0])
+        if wal_id == self._wal_id:
+            self._flushed_sequence = batch[-1][0]
+
+    def _rotate_if_needed(self):
+        """
+        모두 저장된 WAL 파일이 MESSAGE_WRITE_BUFFER_WAL_MAX_BYTES 보다 커졌다면 새 파일로 교체
+        """
+        if self._wal.tell() < self.app.config["MESSAGE_WRITE_BUFFER_WAL_MAX_BYTES"]:
+            return
+        # 모두 저장된 상태이므로, fsync 를 기다리던 쪽지도 더 이상 WAL 이 필요 없음
+        with self._sync_lock, self._lock:
+            if self._flushed_sequence != self._sequence:
+                return
+            new_wal_id = uuid.uuid4().hex
+            new_wal = open(self._get_wal_path(new_wal_id), "a", encoding="utf-8")
+            fcntl.flock(new_wal, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            wal, wal_id = self._wal, self._wal_id
+            self._wal, self._wal_id = new_wal, new_wal_id
+            self._sequence = self._flushed_sequence = self._synced_sequence = 0
+        # recover 와 같이, 잠금을 가진 채로 파일을 지운 뒤 체크포인트를 지움
+        # (체크포인트만 지워진 파일을 다른 프로세스가 처음부터 다시 적용하지 않도록)
+        try:
+            os.remove(self._get_wal_path(wal_id))
+            MessageWriteCheckpointModel.delete(wal_id)
+        finally:
+            wal.close()
+
+    def _lock_wal(self, wal, path):
+        """
+        남은 WAL 파일의 잠금을 얻고, 적용해도 되는 파일이면 True 를 반환
+        다른 프로세스가 잠금을 가지고 있거나, 파일을 연 뒤 잠금을 얻기 전에
+        다른 프로세스가 적용하고 지운 (열어둔 파일이 더 이상 path 에 없는) 경우 False
+        """
+        try:
+            fcntl.flock(wal, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        try:
+            return os.fstat(wal.fileno()).st_ino == os.stat(path).st_ino
+        except FileNotFoundError:
+            return False
+
+    def recover(self):
+        """
+        다른 (종료된) 프로세스가 남긴 WAL 파일을 적용하고 지움
+        잠금을 얻지 못한 파일은 아직 실행 중인 프로세스의 것이므로 건너뜀
+        앱 컨텍스트 안에서 호출해야 하며, 적용한 쪽지 개수를 반환합니다.
+        """
+        recovered = 0
+        pattern = self._get_wal_path("*")
+        for path in sorted(glob.glob(pattern)):
+            wal_id = os.path.basename(path)[len("messages-") : -len(".wal")]
+            if wal_id == self._wal_id:
+                continue
+            try:
+                wal = open(path, encoding="utf-8")
+            except FileNotFoundError:
+                # 목록을 만든 뒤 다른 프로세스가 적용하고 지움
+                continue
+            with wal:
+                if not self._lock_wal(wal, path):
+                    continue
+                last_sequence = MessageWriteCheckpointModel.get_last_sequence(wal_id)
+                batch = []
+                for line in wal:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # 기록 도중 종료되어 잘린 마지막 줄
+                        continue
+                    sequence = record.pop("sequence")
+                    if sequence > last_sequence:
+                        batch.append((sequence, record))
+                batch_size = self.app.config["MESSAGE_WRITE_BUFFER_BATCH_SIZE"]
+                for start in range(0, len(batch), batch_size):
+                    self._save_batch_isolated(wal_id, batch[start : start + batch_size])
+                recovered += len(batch)
+                # 잠금을 가진 채로 파일을 먼저 지워야, 체크포인트가 지워진 파일을 다시 적용하지 않음
+                os.remove(path)
+                MessageWriteCheckpointModel.delete(wal_id)
+            logger.info("WAL %s 에서 쪽지 %d 개를 복구했습니다.", wal_id, len(batch))
+        return recovered
+
+
+message_write_buffer = MessageWriteBuffer()
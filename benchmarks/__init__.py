@@ -0,0 +1,6 @@
+"""
+money for rabbit 성능 측정 스크립트 모음
+
+각 모듈은 `python -m benchmarks.<module>` 로 실행하며,
+api.config.bench 설정 (기본값: 임시 디렉토리의 SQLite, BENCH_DATABASE_URI 로 변경 가능) 을 사용합니다.
+"""
@@ -0,0 +1,189 @@
+import os
+import shutil
+import statistics
+import threading
+import time
+
+# 벤치마크는 .env 없이도 실행될 수 있어야 하므로, 필요한 값의 기본값을 채워둠
+for key in ["JWT_SECRET_KEY", "APP_SECRET_KEY", "MAIL_USERNAME", "MAIL_PASSWORD"]:
+    os.environ.setdefault(key, "benchmark")
+os.environ["APPLICATION_SETTINGS_TEST"] = os.getenv(
+    "BENCH_APPLICATION_SETTINGS", "api.config.bench"
+)
+
+# seed_dataset 으로 만든 모든 사용자의 비밀번호
+BENCH_PASSWORD = "SomeVali@123"
+BENCH_MYSQL_URI = os.getenv(
+    "BENCH_MYSQL_URI", "mysql+pymysql://root@127.0.0.1/moneyforrabbit_bench"
+)
+
+
+def use_local_mysql():
+    """
+    BENCH_MYSQL_URI 의 MySQL 에 연결할 수 있다면 벤치마크 데이터베이스로 사용하도록 설정하고 True 를,
+    아니라면 (기본값인 SQLite 를 사용) False 를 반환합니다. create_bench_app 전에 호출해야 합니다.
+    """
+    from sqlalchemy import create_engine
+
+    try:
+        engine = create_engine(BENCH_MYSQL_URI, connect_args={"connect_timeout": 2})
+        with engine.connect():
+            pass
+    except Exception:
+        return False
+    os.environ["BENCH_DATABASE_URI"] = BENCH_MYSQL_URI
+    return True
+
+
+def create_bench_app():
+    """벤치마크용 설정으로 앱을 생성하고, 비어있는 데이터베이스와 보관 디렉토리를 준비합니다."""
+    from api import create_app
+    from api.db import db
+
+    app = create_app(is_production=False)
+    shutil.rmtree(app.config["MESSAGE_ARCHIVE_DIR"], ignore_errors=True)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+    return app
+
+
+def seed_messages(recipient_count, messages_per_recipient, batch_size=5000):
+    """
+    Core bulk insert 로 사용자와 쪽지를 생성하고, 집계를 다시 계산합니다.
+    모든 쪽지는 마지막 사용자가 작성합니다. 앱 컨텍스트 안에서 호출해야 합니다.
+    """
+    from api.db import db
+    from api.models.message import MessageModel
+    from api.models.user import UserAggregateModel, UserModel
+
+    author_id = recipient_count + 1
+    db.session.execute(
+        UserModel.__table__.insert(),
+        [
+            {
+                "id": user_id,
+                "username": f"토끼{user_id}"[:20],
+                "password": "benchmark",
+                "email": f"rabbit{user_id}@bench.mfr",
+                "email_confirmed": True,
+                "is_admin": False,
+            }
+            for user_id in range(1, author_id + 1)
+        ],
+    )
+    rows = (
+        {
+            "user_id": user_id,
+            "author_id": author_id,
+            "message": "새해 복 많이 받으세요!",
+            "amount": 1000,
+            "is_moneybag": False,
+        }
+        for user_id in range(1, recipient_count + 1)
+        for _ in range(messages_per_recipient)
+    )
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == batch_size:
+            db.session.execute(MessageModel.__table__.insert(), batch)
+            batch = []
+    if batch:
+        db.session.execute(MessageModel.__table__.insert(), batch)
+    UserAggregateModel.reconcile()
+    db.session.commit()
+
+
+def seed_dataset(
+    user_count,
+    message_count,
+    skew=1.0,
+    previous_season_ratio=0.0,
+    seed=0,
+    batch_size=5000,
+):
+    """
+    flask seed 와 같은 방식으로 user_count 명의 사용자와 message_count 개의 쪽지를 생성하고,
+    집계를 다시 계산합니다. 앱 컨텍스트 안에서 비어있는 데이터베이스에 호출해야 합니다.
+
+    받는 사람은 인기 순위가 r 번째인 사용자 (id = r) 를 1 / r ** skew 에 비례하는 확률로 고르고,
+    previous_season_ratio 만큼의 쪽지는 지난 시즌의 쪽지입니다.
+    같은 seed 라면 같은 데이터가 만들어지며, 모든 사용자의 비밀번호는 BENCH_PASSWORD 입니다.
+    """
+    from api.db import db
+    from api.models.user import UserAggregateModel
+    from api.utils.korean_datetime import get_current_season
+    from api.utils.password import password_hasher
+    from api.utils.seed import insert_messages, insert_users
+
+    password = password_hasher.hash(BENCH_PASSWORD)
+    insert_users(db.engine, 1, user_count, password, seed, batch_size)
+    insert_messages(
+        db.engine,
+        1,
+        message_count,
+        users=(1, user_count),
+        skew=skew,
+        season=get_current_season(),
+        seed=seed,
+        batch_size=batch_size,
+        previous_season_ratio=previous_season_ratio,
+    )
+    UserAggregateModel.rebuild_all()
+    db.session.commit()
+
+
+def run_concurrently(func, concurrency, requests_per_worker):
+    """
+    concurrency 개의 스레드가 각자 func(worker_number) 를 requests_per_worker 번 실행하고,
+    (초당 처리량, 전체 실행 시간 목록 (ms)) 를 반환합니다.
+    """
+    elapsed = []
+    lock = threading.Lock()
+
+    def worker(worker_number):
+        measured = measure(lambda: func(worker_number), requests_per_worker)
+        with lock:
+            elapsed.extend(measured)
+
+    threads = [
+        threading.Thread(target=worker, args=(number,)) for number in range(concurrency)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(elapsed) / (time.perf_counter() - started), elapsed
+
+
+def auth_headers(app, user_id):
+    """해당 사용자의 액세스 토큰이 담긴 헤더를 반환합니다."""
+    from api.models.user import UserModel
+    from api.utils.auth import create_username_access_token
+
+    with app.app_context():
+        token = create_username_access_token(UserModel.find_by_id(user_id))
+    return {"Authorization": "Bearer " + token}
+
+
+def measure(func, repeat):
+    """func 를 repeat 번 실행하고, 각 실행 시간을 밀리초 단위 목록으로 반환합니다."""
+    elapsed = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        elapsed.append((time.perf_counter() - started) * 1000)
+    return elapsed
+
+
+def percentile(values, percent):
+    """실행 시간 목록의 percent 백분위 값 (nearest-rank) 을 반환합니다."""
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+def summarize(elapsed):
+    """실행 시간 목록의 중앙값과 최솟값을 문자열로 반환합니다."""
+    return f"median {statistics.median(elapsed):8.3f} ms / min {min(elapsed):8.3f} ms"
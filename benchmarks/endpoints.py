@@ -0,0 +1,531 @@
+"""
+create_app 에 등록된 모든 API 리소스를 동시 요청 수별로 호출하여
+p50 / p95 / p99 지연시간과 초당 처리량을 측정합니다.
+
+받는 쪽지 수가 인기 순위에 따라 치우친 (--skew) 데이터를 만든 뒤 측정하며,
+결과를 JSON 으로 저장하고 (--output), 저장해둔 기준 결과와 비교하여 (--baseline)
+p95 가 --tolerance 비율보다 더 느려지거나 처리량이 그만큼 줄어든 항목이 있으면 종료 코드 1 로 끝납니다.
+메일은 파일로 저장되므로 (MAIL_TRANSPORT = "file") 네트워크 없이 실행되고,
+--mysql 을 지정하면 BENCH_MYSQL_URI 의 로컬 MySQL 에 연결할 수 있을 때 MySQL 로 측정합니다.
+
+    python -m benchmarks.endpoints --users 2000 --messages 100000 --output baseline.json
+    python -m benchmarks.endpoints --users 2000 --messages 100000 --baseline baseline.json
+    python -m benchmarks.endpoints --users 100000 --messages 5000000 --concurrency 1 8 32
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import platform
+import statistics
+import sys
+import threading
+import time
+from collections import namedtuple
+
+from benchmarks.common import (
+    BENCH_PASSWORD,
+    auth_headers,
+    create_bench_app,
+    percentile,
+    seed_dataset,
+    use_local_mysql,
+)
+
+from api.utils.seed import get_seed_email
+
+# name 은 "<리소스> <메서드> (<설명>)" 형식이며, 결과 JSON 의 키로 사용
+Scenario = namedtuple("Scenario", ["name", "resource", "status", "prepare"])
+
+
+class BenchContext:
+    """
+    시나리오들이 공유하는 앱과 데이터 정보
+
+    상태를 바꾸는 시나리오 (로그인, 토큰 갱신, 로그아웃, 닉네임 변경) 는 서로 영향을 주지 않도록
+    각자 다른 사용자 구간을 사용합니다 (user_id).
+    """
+
+    def __init__(self, app, user_count, max_concurrency):
+        self.app = app
+        self.user_count = user_count
+        self.max_concurrency = max_concurrency
+        self.sequence = itertools.count(1)
+        self._headers = {}
+
+    def user_id(self, slot, worker_number):
+        return slot * self.max_concurrency + worker_number + 1
+
+    def headers(self, user_id):
+        if user_id not in self._headers:
+            self._headers[user_id] = auth_headers(self.app, user_id)
+        return self._headers[user_id]
+
+    def prepare_headers(self, user_ids):
+        """측정 중에 토큰을 발급하지 않도록 미리 발급"""
+        for user_id in user_ids:
+            self.headers(user_id)
+
+    @property
+    def popular_user_ids(self):
+        return range(1, min(10, self.user_count) + 1)
+
+    def popular_user_id(self, number):
+        """가장 많은 쪽지를 받은 10명의 사용자 중 하나"""
+        return self.popular_user_ids[number % len(self.popular_user_ids)]
+
+
+def get_json(data):
+    return {"content_type": "application/json", "data": json.dumps(data)}
+
+
+def prepare_user_information_get(context, concurrency, requests):
+    def call(client, worker_number, number):
+        return client.get(f"/api/user/{context.popular_user_id(number)}")
+
+    return call
+
+
+def prepare_user_information_put(context, concurrency, requests):
+    context.prepare_headers(context.user_id(3, number) for number in range(concurrency))
+
+    def call(client, worker_number, number):
+        user_id = context.user_id(3, worker_number)
+        return client.put(
+            f"/api/user/{user_id}",
+            headers=context.headers(user_id),
+            **get_json({"username": ["토끼", "토순"][number % 2]}),
+        )
+
+    return call
+
+
+def prepare_user_login(context, concurrency, requests):
+    def call(client, worker_number, number):
+        user_id = context.user_id(0, worker_number)
+        return client.post(
+            "/api/user/login",
+            **get_json({"email": get_seed_email(user_id), "password": BENCH_PASSWORD}),
+        )
+
+    return call
+
+
+def prepare_refresh_token(context, concurrency, requests):
+    from api.models.user import RefreshTokenModel, UserModel
+    from api.utils.auth import create_userid_refresh_token
+
+    # 토큰을 갱신하면 사용한 토큰은 폐기되므로, 작업자마다 마지막으로 받은 토큰을 사용
+    tokens = {}
+    with context.app.app_context():
+        for worker_number in range(concurrency):
+            user = UserModel.find_by_id(context.user_id(1, worker_number))
+            token = user.token[0] if user.token else RefreshTokenModel(user_id=user.id)
+            tokens[worker_number] = create_userid_refresh_token(user)
+            token.set_token(tokens[worker_number])
+            token.save_to_db()
+
+    def call(client, worker_number, number):
+        response = client.post(
+            "/api/user/refresh",
+            headers={"Authorization": "Bearer " + tokens[worker_number]},
+        )
+        if response.status_code == 200:
+            tokens[worker_number] = response.get_json()["refresh_token"]
+        return response
+
+    return call
+
+
+def prepare_user_logout(context, concurrency, requests):
+    # 로그아웃한 토큰은 폐기되므로, 요청마다 새 토큰을 미리 발급
+    headers = {
+        worker_number: [
+            auth_headers(context.app, context.user_id(2, worker_number))
+            for _ in range(requests)
+        ]
+        for worker_number in range(concurrency)
+    }
+
+    def call(client, worker_number, number):
+        return client.post("/api/user/logout", headers=headers[worker_number][number])
+
+    return call
+
+
+def prepare_user_register(context, concurrency, requests):
+    def call(client, worker_number, number):
+        return client.post(
+            "/api/user/register",
+            **get_json(
+                {
+                    "username": "토끼",
+                    "email": f"new{next(context.sequence)}@bench.mfr",
+                    "password": BENCH_PASSWORD,
+                }
+            ),
+        )
+
+    return call
+
+
+def prepare_user_withdraw(context, concurrency, requests):
+    from api.db import db
+    from api.models.user import UserModel
+
+    # 탈퇴할 사용자를 요청 수만큼 미리 생성
+    with context.app.app_context():
+        first_id = db.session.query(db.func.max(UserModel.id)).scalar() + 1
+        count = concurrency * requests
+        db.session.execute(
+            UserModel.__table__.insert(),
+            [
+                {
+                    "id": user_id,
+                    "username": "탈퇴",
+                    "password": "benchmark",
+                    "email": f"withdraw{user_id}@bench.mfr",
+                    "email_confirmed": True,
+                    "is_admin": False,
+                }
+                for user_id in range(first_id, first_id + count)
+            ],
+        )
+        db.session.commit()
+    headers = [auth_headers(context.app, first_id + offset) for offset in range(count)]
+
+    def call(client, worker_number, number):
+        return client.delete(
+            "/api/user/withdraw",
+            headers=headers[worker_number * requests + number],
+            **get_json({"username": "탈퇴"}),
+        )
+
+    return call
+
+
+def prepare_user_confirm(context, concurrency, requests):
+    def call(client, worker_number, number):
+        user_id = context.popular_user_id(number)
+        hashed_email = hashlib.sha256(get_seed_email(user_id).encode()).hexdigest()
+        return client.get(f"/api/confirm-user/{user_id}/{hashed_email}")
+
+    return call
+
+
+def prepare_message_list_get(query_string):
+    def prepare(context, concurrency, requests):
+        context.prepare_headers(context.popular_user_ids)
+
+        def call(client, worker_number, number):
+            user_id = context.popular_user_id(number)
+            return client.get(
+                f"/api/user/{user_id}/messages{query_string}",
+                headers=context.headers(user_id),
+            )
+
+        return call
+
+    return prepare
+
+
+def prepare_message_list_post(context, concurrency, requests):
+    context.prepare_headers(context.user_id(4, number) for number in range(concurrency))
+
+    def call(client, worker_number, number):
+        author_id = context.user_id(4, worker_number)
+        return client.post(
+            f"/api/user/{context.popular_user_id(number)}/messages",
+            headers=context.headers(author_id),
+            **get_json(
+                {"message": "새해 복 많이 받아.", "amount": 1000, "is_moneybag": False}
+            ),
+        )
+
+    return call
+
+
+def prepare_message_batch(context, concurrency, requests):
+    context.prepare_headers(context.user_id(4, number) for number in range(concurrency))
+
+    def call(client, worker_number, number):
+        author_id = context.user_id(4, worker_number)
+        return client.post(
+            "/api/messages/batch",
+            headers=context.headers(author_id),
+            **get_json(
+                {
+                    "messages": [
+                        {
+                            "user_id": context.popular_user_id(recipient),
+                            "message": "새해 복 많이 받아.",
+                            "amount": 1000,
+                            "is_moneybag": False,
+                        }
+                        for recipient in range(10)
+                    ]
+                }
+            ),
+        )
+
+    return call
+
+
+def prepare_message_detail(context, concurrency, requests):
+    from api.models.message import MessageModel
+
+    with context.app.app_context():
+        message_ids = {
+            user_id: [
+                id
+                for (id,) in MessageModel.received_query(user_id)
+                .with_entities(MessageModel.id)
+                .limit(100)
+            ]
+            for user_id in context.popular_user_ids
+        }
+
+    def call(client, worker_number, number):
+        user_id = context.popular_user_id(number)
+        ids = message_ids[user_id]
+        return client.get(f"/api/user/{user_id}/messages/{ids[number % len(ids)]}")
+
+    return call
+
+
+def prepare_message_archive_list(context, concurrency, requests):
+    from api.utils.korean_datetime import get_current_season
+
+    with context.app.app_context():
+        season = get_current_season() - 1
+    context.prepare_headers(context.popular_user_ids)
+
+    def call(client, worker_number, number):
+        user_id = context.popular_user_id(number)
+        return client.get(
+            f"/api/user/{user_id}/archive/{season}/messages",
+            headers=context.headers(user_id),
+        )
+
+    return call
+
+
+# 읽기 요청을 먼저, 데이터를 바꾸는 요청을 나중에 (탈퇴는 마지막에) 측정
+SCENARIOS = [
+    Scenario(
+        "UserInformation GET", "UserInformation", 200, prepare_user_information_get
+    ),
+    Scenario(
+        "MessageList GET (first page)",
+        "MessageList",
+        200,
+        prepare_message_list_get(""),
+    ),
+    Scenario(
+        "MessageList GET (page 2)",
+        "MessageList",
+        200,
+        prepare_message_list_get("?page=2"),
+    ),
+    Scenario("MessageDetail GET", "MessageDetail", 200, prepare_message_detail),
+    Scenario(
+        "MessageArchiveList GET",
+        "MessageArchiveList",
+        200,
+        prepare_message_archive_list,
+    ),
+    Scenario("UserConfirm GET", "UserConfirm", 302, prepare_user_confirm),
+    Scenario("UserLogin POST", "UserLogin", 200, prepare_user_login),
+    Scenario("RefreshToken POST", "RefreshToken", 200, prepare_refresh_token),
+    Scenario("UserLogout POST", "UserLogout", 204, prepare_user_logout),
+    Scenario(
+        "UserInformation PUT", "UserInformation", 200, prepare_user_information_put
+    ),
+    Scenario("MessageList POST", "MessageList", 201, prepare_message_list_post),
+    Scenario("MessageBatch POST", "MessageBatch", 201, prepare_message_batch),
+    Scenario("UserRegister POST", "UserRegister", 201, prepare_user_register),
+    Scenario("UserWithdraw DELETE", "UserWithdraw", 204, prepare_user_withdraw),
+]
+
+
+def get_registered_resources(app):
+    """create_app 에 등록된 API 리소스 이름 목록"""
+    return {
+        view.view_class.__name__
+        for view in app.view_functions.values()
+        if getattr(view, "view_class", None)
+        and view.view_class.__module__.startswith("api.resources.")
+    }
+
+
+def run_scenario(context, scenario, concurrency, requests):
+    """
+    concurrency 개의 스레드가 각자 requests 번 요청하고, 지연시간 백분위와 초당 처리량을 반환
+    """
+    call = scenario.prepare(context, concurrency, requests)
+    clients = [context.app.test_client() for _ in range(concurrency)]
+    elapsed, failures = [], []
+    lock = threading.Lock()
+    barrier = threading.Barrier(concurrency + 1)
+
+    def worker(worker_number):
+        measured = []
+        barrier.wait()
+        for number in range(requests):
+            started = time.perf_counter()
+            response = call(clients[worker_number], worker_number, number)
+            measured.append((time.perf_counter() - started) * 1000)
+            if response.status_code != scenario.status:
+                failures.append((response.status_code, response.get_data(as_text=True)))
+        with lock:
+            elapsed.extend(measured)
+
+    threads = [
+        threading.Thread(target=worker, args=(number,)) for number in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+    if failures:
+        status, body = failures[0]
+        raise AssertionError(
+            f"{scenario.name}: {len(failures)} requests failed, "
+            f"expected {scenario.status} but got {status}: {body[:200]}"
+        )
+    return {
+        "p50_ms": round(statistics.median(elapsed), 3),
+        "p95_ms": round(percentile(elapsed, 95), 3),
+        "p99_ms": round(percentile(elapsed, 99), 3),
+        "rps": round(len(elapsed) / wall, 1),
+        "requests": len(elapsed),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """
+    기준 결과와 비교하여, 허용 범위를 넘어 느려진 항목의 설명 목록을 반환
+    기준 결과에 없는 항목은 비교하지 않습니다.
+    """
+    regressions = []
+    for name, levels in results.items():
+        for concurrency, current in levels.items():
+            base = baseline.get(name, {}).get(concurrency)
+            if base is None:
+                continue
+            if current["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+                regressions.append(
+                    f"{name} x{concurrency}: p95 {base['p95_ms']} -> "
+                    f"{current['p95_ms']} ms"
+                )
+            if current["rps"] < base["rps"] * (1 - tolerance):
+                regressions.append(
+                    f"{name} x{concurrency}: {base['rps']} -> {current['rps']} req/s"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--messages", type=int, default=100000)
+    parser.add_argument("--skew", type=float, default=1.0, help="Zipf exponent")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=20, help="per worker")
+    parser.add_argument("--scenario", nargs="*", help="run scenarios containing these")
+    parser.add_argument("--mysql", action="store_true", help="use local MySQL if up")
+    parser.add_argument("--output", help="save results as JSON")
+    parser.add_argument("--baseline", help="compare with saved JSON results")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+    max_concurrency = max(args.concurrency)
+    if args.users < 5 * max_concurrency + 10:
+        parser.error("--users must be at least 5 x max concurrency + 10")
+
+    database = "mysql" if args.mysql and use_local_mysql() else "sqlite"
+    from api.utils.archive import message_archive
+    from api.utils.korean_datetime import get_current_season
+
+    app = create_bench_app()
+    started = time.perf_counter()
+    with app.app_context():
+        seed_dataset(
+            args.users,
+            args.messages,
+            skew=args.skew,
+            previous_season_ratio=0.1,
+            seed=args.seed,
+        )
+        message_archive.archive_season(get_current_season() - 1)
+    print(
+        f"{database}: seeded {args.users} users, {args.messages} messages "
+        f"(skew {args.skew}) in {time.perf_counter() - started:.1f} s"
+    )
+
+    scenarios = [
+        scenario
+        for scenario in SCENARIOS
+        if not args.scenario or any(word in scenario.name for word in args.scenario)
+    ]
+    uncovered = get_registered_resources(app) - {
+        scenario.resource for scenario in SCENARIOS
+    }
+    if uncovered:
+        print(f"resources without a scenario: {', '.join(sorted(uncovered))}")
+
+    context = BenchContext(app, args.users, max_concurrency)
+    results = {}
+    for scenario in scenarios:
+        results[scenario.name] = {}
+        for concurrency in args.concurrency:
+            result = run_scenario(context, scenario, concurrency, args.requests)
+            results[scenario.name][str(concurrency)] = result
+            print(
+                f"{scenario.name:<32} | x{concurrency:<3} "
+                f"| {result['rps']:8.1f} req/s "
+                f"| p50 {result['p50_ms']:8.2f} | p95 {result['p95_ms']:8.2f} "
+                f"| p99 {result['p99_ms']:8.2f} ms"
+            )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "meta": {
+                        "database": database,
+                        "users": args.users,
+                        "messages": args.messages,
+                        "skew": args.skew,
+                        "seed": args.seed,
+                        "requests": args.requests,
+                        "python": platform.python_version(),
+                        "machine": platform.machine(),
+                    },
+                    "results": results,
+                },
+                file,
+                ensure_ascii=False,
+                indent=2,
+            )
+        print(f"saved {args.output}")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+        if baseline["meta"]["database"] != database:
+            print(f"warning: baseline was measured on {baseline['meta']['database']}")
+        regressions = compare(results, baseline["results"], args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"no regression beyond {args.tolerance:.0%} of {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
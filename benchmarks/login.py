@@ -0,0 +1,69 @@
+"""
+비밀번호 검증을 요청 스레드에서 실행할 때와 프로세스 풀에서 실행할 때의
+로그인 처리량을 동시 요청 수별로 비교합니다.
+
+    python -m benchmarks.login --concurrency 1 4 16 --requests 10
+"""
+import argparse
+import json
+import os
+
+from benchmarks.common import create_bench_app, run_concurrently, summarize
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=10, help="per worker")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    from api.db import db
+    from api.models.user import UserModel
+    from api.utils.password import password_hasher
+
+    app = create_bench_app()
+    password = "SomeVali@123"
+    with app.app_context():
+        pwhash = password_hasher.hash(password)
+        db.session.execute(
+            UserModel.__table__.insert(),
+            [
+                {
+                    "username": f"토끼{number}",
+                    "password": pwhash,
+                    "email": f"rabbit{number}@bench.mfr",
+                    "email_confirmed": True,
+                    "is_admin": False,
+                }
+                for number in range(max(args.concurrency))
+            ],
+        )
+        db.session.commit()
+
+    def login(worker_number):
+        response = app.test_client().post(
+            "/api/user/login",
+            content_type="application/json",
+            data=json.dumps(
+                {"email": f"rabbit{worker_number}@bench.mfr", "password": password}
+            ),
+        )
+        assert response.status_code == 200, response.get_json()
+
+    print(f"{password_hasher.method}, {args.requests} logins per client")
+    for mode, workers in [("inline", 0), (f"pool({args.workers})", args.workers)]:
+        password_hasher.shutdown()
+        password_hasher.workers = workers
+        login(0)  # 프로세스 풀 준비
+        for concurrency in args.concurrency:
+            throughput, elapsed = run_concurrently(login, concurrency, args.requests)
+            print(
+                f"{mode:>10} | {concurrency:>3} clients | {throughput:8.1f} req/s "
+                f"| {summarize(elapsed)}"
+            )
+    password_hasher.shutdown()
+
+
+if __name__ == "__main__":
+    main()
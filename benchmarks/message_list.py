@@ -0,0 +1,81 @@
+"""
+받은 쪽지 목록을 ORM 객체로 조회할 때와 (MESSAGE_LIST_LEAN_READ) Core 로 필요한 컬럼만
+조회할 때의 요청당 CPU 시간과 메모리 할당량을 비교합니다.
+
+    python -m benchmarks.message_list --repeat 500
+"""
+import argparse
+import statistics
+import time
+import tracemalloc
+
+from benchmarks.common import auth_headers, create_bench_app, seed_messages
+
+
+def profile(func, repeat):
+    """
+    func 를 repeat 번 실행하고, (요청당 CPU 시간 중앙값 (us), 요청당 최대 할당량 중앙값 (KiB)) 를 반환
+    CPU 시간은 tracemalloc 을 끈 상태에서 따로 측정합니다.
+    """
+    cpu = []
+    for _ in range(repeat):
+        started = time.process_time()
+        func()
+        cpu.append((time.process_time() - started) * 1_000_000)
+    allocated = []
+    tracemalloc.start()
+    for _ in range(repeat // 10 or 1):
+        tracemalloc.reset_peak()
+        current, _ = tracemalloc.get_traced_memory()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        allocated.append((peak - current) / 1024)
+    tracemalloc.stop()
+    return statistics.median(cpu), statistics.median(allocated)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=500)
+    parser.add_argument("--messages", type=int, default=600)
+    args = parser.parse_args()
+
+    from api.services.message import MESSAGES_PER_PAGE
+    from api.utils.pagination import encode_cursor
+
+    app = create_bench_app()
+    with app.app_context():
+        seed_messages(recipient_count=1, messages_per_recipient=args.messages)
+    client = app.test_client()
+    headers = auth_headers(app, 1)
+
+    def get(url, lean_read):
+        app.config["MESSAGE_LIST_LEAN_READ"] = lean_read
+        response = client.get(url, headers=headers)
+        assert response.status_code == 200, response.get_json()
+        return response.data
+
+    # 첫 페이지는 캐시되므로, 두 번째 페이지로 비교
+    second_page_cursor = encode_cursor("next", args.messages - MESSAGES_PER_PAGE + 1)
+    print(f"{args.messages} messages, {args.repeat} runs per case")
+    for url in [
+        "/api/user/1/messages?page=2",
+        f"/api/user/1/messages?cursor={second_page_cursor}",
+    ]:
+        assert get(url, lean_read=False) == get(url, lean_read=True)
+        results = {}
+        for lean_read in [False, True]:
+            results[lean_read] = profile(lambda: get(url, lean_read), args.repeat)
+            mode = "core" if lean_read else "orm"
+            cpu, allocated = results[lean_read]
+            print(
+                f"{url:<48} | {mode:>4} | {cpu:8.1f} us cpu | {allocated:7.1f} KiB peak"
+            )
+        print(
+            f"{url:<48} | core / orm : cpu x{results[True][0] / results[False][0]:.2f}"
+            f", peak x{results[True][1] / results[False][1]:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
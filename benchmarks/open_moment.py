@@ -0,0 +1,111 @@
+"""
+쪽지 공개 시각처럼 모든 사용자가 동시에 쪽지 목록 첫 페이지를 조회하는 상황을 재현하여,
+캐시가 비어있을 때와 미리 채워둔 (prewarm) 때의 지연시간과 실행된 SQL 문 개수를 비교합니다.
+사용자마다 여러 클라이언트 (새로고침, 여러 탭) 가 같은 요청을 동시에 보냅니다.
+
+    python -m benchmarks.open_moment --users 200 --clients-per-user 3
+"""
+import argparse
+import statistics
+import threading
+import time
+
+from sqlalchemy import event
+
+from benchmarks.common import (
+    auth_headers,
+    create_bench_app,
+    percentile,
+    seed_messages,
+)
+
+
+def open_moment(app, headers, clients_per_user):
+    """
+    모든 클라이언트가 barrier 에서 기다렸다가 동시에 요청을 보내고,
+    (요청별 지연시간 목록 (ms), 전체 실행 시간 (초)) 를 반환합니다.
+    """
+    requests = [
+        (user_id, user_headers)
+        for user_id, user_headers in headers.items()
+        for _ in range(clients_per_user)
+    ]
+    barrier = threading.Barrier(len(requests) + 1)
+    elapsed = []
+    lock = threading.Lock()
+
+    def client(user_id, user_headers):
+        test_client = app.test_client()
+        barrier.wait()
+        started = time.perf_counter()
+        response = test_client.get(
+            f"/api/user/{user_id}/messages", headers=user_headers
+        )
+        assert response.status_code == 200, response.get_json()
+        with lock:
+            elapsed.append((time.perf_counter() - started) * 1000)
+
+    threads = [threading.Thread(target=client, args=request) for request in requests]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return elapsed, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--clients-per-user", type=int, default=3)
+    parser.add_argument("--messages", type=int, default=30, help="per user")
+    args = parser.parse_args()
+
+    from api.cache import cache
+    from api.db import db
+    from api.utils.prewarm import message_list_prewarmer
+    from api.utils.single_flight import message_list_single_flight
+
+    app = create_bench_app()
+    app.config["MESSAGE_LIST_PREWARM_MAX_USERS"] = args.users
+    with app.app_context():
+        seed_messages(recipient_count=args.users, messages_per_recipient=args.messages)
+        engine = db.get_engine(app)
+    headers = {
+        user_id: auth_headers(app, user_id) for user_id in range(1, args.users + 1)
+    }
+
+    statements = []
+    event.listen(
+        engine, "before_cursor_execute", lambda *args: statements.append(args[2])
+    )
+
+    print(
+        f"{args.users} users x {args.clients_per_user} clients, "
+        f"{args.messages} messages per user"
+    )
+    for mode in ["cold", "prewarmed"]:
+        cache.clear()
+        if mode == "prewarmed":
+            with app.app_context():
+                started = time.perf_counter()
+                message_list_prewarmer.warm_once()
+                warm_seconds = time.perf_counter() - started
+            print(f"prewarm took {warm_seconds:.2f} s")
+        statements.clear()
+        before = message_list_single_flight.stats()
+        elapsed, wall = open_moment(app, headers, args.clients_per_user)
+        after = message_list_single_flight.stats()
+        print(
+            f"{mode:>9} | {len(elapsed) / wall:7.1f} req/s "
+            f"| p50 {statistics.median(elapsed):8.2f} ms "
+            f"| p99 {percentile(elapsed, 99):8.2f} ms "
+            f"| {len(statements) / len(elapsed):5.2f} queries/req "
+            f"| computed {after['executed'] - before['executed']}"
+            f", shared {after['shared'] - before['shared']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+page (OFFSET + COUNT) 와 cursor (keyset) 방식의 쪽지 목록 조회 지연시간을 비교합니다.
+
+    python -m benchmarks.pagination --pages 1000 --repeat 20
+"""
+import argparse
+
+from benchmarks.common import (
+    auth_headers,
+    create_bench_app,
+    measure,
+    seed_messages,
+    summarize,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    from api.db import db
+    from api.models.message import MessageModel
+    from api.services.message import MESSAGES_PER_PAGE
+    from api.utils.pagination import encode_cursor
+
+    app = create_bench_app()
+    with app.app_context():
+        seed_messages(
+            recipient_count=1, messages_per_recipient=args.pages * MESSAGES_PER_PAGE
+        )
+    client = app.test_client()
+    headers = auth_headers(app, 1)
+
+    print(f"{args.pages * MESSAGES_PER_PAGE} messages, {args.repeat} runs per case")
+    for page in sorted({1, args.pages // 10 or 1, args.pages}):
+        with app.app_context():
+            # 이전 페이지의 마지막 쪽지 id 가 해당 페이지의 cursor 가 됨
+            last_id_of_previous_page = (
+                db.session.query(MessageModel.id)
+                .filter(MessageModel.user_id == 1)
+                .order_by(MessageModel.id.desc())
+                .offset((page - 1) * MESSAGES_PER_PAGE - 1)
+                .limit(1)
+                .scalar()
+                if page > 1
+                else None
+            )
+        cursor = (
+            encode_cursor("next", last_id_of_previous_page)
+            if last_id_of_previous_page
+            else ""
+        )
+        page_url = f"/api/user/1/messages?page={page}"
+        cursor_url = f"/api/user/1/messages?cursor={cursor}"
+        assert (
+            client.get(page_url, headers=headers).get_json()["messages"]
+            == client.get(cursor_url, headers=headers).get_json()["messages"]
+        )
+        page_elapsed = measure(
+            lambda: client.get(page_url, headers=headers), args.repeat
+        )
+        cursor_elapsed = measure(
+            lambda: client.get(cursor_url, headers=headers), args.repeat
+        )
+        print(f"page {page:>6} | page   : {summarize(page_elapsed)}")
+        print(f"page {page:>6} | cursor : {summarize(cursor_elapsed)}")
+
+
+if __name__ == "__main__":
+    main()
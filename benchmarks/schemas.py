@@ -0,0 +1,80 @@
+"""
+marshmallow 스키마와 스키마 레지스트리 (생성된 dump / load 함수) 의
+직렬화, 역직렬화 시간을 스키마별로 비교합니다.
+
+    python -m benchmarks.schemas --repeat 20000
+"""
+import argparse
+import timeit
+
+from benchmarks.common import create_bench_app, seed_messages
+
+
+def compare(name, marshmallow_func, registry_func, repeat):
+    assert marshmallow_func() == registry_func() or name.startswith("load")
+    results = []
+    for func in [marshmallow_func, registry_func]:
+        best = min(timeit.repeat(func, number=repeat, repeat=3))
+        results.append(best / repeat * 1_000_000)
+    print(
+        f"{name:<36} | marshmallow {results[0]:7.2f} us "
+        f"| registry {results[1]:7.2f} us | x{results[0] / results[1]:5.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=20000)
+    args = parser.parse_args()
+
+    from api.models.message import MessageModel
+    from api.models.user import UserModel
+    from api.schemas.message import MessageSchema
+    from api.schemas.registry import schema_registry
+    from api.schemas.user import UserInformationSchema
+    from api.services.message import MESSAGES_PER_PAGE
+
+    app = create_bench_app()
+    with app.app_context():
+        seed_messages(recipient_count=1, messages_per_recipient=MESSAGES_PER_PAGE)
+        user = UserModel.get(1)
+        messages = MessageModel.received_query(1).all()
+        payload = {"message": "새해 복 많이 받아.", "amount": 1000, "is_moneybag": False}
+        repeat = args.repeat
+
+        compare(
+            "dump MessageSchema",
+            lambda: MessageSchema().dump(messages[0]),
+            lambda: schema_registry.dump(MessageSchema, messages[0]),
+            repeat,
+        )
+        compare(
+            f"dump MessageSchema many ({len(messages)})",
+            lambda: MessageSchema(many=True).dump(messages),
+            lambda: schema_registry.dump(MessageSchema, messages, many=True),
+            repeat // len(messages),
+        )
+        compare(
+            "dump UserInformationSchema",
+            lambda: UserInformationSchema().dump(user),
+            lambda: schema_registry.dump(UserInformationSchema, user),
+            repeat,
+        )
+        compare(
+            "load MessageSchema (validate+load)",
+            lambda: MessageSchema().validate(payload) or MessageSchema().load(payload),
+            lambda: schema_registry.load(MessageSchema, payload),
+            repeat,
+        )
+        compare(
+            "validate UserInformationSchema",
+            lambda: UserInformationSchema().validate({"username": "토끼"}),
+            lambda: schema_registry.get(UserInformationSchema).validate(
+                {"username": "토끼"}
+            ),
+            repeat,
+        )
+
+
+if __name__ == "__main__":
+    main()
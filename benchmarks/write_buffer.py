@@ -0,0 +1,74 @@
+"""
+쪽지 작성 요청을 바로 저장할 때와 쓰기 버퍼 (WAL + 묶음 저장) 를 사용할 때의
+처리량을 동시 요청 수별로 비교합니다.
+
+    python -m benchmarks.write_buffer --concurrency 1 8 32 --requests 50
+"""
+import argparse
+import json
+import time
+
+from benchmarks.common import (
+    auth_headers,
+    create_bench_app,
+    run_concurrently,
+    seed_messages,
+    summarize,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=50, help="per worker")
+    parser.add_argument("--recipients", type=int, default=100)
+    args = parser.parse_args()
+
+    from api.models.message import MessageModel
+    from api.utils.write_buffer import message_write_buffer
+
+    app = create_bench_app()
+    with app.app_context():
+        seed_messages(recipient_count=args.recipients, messages_per_recipient=0)
+    headers = auth_headers(app, args.recipients + 1)
+    body = json.dumps({"message": "새해 복 많이 받아.", "amount": 1000, "is_moneybag": False})
+
+    def write(worker_number):
+        response = app.test_client().post(
+            f"/api/user/{worker_number % args.recipients + 1}/messages",
+            content_type="application/json",
+            data=body,
+            headers=headers,
+        )
+        assert response.status_code in (201, 202), response.get_json()
+
+    def wait_until_saved(expected):
+        with app.app_context():
+            while MessageModel.query.count() < expected:
+                time.sleep(0.01)
+
+    print(
+        f"{args.requests} writes per client, fsync={app.config['MESSAGE_WRITE_BUFFER_FSYNC']}"
+    )
+    expected = 0
+    for mode in ["direct", "buffered"]:
+        if mode == "buffered":
+            message_write_buffer.open()
+            message_write_buffer.start()
+        for concurrency in args.concurrency:
+            started = time.perf_counter()
+            throughput, elapsed = run_concurrently(write, concurrency, args.requests)
+            expected += concurrency * args.requests
+            wait_until_saved(expected)
+            saved_throughput = (
+                concurrency * args.requests / (time.perf_counter() - started)
+            )
+            print(
+                f"{mode:>9} | {concurrency:>3} clients | {throughput:8.1f} req/s "
+                f"| {saved_throughput:8.1f} saved/s | {summarize(elapsed)}"
+            )
+    message_write_buffer.stop()
+
+
+if __name__ == "__main__":
+    main()
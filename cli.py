@@ -1,10 +1,23 @@
+import time
 from sqlite3 import IntegrityError
 
 import click
 from flask.cli import with_appcontext
 from pymysql import IntegrityError
+from sqlalchemy.exc import SQLAlchemyError
 
-from api.models.user import UserModel
+from api.db import db, unit_of_work
+from api.models.message import MessageModel
+from api.models.outbox import EmailOutboxModel
+from api.models.user import UserAggregateModel, UserModel
+from api.utils.archive import message_archive
+from api.utils.explain import explain_query, get_hot_queries
+from api.utils.korean_datetime import get_current_season
+from api.utils.outbox import outbox_worker
+from api.utils.password import password_hasher
+from api.utils.prewarm import message_list_prewarmer
+from api.utils.seed import insert_messages, insert_users, run_shards
+from api.utils.sweeper import refresh_token_sweeper
 
 
 @click.command(name="createadminuser")
@@ -25,3 +38,203 @@ def create_admin_user():
     except IntegrityError:
         print("\033[31m" + "Error : username or email already exists.")
     print(f"User created! : {email}")
+
+
+@click.command(name="reconcileaggregates")
+@click.option("--dry-run", is_flag=True, help="Only report drift, do not fix it.")
+@with_appcontext
+def reconcile_aggregates(dry_run):
+    """
+    Message 테이블로부터 사용자별 집계를 다시 계산하고, 어긋난 값을 보고
+    """
+    drifts = UserAggregateModel.reconcile(dry_run=dry_run)
+    for user_id, current, expected in drifts:
+        print(
+            f"User {user_id} : "
+            f"(total_amount, message_count, last_message_id) {current} -> {expected}"
+        )
+    if dry_run:
+        db.session.rollback()
+        print(f"{len(drifts)} drifted aggregate(s) found.")
+    else:
+        db.session.commit()
+        print(f"{len(drifts)} drifted aggregate(s) reconciled.")
+
+
+@click.command(name="explainqueries")
+@click.option("--verbose", is_flag=True, help="Print the full query plan.")
+@with_appcontext
+def explain_queries(verbose):
+    """
+    서비스들이 실행하는 주요 쿼리의 실행 계획을 조회하고, 인덱스 사용 여부를 보고
+    """
+    full_scan_count = 0
+    for name, query in get_hot_queries():
+        uses_index, plan = explain_query(query)
+        if not uses_index:
+            full_scan_count += 1
+        print(f"[{'INDEX' if uses_index else 'FULL SCAN'}] {name}")
+        if verbose or not uses_index:
+            for line in plan:
+                print(f"    {line}")
+    print(f"{full_scan_count} query(s) without index.")
+
+
+@click.command(name="drainoutbox")
+@with_appcontext
+def drain_outbox():
+    """
+    발송할 차례가 된 메일을 모두 발송 (백그라운드 워커를 사용하지 않는 경우)
+    """
+    processed = 0
+    while True:
+        count = outbox_worker.drain_once()
+        if not count:
+            break
+        processed += count
+    print(f"{processed} email(s) processed. {EmailOutboxModel.count_by_status()}")
+
+
+@click.command(name="sweeptokens")
+@with_appcontext
+def sweep_tokens():
+    """
+    만료된 refresh token 을 모두 삭제 (백그라운드 스레드를 사용하지 않는 경우)
+    """
+    print(f"{refresh_token_sweeper.sweep_once()} expired refresh token(s) deleted.")
+
+
+@click.command(name="prewarm")
+@with_appcontext
+def prewarm():
+    """
+    쪽지 목록 캐시를 지금 미리 채움 (백그라운드 스레드를 사용하지 않는 경우, 공개 직전에 실행)
+    """
+    print(
+        f"Message list cache warmed for {message_list_prewarmer.warm_once()} user(s)."
+    )
+
+
+@click.command(name="archiveseason")
+@click.option(
+    "--season",
+    type=int,
+    multiple=True,
+    help="Season to archive. Defaults to every finished season left in the table.",
+)
+@click.option("--chunk-size", type=int, default=None)
+@with_appcontext
+def archive_season(season, chunk_size):
+    """
+    끝난 시즌의 쪽지를 압축된 보관 파일로 옮기고 Message 테이블에서 삭제
+    MESSAGE_SEASON 을 새 시즌으로 바꾼 뒤 실행하며, 중단되었다면 다시 실행하여 이어서 보관
+    """
+    current_season = get_current_season()
+    for target in season or MessageModel.finished_seasons():
+        if target >= current_season:
+            print(f"Season {target} is not finished yet (current : {current_season}).")
+            continue
+        archived = message_archive.archive_season(target, chunk_size=chunk_size)
+        print(f"Season {target} : {archived} message(s) archived.")
+
+
+@click.command(name="seed")
+@click.option("--users", type=int, default=100000, show_default=True)
+@click.option("--messages", type=int, default=1000000, show_default=True)
+@click.option(
+    "--skew",
+    type=float,
+    default=1.0,
+    show_default=True,
+    help="Zipf exponent of recipient popularity (0 = uniform).",
+)
+@click.option("--moneybag-ratio", type=float, default=0.1, show_default=True)
+@click.option("--batch-size", type=int, default=10000, show_default=True)
+@click.option("--processes", type=int, default=1, show_default=True)
+@click.option(
+    "--password",
+    default="SomeVali@123",
+    show_default=True,
+    help="Password of every seeded user (hashed once).",
+)
+@click.option("--seed", "random_seed", type=int, default=0, show_default=True)
+@click.option("--yes", is_flag=True, help="Do not ask for confirmation.")
+@with_appcontext
+def seed(
+    users,
+    messages,
+    skew,
+    moneybag_ratio,
+    batch_size,
+    processes,
+    password,
+    random_seed,
+    yes,
+):
+    """
+    용량 테스트를 위한 합성 사용자와 쪽지를 Core bulk insert 로 대량 생성
+    기존 데이터 뒤에 이어서 생성하며, 끝나면 모든 사용자의 집계를 다시 계산
+    """
+    engine = db.engine
+    if not yes:
+        click.confirm(
+            f"Seed {users} users and {messages} messages into {engine.url!r}?",
+            abort=True,
+        )
+    if engine.dialect.name == "sqlite" and processes > 1:
+        # SQLite 는 한 번에 하나의 연결만 쓸 수 있으므로 나누어도 빨라지지 않음
+        print("SQLite allows a single writer, seeding in one process.")
+        processes = 1
+    first_user_id = (db.session.query(db.func.max(UserModel.id)).scalar() or 0) + 1
+    first_message_id = (
+        db.session.query(db.func.max(MessageModel.id)).scalar() or 0
+    ) + 1
+    season = get_current_season()
+    db.session.commit()
+
+    started = time.perf_counter()
+    run_shards(
+        engine,
+        insert_users,
+        first_user_id,
+        users,
+        processes,
+        password=password_hasher.hash(password),
+        seed=random_seed,
+        batch_size=batch_size,
+    )
+    print(
+        f"{users} user(s) seeded from id {first_user_id} "
+        f"({time.perf_counter() - started:.1f} s)."
+    )
+
+    started = time.perf_counter()
+    run_shards(
+        engine,
+        insert_messages,
+        first_message_id,
+        messages,
+        processes,
+        users=(first_user_id, users),
+        skew=skew,
+        season=season,
+        seed=random_seed,
+        batch_size=batch_size,
+        moneybag_ratio=moneybag_ratio,
+    )
+    print(
+        f"{messages} message(s) seeded from id {first_message_id} "
+        f"({time.perf_counter() - started:.1f} s)."
+    )
+
+    started = time.perf_counter()
+    try:
+        # 실패하면 롤백되어 이전 집계가 그대로 남음
+        with unit_of_work():
+            UserAggregateModel.rebuild_all()
+    except SQLAlchemyError as e:
+        raise click.ClickException(
+            f"Users and messages were seeded, but rebuilding aggregates failed : {e}\n"
+            "Run `flask reconcileaggregates` to rebuild them."
+        )
+    print(f"Aggregates rebuilt ({time.perf_counter() - started:.1f} s).")
@@ -0,0 +1,98 @@
+"""store refresh tokens as SHA-256 digests with an expiry
+
+Revision ID: 3c9f1a7d2b40
+Revises: e16d05aa6051
+Create Date: 2026-10-18 14:20:00.000000
+
+"""
+import base64
+import hashlib
+import json
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "3c9f1a7d2b40"
+down_revision = "e16d05aa6051"
+branch_labels = None
+depends_on = None
+
+
+def get_existing_columns():
+    inspector = sa.inspect(op.get_bind())
+    return {column["name"] for column in inspector.get_columns("RefreshToken")}
+
+
+def get_expires_at(token):
+    """
+    서명 검증 없이 JWT 의 exp 값을 읽음
+    읽을 수 없는 토큰은 바로 만료된 것으로 처리해, 다음 정리 때 삭제되도록 함
+    """
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        exp = json.loads(base64.urlsafe_b64decode(payload))["exp"]
+        return datetime.utcfromtimestamp(exp)
+    except (IndexError, KeyError, TypeError, ValueError):
+        return datetime.utcfromtimestamp(0)
+
+
+def upgrade():
+    # db.create_all() 로 새로 만든 테이블에는 이미 digest 컬럼이 있음
+    if "refresh_token_digest" in get_existing_columns():
+        return
+    op.add_column(
+        "RefreshToken", sa.Column("refresh_token_digest", sa.String(64), nullable=True)
+    )
+    op.add_column("RefreshToken", sa.Column("expires_at", sa.DateTime(), nullable=True))
+
+    token_table = sa.table(
+        "RefreshToken",
+        sa.column("id", sa.Integer),
+        sa.column("refresh_token_value", sa.String),
+        sa.column("refresh_token_digest", sa.String),
+        sa.column("expires_at", sa.DateTime),
+    )
+    connection = op.get_bind()
+    rows = connection.execute(
+        sa.select(token_table.c.id, token_table.c.refresh_token_value)
+    ).fetchall()
+    for id, token in rows:
+        connection.execute(
+            token_table.update()
+            .where(token_table.c.id == id)
+            .values(
+                refresh_token_digest=hashlib.sha256(token.encode()).hexdigest(),
+                expires_at=get_expires_at(token),
+            )
+        )
+
+    with op.batch_alter_table("RefreshToken") as batch_op:
+        batch_op.alter_column(
+            "refresh_token_digest", existing_type=sa.String(64), nullable=False
+        )
+        batch_op.alter_column("expires_at", existing_type=sa.DateTime(), nullable=False)
+        batch_op.create_unique_constraint(
+            "uq_RefreshToken_refresh_token_digest", ["refresh_token_digest"]
+        )
+        batch_op.create_index("ix_RefreshToken_expires_at", ["expires_at"])
+        batch_op.drop_column("refresh_token_value")
+
+
+def downgrade():
+    # digest 로부터 토큰 원문을 되살릴 수 없으므로, 저장된 토큰을 모두 지움 (다시 로그인 필요)
+    op.execute("DELETE FROM RefreshToken")
+    with op.batch_alter_table("RefreshToken") as batch_op:
+        batch_op.add_column(
+            sa.Column("refresh_token_value", sa.String(512), nullable=False)
+        )
+        batch_op.create_unique_constraint(
+            "uq_RefreshToken_refresh_token_value", ["refresh_token_value"]
+        )
+        batch_op.drop_index("ix_RefreshToken_expires_at")
+        batch_op.drop_constraint("uq_RefreshToken_refresh_token_digest", type_="unique")
+        batch_op.drop_column("expires_at")
+        batch_op.drop_column("refresh_token_digest")
@@ -0,0 +1,50 @@
+"""tag messages with a season and index the current season's mailbox
+
+Revision ID: 5b8e2c4f7a13
+Revises: 3c9f1a7d2b40
+Create Date: 2026-10-18 18:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "5b8e2c4f7a13"
+down_revision = "3c9f1a7d2b40"
+branch_labels = None
+depends_on = None
+
+# 시즌이 도입되기 전의 쪽지는 모두 첫 시즌 (2023) 에 작성됨
+FIRST_SEASON = 2023
+
+
+def get_existing_columns():
+    inspector = sa.inspect(op.get_bind())
+    return {column["name"] for column in inspector.get_columns("Message")}
+
+
+def upgrade():
+    # db.create_all() 로 새로 만든 테이블에는 이미 season 컬럼이 있음
+    if "season" in get_existing_columns():
+        return
+    with op.batch_alter_table("Message") as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "season",
+                sa.Integer(),
+                nullable=False,
+                server_default=str(FIRST_SEASON),
+            )
+        )
+    with op.batch_alter_table("Message") as batch_op:
+        batch_op.alter_column("season", existing_type=sa.Integer(), server_default=None)
+        batch_op.create_index(
+            "ix_Message_season_user_id_id", ["season", "user_id", "id"]
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("Message") as batch_op:
+        batch_op.drop_index("ix_Message_season_user_id_id")
+        batch_op.drop_column("season")
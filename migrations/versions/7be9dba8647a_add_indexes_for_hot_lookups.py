@@ -0,0 +1,42 @@
+"""add indexes for hot lookups
+
+Revision ID: 7be9dba8647a
+Revises: 
+Create Date: 2026-10-18 12:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "7be9dba8647a"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# 테이블은 create_app 의 db.create_all() 로 이미 생성되어 있으므로,
+# 모델에 선언된 인덱스 중 없는 것만 추가
+INDEXES = [
+    ("ix_Message_user_id_id", "Message", ["user_id", "id"]),
+    ("ix_Message_author_id_user_id", "Message", ["author_id", "user_id"]),
+    ("ix_User_username", "User", ["username"]),
+    ("ix_RefreshToken_user_id", "RefreshToken", ["user_id"]),
+]
+
+
+def get_existing_indexes(table_name):
+    inspector = sa.inspect(op.get_bind())
+    return {index["name"] for index in inspector.get_indexes(table_name)}
+
+
+def upgrade():
+    for index_name, table_name, columns in INDEXES:
+        if index_name not in get_existing_indexes(table_name):
+            op.create_index(index_name, table_name, columns)
+
+
+def downgrade():
+    for index_name, table_name, columns in reversed(INDEXES):
+        if index_name in get_existing_indexes(table_name):
+            op.drop_index(index_name, table_name=table_name)
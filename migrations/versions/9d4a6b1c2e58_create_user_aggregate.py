@@ -0,0 +1,73 @@
+"""create and backfill per-user received message aggregates
+
+Revision ID: 9d4a6b1c2e58
+Revises: 5b8e2c4f7a13
+Create Date: 2026-10-18 21:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from api.utils.korean_datetime import get_current_season
+
+
+# revision identifiers, used by Alembic.
+revision = "9d4a6b1c2e58"
+down_revision = "5b8e2c4f7a13"
+branch_labels = None
+depends_on = None
+
+
+def get_existing_tables():
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def upgrade():
+    # db.create_all() 로 이미 (비어있는) 테이블이 만들어졌을 수 있으므로, 없을 때만 생성
+    if "UserAggregate" not in get_existing_tables():
+        op.create_table(
+            "UserAggregate",
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("total_amount", sa.BigInteger(), nullable=False),
+            sa.Column("message_count", sa.Integer(), nullable=False),
+            sa.Column("last_message_id", sa.Integer(), nullable=True),
+            sa.ForeignKeyConstraint(["user_id"], ["User.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("user_id"),
+        )
+
+    # 배포 이후 일부만 쌓인 집계가 있더라도, 현재 시즌의 쪽지로부터 모두 다시 만듦
+    aggregate_table = sa.table(
+        "UserAggregate",
+        sa.column("user_id", sa.Integer),
+        sa.column("total_amount", sa.BigInteger),
+        sa.column("message_count", sa.Integer),
+        sa.column("last_message_id", sa.Integer),
+    )
+    message_table = sa.table(
+        "Message",
+        sa.column("id", sa.Integer),
+        sa.column("user_id", sa.Integer),
+        sa.column("amount", sa.Integer),
+        sa.column("season", sa.Integer),
+    )
+    op.execute(aggregate_table.delete())
+    op.execute(
+        aggregate_table.insert().from_select(
+            ["user_id", "total_amount", "message_count", "last_message_id"],
+            sa.select(
+                message_table.c.user_id,
+                sa.func.sum(message_table.c.amount),
+                sa.func.count(),
+                sa.func.max(message_table.c.id),
+            )
+            .where(
+                message_table.c.season == get_current_season(),
+                message_table.c.user_id.isnot(None),
+            )
+            .group_by(message_table.c.user_id),
+        )
+    )
+
+
+def downgrade():
+    op.drop_table("UserAggregate")
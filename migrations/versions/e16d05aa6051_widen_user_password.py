@@ -0,0 +1,37 @@
+"""widen User.password for configurable hash cost
+
+Revision ID: e16d05aa6051
+Revises: 7be9dba8647a
+Create Date: 2026-10-18 13:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "e16d05aa6051"
+down_revision = "7be9dba8647a"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # pbkdf2:sha256:260000 해시가 정확히 102자이므로, 비용이나 알고리즘을 바꿀 수 있도록 넓힘
+    with op.batch_alter_table("User") as batch_op:
+        batch_op.alter_column(
+            "password",
+            existing_type=sa.String(length=102),
+            type_=sa.String(length=255),
+            existing_nullable=False,
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("User") as batch_op:
+        batch_op.alter_column(
+            "password",
+            existing_type=sa.String(length=255),
+            type_=sa.String(length=102),
+            existing_nullable=False,
+        )